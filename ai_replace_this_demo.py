@@ -5,6 +5,15 @@ Title: "From 'AI Will Replace Me' to 'AI, Replace This'"
 
 This script provides ready-to-run demo sequences for the Reachy 2 robot.
 Run with the Docker simulation for visualization without physical robot.
+Gestures are coroutines (gestures_demo.py) played by the asyncio engine in
+gesture_engine.py, so head, arm and antenna moves overlap instead of
+queuing behind sleeps.
+Poses and timing live in gestures.json and are compiled to dense
+trajectories at startup (gesture_compiler.py).
+Keys are read one keystroke at a time (key_input.py, no Enter needed) and
+go through a preemptible command queue: a new key interrupts the running
+gesture, and H/R cut in immediately. Key bindings live in one registry
+(gesture_registry.py) that also prints the controls.
 
 Setup:
     docker run --rm -p 8888:8888 -p 6080:6080 -p 50051:50051 \
@@ -13,6 +22,13 @@ Setup:
 
 Usage:
     python ai_replace_this_demo.py
+    python ai_replace_this_demo.py --mock      # offline fake robot, no Docker
+    python ai_replace_this_demo.py --serve     # also drive it from demo.html/index.html
+    python ai_replace_this_demo.py --host 10.0.0.11 10.0.0.12   # several robots in unison
+    python ai_replace_this_demo.py --telemetry reachy.prom   # rolling joint/latency metrics
+    python ai_replace_this_demo.py --record show.reachylog   # replay with session_log.py
+    python ai_replace_this_demo.py --mock --reload   # rehearse: edits apply on the next key
+    python ai_replace_this_demo.py --optimize   # skip redundant finish moves (motion_optimizer.py)
 
 Controls:
     1 = Dismissive Handwave (opener)
@@ -33,579 +49,395 @@ Controls:
 Author: AI Demo Script for Presentation
 """
 
+import argparse
+import concurrent.futures
+import functools
 import logging
+import os
 import sys
-import time
 from typing import Optional
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from command_queue import CommandQueue, Priority
+from connection import ConnectionManager
+from event_log import EventLog
+from fast_start import FastStart, StartupProfile, prewarm_sdk
+from gesture_compiler import GestureLibrary
+from gesture_engine import GestureEngine
+from gesture_registry import GestureRegistry
+from head_ik import STAGE_TARGETS
+from idle_motion import IdleMotion
+from key_input import KeyReader
+from power_manager import MOTOR_PARTS, ON, PowerManager
+from show_timeline import ShowScript, ShowTimeline
+
 logger = logging.getLogger(__name__)
 
 
+# The show's gestures, built around each demo (looked up through REGISTRY).
+GESTURES = "gestures_demo:DemoGestures"
+
+
 class ReachyDemo:
-    """Demo controller for 'AI, Replace This' presentation."""
+    """Demo controller for 'AI, Replace This' presentation (gestures in gestures_demo.py)."""
     
-    def __init__(self, host: str = "localhost"):
+    def __init__(self, host: str = "localhost", reachy=None, clock=None,
+                 profile: Optional[StartupProfile] = None, optimize: bool = False):
         """Initialize connection to Reachy robot.
         
         Args:
             host: IP address of the robot or 'localhost' for simulation.
+            reachy: Already-built SDK object (e.g. mock_reachy.FakeReachySDK);
+                skips connecting to `host`.
+            clock: Time source for the gesture engine (clock.VirtualClock to
+                fast-forward against the fake robot).
+            profile: Startup timing to add the connect and compile phases to.
+            optimize: Drop the commands motion_optimizer finds redundant from
+                the compiled gestures (e.g. a head.goto([0, 0, 0]) finish
+                right after goto_posture('elbow_90')).
         """
         self.host = host
-        self.reachy = None
-        self._connect()
-    
+        self.optimize = optimize
+        self.profile = profile or StartupProfile()
+        self.connection = ConnectionManager(host, reachy=reachy)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="gestures") as pool:
+            # gestures.json compiles while the link comes up
+            library = pool.submit(self._load_library)
+            if reachy is None:
+                with self.profile.phase(f"connect {host}"):
+                    self._connect()
+            self.reachy = self.connection.reachy
+            self.engine = GestureEngine(self.reachy, clock=clock, connection=self.connection)
+            self.engine.prewarm_look_at(STAGE_TARGETS.values())
+            self.power = PowerManager(self.engine)
+            # Breathing/gaze drift between cues (started by main, yields to every gesture)
+            self.idle = IdleMotion(self.engine)
+            self.library = library.result()
+        self._library_mtime = os.path.getmtime(self.library.path)
+        self.show = ShowTimeline(self, ShowScript.load())
+        self.connection.listeners.append(self._on_reconnect)
+
+    @property
+    def connected(self) -> bool:
+        """Last known link state (cached by the connection heartbeat; never blocks)."""
+        return self.connection.connected
+
     def _connect(self) -> bool:
         """Establish connection to the robot."""
-        try:
-            from reachy2_sdk import ReachySDK
-            
-            logger.info(f"Connecting to Reachy at {self.host}...")
-            self.reachy = ReachySDK(host=self.host)
-            
-            if self.reachy.is_connected():
-                logger.info(f"✅ Connected! Mode: {self.reachy.info.mode}")
-                logger.info(f"   Config: {self.reachy.info.config}")
-                return True
-            else:
-                logger.error("❌ Failed to connect to Reachy")
-                return False
-                
-        except Exception as e:
-            logger.error(f"❌ Connection error: {e}")
-            logger.info("💡 Make sure Docker simulation is running:")
-            logger.info("   docker run --rm -p 6080:6080 -p 50051:50051 --name reachy2 docker.io/pollenrobotics/reachy2")
-            return False
-    
-    # =========================================================================
-    # ACT 1: THE DISMISSIVE HANDWAVE (Opener)
-    # =========================================================================
-    
-    def slump_defeated(self) -> None:
-        """Make robot appear 'defeated' - the starting position.
-        
-        Presenter says: "Everyone's worried about AI replacing them. But watch this..."
-        """
-        logger.info("🎭 Slumping into defeated posture...")
-        
-        if not self.reachy or not self.reachy.is_connected():
-            return
-            
-        # Turn off motors - robot goes limp/compliant
-        self.reachy.turn_off()
-        time.sleep(0.3)
-        
-        # If we can still control head while off, droop it
-        try:
-            if self.reachy.head:
-                self.reachy.head.turn_on()
-                self.reachy.head.goto([0, -25, 0], duration=1.5)  # Head droops down
-                time.sleep(1.5)
-                self.reachy.head.turn_off()
-        except:
-            pass
-            
-        logger.info("   Robot is now slumped. Ready for the handwave command.")
-    
-    def snap_to_attention(self) -> None:
-        """Snap robot to attention - the power moment.
-        
-        Presenter waves hand and commands: "AI, stand at attention!"
-        """
-        logger.info("🎭 Snapping to ATTENTION!")
-        
-        if not self.reachy or not self.reachy.is_connected():
-            return
-            
-        # Quick turn on
-        self.reachy.turn_on()
-        time.sleep(0.1)
-        
-        # Snap to elbow_90 posture (arms forward, ready)
-        self.reachy.goto_posture('elbow_90', duration=1.2, wait=False)
-        
-        # Head looks at presenter
-        if self.reachy.head:
-            self.reachy.head.look_at(0.5, 0.2, 0.1)  # Look slightly to the side
-            
-            # Antennas perk up
-            try:
-                self.reachy.head.l_antenna.goto(15, duration=0.5)
-                self.reachy.head.r_antenna.goto(-15, duration=0.5)
-            except:
-                pass
-        
-        time.sleep(1.5)
-        logger.info("   ✅ Robot at attention. YOU are in command.")
-    
-    def dismissive_handwave_sequence(self) -> None:
-        """Full sequence: slump → pause → snap to attention.
-        
-        This is the complete opener. Run this before you start talking.
-        """
-        logger.info("=" * 50)
-        logger.info("🎬 ACT 1: THE DISMISSIVE HANDWAVE")
-        logger.info("=" * 50)
-        
-        self.slump_defeated()
-        logger.info("   📢 [CUE] Say: 'Everyone's worried about AI replacing them...'")
-        time.sleep(3)  # Time for presenter to speak
-        
-        logger.info("   📢 [CUE] Wave hand and say: 'AI, stand at attention!'")
-        time.sleep(1)
-        
-        self.snap_to_attention()
-        logger.info("   📢 [CUE] Say: 'AI doesn't replace you. AI REPORTS to you.'")
-    
-    # =========================================================================
-    # ACT 2: THE LIVE IMPROV DIRECTOR (Main Demo)
-    # =========================================================================
-    
-    def gesture_boring_meeting(self) -> None:
-        """Gesture: Reacting to boring meetings.
-        
-        Head droops (bored) → suddenly perks up → confused antenna twitch.
-        Presenter: "AI, replace sitting through boring meetings!"
-        """
-        logger.info("🎭 Gesture: BORING MEETING reaction")
-        
-        if not self.reachy or not self.reachy.head:
-            return
-            
-        # Head droops (falling asleep in meeting)
-        self.reachy.head.goto([0, -20, 5], duration=1.5)
-        time.sleep(1.8)
-        
-        # Suddenly "wakes up"
-        self.reachy.head.goto([0, 10, 0], duration=0.4)
-        time.sleep(0.3)
-        
-        # Confused look - antennas do different things
-        try:
-            self.reachy.head.l_antenna.goto(25, duration=0.3)
-            self.reachy.head.r_antenna.goto(-10, duration=0.3)
-        except:
-            pass
-        
-        # Look around confused
-        self.reachy.head.goto([10, 5, 15], duration=0.6)
-        time.sleep(0.5)
-        self.reachy.head.goto([-10, 5, -15], duration=0.6)
-        time.sleep(0.5)
-        
-        # Reset
-        self.reachy.head.goto([0, 0, 0], duration=0.5)
-        logger.info("   ✅ Even AI finds meetings tedious!")
-    
-    def gesture_pointing(self) -> None:
-        """Gesture: Pointing at the presentation screen.
-        
-        Presenter: "AI, replace pointing at charts for me!"
-        """
-        logger.info("🎭 Gesture: POINTING at screen")
-        
-        if not self.reachy or not self.reachy.r_arm:
-            return
-            
-        # Extend right arm to point
-        # Joint order: shoulder_pitch, shoulder_roll, elbow_yaw, elbow_pitch, wrist_roll, wrist_pitch, wrist_yaw
-        pointing_pose = [20, 10, -30, -40, 0, -20, 0]
-        
-        self.reachy.r_arm.goto(pointing_pose, duration=1.2)
-        
-        # Head looks at where we're pointing
-        if self.reachy.head:
-            self.reachy.head.goto([0, 5, 30], duration=1.0)
-        
-        time.sleep(2)
-        
-        # Small pointing motion (like emphasizing a data point)
-        self.reachy.r_arm.goto([25, 10, -30, -40, 0, -20, 0], duration=0.3)
-        time.sleep(0.3)
-        self.reachy.r_arm.goto([20, 10, -30, -40, 0, -20, 0], duration=0.3)
-        
-        time.sleep(1)
-        
-        # Return to neutral
-        self.reachy.goto_posture('elbow_90', duration=1.0)
-        if self.reachy.head:
-            self.reachy.head.goto([0, 0, 0], duration=0.8)
-            
-        logger.info("   ✅ The classic presenter move - delegated!")
-    
-    def gesture_nodding(self) -> None:
-        """Gesture: Nodding in agreement (the meeting essential).
-        
-        Presenter: "AI, replace nodding in meetings for me!"
-        """
-        logger.info("🎭 Gesture: NODDING in agreement")
-        
-        if not self.reachy or not self.reachy.head:
-            return
-            
-        # Three nods with slight variation
-        for i in range(4):
-            self.reachy.head.goto([0, 10, 0], duration=0.3)
-            time.sleep(0.35)
-            self.reachy.head.goto([0, -5, 0], duration=0.25)
-            time.sleep(0.3)
-        
-        # Final knowing look
-        self.reachy.head.goto([5, 5, 10], duration=0.5)
-        time.sleep(0.5)
-        self.reachy.head.goto([0, 0, 0], duration=0.4)
-        
-        logger.info("   ✅ The most automated action in corporate history!")
-    
-    def gesture_shrug(self) -> None:
-        """Gesture: Shrugging (I don't know / whatever).
-        
-        Presenter: "Can you even decide to replace me?" 
-        Robot shrugs.
+        logger.info(f"Connecting to Reachy at {self.host}...")
+        if self.connection.connect():
+            reachy = self.connection.reachy
+            logger.info(f"✅ Connected! Mode: {reachy.info.mode}")
+            logger.info(f"   Config: {reachy.info.config}")
+            return True
+        logger.error("❌ Failed to connect to Reachy")
+        logger.info("💡 Make sure Docker simulation is running:")
+        logger.info("   docker run --rm -p 6080:6080 -p 50051:50051 --name reachy2 docker.io/pollenrobotics/reachy2")
+        return False
+
+    def _load_library(self, path: Optional[str] = None) -> GestureLibrary:
+        with self.profile.phase(f"gestures {self.host}"):
+            library = GestureLibrary.load(path) if path else GestureLibrary.load()
+            if self.optimize:
+                from motion_optimizer import apply
+                apply(library)
+            return library
+
+    def _on_reconnect(self, reachy) -> None:
+        """Point the demo and its engine at the rebuilt SDK object."""
+        self.reachy = reachy
+        self.engine.call_soon(setattr, self.engine, "reachy", reachy)
+
+    @property
+    def gestures(self):
+        """The show's gestures (gestures_demo.DemoGestures) around this demo.
+
+        Looked up through REGISTRY on every use, so after a reload the keys,
+        the show cues and `demo.<gesture>()` all run the new code.
         """
-        logger.info("🎭 Gesture: SHRUG")
-        
-        if not self.reachy:
-            return
-        
-        # Both arms up in shrug
-        if self.reachy.r_arm:
-            self.reachy.r_arm.goto([30, 20, -20, -50, 0, 0, 0], duration=0.6, wait=False)
-        if self.reachy.l_arm:
-            self.reachy.l_arm.goto([30, -20, 20, -50, 0, 0, 0], duration=0.6, wait=False)
-        
-        # Head tilts (puzzled)
-        if self.reachy.head:
-            self.reachy.head.goto([15, 5, 0], duration=0.5)
-            try:
-                self.reachy.head.l_antenna.goto(20, duration=0.4)
-                self.reachy.head.r_antenna.goto(20, duration=0.4)
-            except:
-                pass
-        
-        time.sleep(1.5)
-        
-        # Hold for effect
-        time.sleep(1.0)
-        
-        # Return to neutral
-        self.reachy.goto_posture('elbow_90', duration=1.0)
-        if self.reachy.head:
-            self.reachy.head.goto([0, 0, 0], duration=0.8)
-            
-        logger.info("   ✅ It can't even want things. YOU are the one with goals.")
-    
-    def gesture_holding(self) -> None:
-        """Gesture: Arms extended, palms up (ready to hold things).
-        
-        Presenter: "AI, replace holding things for me!"
+        return REGISTRY.lookup(GESTURES)(self)
+
+    def __getattr__(self, name: str):
+        # demo.gesture_nodding() and friends come from the current gestures.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.gestures, name)
+
+    def gesture(self, name: str):
+        """Coroutine function of gesture `name`, bound to the current gestures."""
+        gestures = self.gestures
+        return functools.partial(getattr(type(gestures), name).coro, gestures)
+
+    def play(self, name: str, *args, wait: bool = True, func=None, **kwargs):
+        """Play gesture `name` (or the coroutine function `func`, taking the demo) on the engine.
+
+        Same signature as ReachyFleet.play, so callers need not know which they hold.
         """
-        logger.info("🎭 Gesture: HOLDING / receiving")
-        
-        if not self.reachy:
-            return
-            
-        # Extend arms forward with palms up
-        if self.reachy.r_arm:
-            self.reachy.r_arm.goto([10, -10, 0, -90, 0, 0, 0], duration=1.0, wait=False)
-        if self.reachy.l_arm:
-            self.reachy.l_arm.goto([10, 10, 0, -90, 0, 0, 0], duration=1.0, wait=False)
-            
-        if self.reachy.head:
-            self.reachy.head.goto([0, -10, 0], duration=0.8)  # Look at hands
-        
-        time.sleep(2.5)
-        
-        # Return to neutral
-        self.reachy.goto_posture('elbow_90', duration=1.0)
-        if self.reachy.head:
-            self.reachy.head.goto([0, 0, 0], duration=0.8)
-            
-        logger.info("   ✅ Basic manipulation - solved!")
-    
-    # =========================================================================
-    # ACT 3: THE EMOTION AMPLIFIER (Closer)
-    # =========================================================================
-    
-    def emotion_curious(self) -> None:
-        """Emotion: CURIOUS - head tilts, leans forward, antenna perked.
-        
-        Presenter: "AI, show me CURIOUS"
+        coro = func(self, *args, **kwargs) if func else self.gesture(name)(*args, **kwargs)
+        return self.engine.play(coro, wait=wait, name=name)
+
+    def refresh_library(self) -> bool:
+        """Recompile gestures.json if it changed on disk (the connection stays up).
+
+        Returns:
+            True if a new library was loaded; an invalid file keeps the old one.
         """
-        logger.info("🎭 Emotion: CURIOUS")
-        
-        if not self.reachy or not self.reachy.head:
-            return
-            
-        # Head tilts and looks interested
-        self.reachy.head.goto([20, 15, 15], duration=1.0)
-        
-        # Antennas perk up asymmetrically (curiosity)
+        mtime = os.path.getmtime(self.library.path)
+        if mtime == self._library_mtime:
+            return False
+        self._library_mtime = mtime
         try:
-            self.reachy.head.l_antenna.goto(30, duration=0.6)
-            self.reachy.head.r_antenna.goto(-5, duration=0.6)
-        except:
-            pass
-        
-        time.sleep(2)
-        logger.info("   ✅ Curiosity displayed - but only because YOU directed it.")
-    
-    def emotion_defeated(self) -> None:
-        """Emotion: DEFEATED - slumps, looks down.
-        
-        Presenter: "AI, show me DEFEATED"
-        """
-        logger.info("🎭 Emotion: DEFEATED")
-        
-        if not self.reachy:
-            return
-            
-        # Head droops
-        if self.reachy.head:
-            self.reachy.head.goto([0, -30, 0], duration=1.5)
-            try:
-                self.reachy.head.l_antenna.goto(-20, duration=1.0)
-                self.reachy.head.r_antenna.goto(-20, duration=1.0)
-            except:
-                pass
-        
-        # Arms droop slightly
-        if self.reachy.r_arm:
-            self.reachy.r_arm.goto([5, 5, 0, -100, 0, 0, 0], duration=1.5, wait=False)
-        if self.reachy.l_arm:
-            self.reachy.l_arm.goto([5, -5, 0, -100, 0, 0, 0], duration=1.5, wait=False)
-        
-        time.sleep(2)
-        logger.info("   ✅ AI can ACT defeated, but it doesn't FEEL defeated.")
-    
-    def emotion_excited(self) -> None:
-        """Emotion: EXCITED - antennas wiggle, arms up, energetic.
-        
-        Presenter: "AI, show me EXCITED"
-        """
-        logger.info("🎭 Emotion: EXCITED")
-        
-        if not self.reachy:
-            return
-        
-        # Quick arm raises
-        if self.reachy.r_arm:
-            self.reachy.r_arm.goto([40, 30, -20, -60, 0, 0, 0], duration=0.6, wait=False)
-        if self.reachy.l_arm:
-            self.reachy.l_arm.goto([40, -30, 20, -60, 0, 0, 0], duration=0.6, wait=False)
-        
-        # Head perks up
-        if self.reachy.head:
-            self.reachy.head.goto([0, 15, 0], duration=0.5)
-            
-            # Antenna wiggle!
-            try:
-                for _ in range(3):
-                    self.reachy.head.l_antenna.goto(40, duration=0.15)
-                    self.reachy.head.r_antenna.goto(-40, duration=0.15)
-                    time.sleep(0.2)
-                    self.reachy.head.l_antenna.goto(-20, duration=0.15)
-                    self.reachy.head.r_antenna.goto(20, duration=0.15)
-                    time.sleep(0.2)
-            except:
-                pass
-        
-        time.sleep(1)
-        logger.info("   ✅ Excitement performed - because YOU scripted it!")
-    
-    def emotion_listening(self) -> None:
-        """Emotion: LISTENING - tracks speaker, subtle nods.
-        
-        Presenter: "AI, show me LISTENING"
-        """
-        logger.info("🎭 Emotion: LISTENING")
-        
-        if not self.reachy or not self.reachy.head:
-            return
-            
-        # Look at speaker
-        self.reachy.head.look_at(0.5, 0.3, 0.1)
-        time.sleep(0.5)
-        
-        # Subtle nods while "listening"
-        for _ in range(3):
-            self.reachy.head.rotate_by(pitch=5, duration=0.4)
-            time.sleep(0.5)
-            self.reachy.head.rotate_by(pitch=-5, duration=0.3)
-            time.sleep(0.4)
-        
-        # Slight head tilt (engaged)
-        self.reachy.head.rotate_by(roll=8, duration=0.5)
-        
-        time.sleep(1)
-        logger.info("   ✅ Active listening - performed, not felt.")
-    
-    # =========================================================================
-    # CLOSER & UTILITIES
-    # =========================================================================
-    
-    def goodbye_wave(self) -> None:
-        """Closing gesture: A friendly wave goodbye.
-        
-        Presenter: "AI didn't replace me today. It AMPLIFIED me."
-        """
-        logger.info("🎭 GOODBYE WAVE")
-        
-        if not self.reachy:
-            return
-            
-        # Raise right arm for wave
-        if self.reachy.r_arm:
-            self.reachy.r_arm.goto([60, 30, -10, -30, 0, 0, 0], duration=1.0)
-            time.sleep(0.5)
-            
-            # Wave motion
-            for _ in range(3):
-                self.reachy.r_arm.goto([60, 40, -10, -30, 0, 20, 0], duration=0.3)
-                time.sleep(0.35)
-                self.reachy.r_arm.goto([60, 20, -10, -30, 0, -20, 0], duration=0.3)
-                time.sleep(0.35)
-        
-        # Head nods goodbye
-        if self.reachy.head:
-            self.reachy.head.goto([0, 10, 0], duration=0.5)
-            time.sleep(0.3)
-            self.reachy.head.goto([0, 0, 0], duration=0.3)
-        
-        time.sleep(1)
-        
-        # Return to rest
-        self.reachy.goto_posture('default', duration=1.5)
-        
-        logger.info("   ✅ And that's a wrap! AI, standing down.")
-    
-    def reset(self) -> None:
-        """Reset robot to limp/off state."""
-        logger.info("🔄 Resetting robot...")
-        
-        if self.reachy and self.reachy.is_connected():
-            self.reachy.turn_off_smoothly()
-            
-        logger.info("   Robot is now compliant/off.")
-    
-    def home(self) -> None:
-        """Return to home/default posture."""
-        logger.info("🏠 Going to home posture...")
-        
-        if not self.reachy:
-            return
-            
-        self.reachy.turn_on()
-        self.reachy.goto_posture('default', duration=2.0, wait=True)
-        
-        if self.reachy.head:
-            self.reachy.head.goto([0, 0, 0], duration=1.0)
-            
-        logger.info("   ✅ Home position.")
-    
+            self.library = self._load_library(self.library.path)
+        except ValueError as e:
+            logger.error(f"❌ {self.library.path}: {e} (keeping the previous gestures)")
+            return False
+        logger.info(f"🔁 Reloaded {len(list(self.library))} gestures from {self.library.path}")
+        return True
+
     def disconnect(self) -> None:
         """Clean disconnect from robot."""
+        self.connection.stop()
         if self.reachy:
             self.reset()
-            self.reachy.disconnect()
+            try:
+                self.connection.call(self.reachy.disconnect)
+            except Exception as e:
+                logger.warning(f"⚠️ Disconnect failed: {e}")
             logger.info("👋 Disconnected from Reachy.")
+        self.engine.stop()
+        self.connection.close()
+
+
+# Key bindings: the controls and the key dispatch are both built from this
+# table. Gestures are imported on first use; --reload re-reads them (and
+# gestures.json) from disk before each key while the robot stays connected.
+REGISTRY = GestureRegistry(module="gestures_demo")
+OPENER = "ACT 1: THE OPENER"
+IMPROV = "ACT 2: IMPROV DIRECTOR GESTURES"
+EMOTIONS = "ACT 3: EMOTION AMPLIFIER"
+UTILITIES = "UTILITIES"
+REGISTRY.add('1', "DemoGestures.dismissive_handwave_sequence", "Full Handwave Sequence (slump → attention)", OPENER)
+REGISTRY.add('2', "DemoGestures.snap_to_attention", "Snap to Attention only", OPENER)
+REGISTRY.add('3', "DemoGestures.gesture_boring_meeting", "Boring Meeting reaction", IMPROV)
+REGISTRY.add('4', "DemoGestures.gesture_pointing", "Pointing at screen", IMPROV)
+REGISTRY.add('5', "DemoGestures.gesture_nodding", "Nodding in agreement", IMPROV)
+REGISTRY.add('6', "DemoGestures.gesture_shrug", "Shrug (I don't know)", IMPROV)
+REGISTRY.add('7', "DemoGestures.emotion_curious", "CURIOUS emotion", EMOTIONS)
+REGISTRY.add('8', "DemoGestures.emotion_defeated", "DEFEATED emotion", EMOTIONS)
+REGISTRY.add('9', "DemoGestures.emotion_excited", "EXCITED emotion", EMOTIONS)
+REGISTRY.add('0', "DemoGestures.emotion_listening", "LISTENING emotion", EMOTIONS)
+REGISTRY.add('H', "DemoGestures.home", "Home/default posture", UTILITIES, Priority.EMERGENCY)
+REGISTRY.add('W', "DemoGestures.goodbye_wave", "Goodbye Wave (closer)", UTILITIES)
+REGISTRY.add('R', "DemoGestures.reset", "Reset (turn off)", UTILITIES, Priority.EMERGENCY)
+# A chord, so a stray key can't stop the show.
+REGISTRY.add('X+Z', "DemoGestures.freeze", "Emergency stop, hold pose (press together)", UTILITIES,
+             Priority.EMERGENCY)
 
 
 def print_controls():
     """Print the control guide."""
-    print("\n" + "=" * 60)
-    print("  'AI, Replace This' - DEMO CONTROLS")
-    print("=" * 60)
-    print("""
-  ACT 1: THE OPENER
-    1 = Full Handwave Sequence (slump → attention)
-    2 = Snap to Attention only
-    
-  ACT 2: IMPROV DIRECTOR GESTURES  
-    3 = Boring Meeting reaction
-    4 = Pointing at screen
-    5 = Nodding in agreement
-    6 = Shrug (I don't know)
-    
-  ACT 3: EMOTION AMPLIFIER
-    7 = CURIOUS emotion
-    8 = DEFEATED emotion
-    9 = EXCITED emotion
-    0 = LISTENING emotion
-    
-  UTILITIES
-    H = Home/default posture
-    W = Goodbye Wave (closer)
-    R = Reset (turn off)
-    Q = Quit demo
-    """)
-    print("=" * 60 + "\n")
+    print(REGISTRY.controls("'AI, Replace This' - DEMO CONTROLS", extra={UTILITIES: ["Q = Quit demo"]}))
 
 
 def main():
     """Main demo loop with keyboard controls."""
+    profile = StartupProfile()
+    parser = argparse.ArgumentParser(description="'AI, Replace This' Reachy 2 demo")
+    parser.add_argument("--host", nargs="+", default=["localhost"],
+                        help="Robot IP(s) or 'localhost' for the simulator; several hosts "
+                             "(or host:port) play every gesture in unison")
+    parser.add_argument("--mock", action="store_true", help="Use the offline fake robot (no Docker needed)")
+    parser.add_argument("--line-input", action="store_true",
+                        help="Read commands with input() + Enter instead of single keystrokes")
+    parser.add_argument("--serve", action="store_true",
+                        help="Start the WebSocket control server for demo.html / index.html")
+    parser.add_argument("--port", type=int, default=8765, help="Control server port (with --serve)")
+    parser.add_argument("--record", metavar="FILE",
+                        help="Record every command and sampled joint state to a binary session log")
+    parser.add_argument("--telemetry", metavar="FILE",
+                        help="Sample joints/latencies and write Prometheus metrics to FILE every second")
+    parser.add_argument("--no-idle", action="store_true",
+                        help="Keep the robot still between cues (no breathing / gaze drift)")
+    parser.add_argument("--reload", action="store_true",
+                        help="Rehearsal: re-read changed gesture code and gestures.json before each key")
+    parser.add_argument("--events", metavar="FILE",
+                        help="Write gesture, cue and command events as JSON lines (see event_log.py)")
+    parser.add_argument("--gaze", metavar="SOURCE",
+                        help="Follow the audience between cues: file:PATH, udp:[HOST:]PORT or video[:SEED]")
+    parser.add_argument("--fast-start", action="store_true",
+                        help="Prompt at once and connect/home in the background; early keys are queued")
+    parser.add_argument("--optimize", action="store_true",
+                        help="Drop redundant finish moves and unchanged stream samples from the gestures")
+    args = parser.parse_args()
+    gaze_source = None
+    if args.gaze:
+        from gaze_tracker import parse_source
+        try:
+            gaze_source = parse_source(args.gaze)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.fast_start and not args.mock:
+        prewarm_sdk(profile)
+    # Log lines are formatted and written on a listener thread, not the engine loop
+    events = EventLog(path=args.events).start()
+
     print("\n" + "🤖" * 30)
     print("\n  FROM 'AI WILL REPLACE ME' TO 'AI, REPLACE THIS'")
     print("  Reachy 2 Robot Demo Script")
     print("\n" + "🤖" * 30)
     
     # Initialize demo
-    demo = ReachyDemo(host="localhost")
-    
-    if not demo.reachy or not demo.reachy.is_connected():
+    def make_demo(host: str) -> ReachyDemo:
+        if args.mock:
+            from mock_reachy import FakeReachySDK
+            logger.info("🧪 Using the offline fake robot")
+            return ReachyDemo(host=host, reachy=FakeReachySDK(host=host), profile=profile,
+                              optimize=args.optimize)
+        return ReachyDemo(host=host, profile=profile, optimize=args.optimize)
+
+    demo = queue = sampler = recorder = server = None
+    trackers = []
+
+    def boot() -> bool:
+        """Connect, power up, home and start the services (on the startup thread with --fast-start)."""
+        nonlocal demo, queue, sampler, recorder, server
+        if len(args.host) > 1:
+            from fleet import ReachyFleet
+            robot = ReachyFleet.connect(args.host, make_demo)
+        else:
+            robot = make_demo(args.host[0])
+        if robot is None or not robot.reachy or not robot.connected:
+            return False
+        demo = robot
+        events.attach(robot.engine)
+        robots = getattr(robot, "demos", [robot])
+        for each in robots:
+            each.connection.start()
+
+        # Gestures play on the queue's worker so input stays live
+        queue = CommandQueue(robot.engine)
+        profile.watch(queue)
+        queue.start()
+        if args.fast_start:
+            # Only the power-up is waited for; homing is the first command
+            with profile.phase("motors on"):
+                for future in [each.engine.play(each.power.ensure(MOTOR_PARTS, ON), wait=False)
+                               for each in robots]:
+                    future.result()
+            queue.submit("home", robot.home)
+        else:
+            print_controls()
+            # Start in attention position
+            print("📍 Starting in default position...")
+            with profile.phase("home"):
+                robot.home()
+        if not args.no_idle:
+            for each in robots:
+                each.idle.start()
+        if gaze_source is not None:
+            from gaze_tracker import GazeTracker
+            # One source, one tracker per robot; tracking yields to every gesture
+            trackers.extend(GazeTracker(each.engine, gaze_source).start() for each in robots)
+
+        if args.serve or args.telemetry or args.record:
+            from telemetry import TelemetrySampler
+            sampler = TelemetrySampler(robot.engine, path=args.telemetry, idle=robots[0].idle,
+                                       gaze=trackers[0] if trackers else None).start()
+        if args.record:
+            from session_log import SessionRecorder
+            recorder = SessionRecorder(robot.engine, args.record, sampler=sampler).start()
+        if args.serve:
+            from control_server import ControlServer
+
+            def state() -> dict:
+                return {
+                    "connected": robot.connected,
+                    "busy": robot.engine.busy,
+                    "pending": queue.pending,
+                    "latency_ms": round(queue.latencies[-1] * 1000, 1) if queue.latencies else None,
+                }
+
+            server = ControlServer(handle_key, state, port=args.port,
+                                   metrics=sampler.prometheus if sampler else None).start()
+        return True
+
+    def dispatch(key: str, pressed_at: Optional[float] = None) -> None:
+        if args.reload:
+            REGISTRY.refresh()
+            for robot in getattr(demo, "demos", [demo]):
+                robot.refresh_library()
+        queue.submit(key, REGISTRY.action(key, demo), REGISTRY[key].priority, pressed_at=pressed_at)
+
+    def handle_key(key: str, pressed_at: Optional[float] = None) -> bool:
+        """Queue the command bound to `key` (shared by keyboard and browser)."""
+        if key not in REGISTRY:
+            return False
+        if startup is not None:
+            startup.submit(key, pressed_at)
+        else:
+            dispatch(key, pressed_at)
+        return True
+
+    startup = None
+    if args.fast_start:
+        print_controls()
+        startup = FastStart(boot, dispatch, profile).begin()
+    elif not boot():
+        events.stop()
         print("\n❌ Could not connect to robot. Exiting.")
         sys.exit(1)
-    
-    print_controls()
-    
-    # Start in attention position
-    print("📍 Starting in default position...")
-    demo.home()
-    
-    # Main control loop
+
+    keys = None
+    if not args.line_input and KeyReader.supported():
+        # Single keystrokes fire on key-down; no Enter needed
+        keys = KeyReader(chords=REGISTRY.chords()).start()
+        print("\n🎮 Press a key (or 'Q' to quit)")
+    profile.mark("prompt")
     try:
         while True:
-            key = input("\n🎮 Enter command (or 'Q' to quit): ").strip().upper()
+            if keys:
+                event = keys.read()
+                key, pressed_at = event.key, event.time
+            else:
+                key = input("\n🎮 Enter command (or 'Q' to quit): ").strip().upper()
+                pressed_at = None
             
-            if key == '1':
-                demo.dismissive_handwave_sequence()
-            elif key == '2':
-                demo.snap_to_attention()
-            elif key == '3':
-                demo.gesture_boring_meeting()
-            elif key == '4':
-                demo.gesture_pointing()
-            elif key == '5':
-                demo.gesture_nodding()
-            elif key == '6':
-                demo.gesture_shrug()
-            elif key == '7':
-                demo.emotion_curious()
-            elif key == '8':
-                demo.emotion_defeated()
-            elif key == '9':
-                demo.emotion_excited()
-            elif key == '0':
-                demo.emotion_listening()
-            elif key == 'H':
-                demo.home()
-            elif key == 'W':
-                demo.goodbye_wave()
-            elif key == 'R':
-                demo.reset()
-            elif key == 'Q':
+            if key == 'Q':
                 print("\n👋 Ending demo...")
                 break
-            else:
+            if not handle_key(key, pressed_at):
                 print("   ⚠️ Unknown command. Press H for help or Q to quit.")
                 print_controls()
                 
     except KeyboardInterrupt:
-        print("\n\n⚠️ Interrupted by user.")
+        if startup is None or not startup.failed:
+            print("\n\n⚠️ Interrupted by user.")
     finally:
-        demo.disconnect()
-        print("\n✅ Demo ended. Thanks for presenting!")
+        if keys:
+            keys.stop()
+        if startup is not None:
+            # A connect in progress cannot be abandoned; let it finish to clean up
+            startup.wait()
+        if server:
+            server.stop()
+        if sampler:
+            sampler.stop()
+        for tracker in trackers:
+            tracker.stop()
+            lag = tracker.stats()["lag_ms"]
+            if lag is not None:
+                logger.info(f"👀 Gaze lag p50 {lag['p50']:.0f} ms, p95 {lag['p95']:.0f} ms")
+        if queue is not None:
+            queue.stop()
+        if demo is not None:
+            demo.disconnect()
+        if recorder:
+            recorder.stop()
+        events.stop()
+    if startup is not None and startup.failed:
+        print("\n❌ Could not connect to robot. Exiting.")
+        sys.exit(1)
+    print("\n✅ Demo ended. Thanks for presenting!")
 
 
 if __name__ == "__main__":
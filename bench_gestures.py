@@ -0,0 +1,240 @@
+"""
+Gesture Benchmarks - Timing and call-count regression checks
+============================================================
+
+Runs every ReachyDemo gesture against the offline fake robot on a virtual
+clock and reports, per gesture:
+
+    show time     - how long the gesture takes on stage (virtual seconds)
+    calls         - number of SDK calls sent
+    idle          - time inside the gesture with no part in motion, and
+                    the longest such gap
+    overhead      - real Python time per SDK call (the virtual clock skips
+                    all waiting, so real time is pure overhead)
+    poses         - round trips saved by synchronized poses and the worst
+                    start skew between the parts of one pose
+
+Results are written as JSON. The run fails (exit code 1) when a gesture
+exceeds its time budget or sends more calls than its recorded baseline in
+bench_budgets.json.
+
+Usage:
+    python bench_gestures.py                       # run, check, write bench_results.json
+    python bench_gestures.py --only gesture_nodding
+    python bench_gestures.py --update-baseline     # accept current call counts
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from clock import VirtualClock
+from gesture_engine import PoseStats
+from mock_reachy import CommandRecord, FakeReachySDK
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGETS = os.path.join(HERE, "bench_budgets.json")
+DEFAULT_OUTPUT = os.path.join(HERE, "bench_results.json")
+
+# Every demo action, in show order.
+GESTURES = [
+    "home",
+    "slump_defeated",
+    "snap_to_attention",
+    "dismissive_handwave_sequence",
+    "gesture_boring_meeting",
+    "gesture_pointing",
+    "gesture_nodding",
+    "gesture_shrug",
+    "gesture_holding",
+    "emotion_curious",
+    "emotion_defeated",
+    "emotion_excited",
+    "emotion_listening",
+    "goodbye_wave",
+    "reset",
+]
+
+# Cue chains played back to back (each cue fired as soon as the previous
+# one returns), as during the Act 2 improv.
+CHAINS = {
+    "chain_act2_improv": [
+        "gesture_boring_meeting",
+        "gesture_pointing",
+        "gesture_nodding",
+        "gesture_shrug",
+        "gesture_holding",
+        "emotion_excited",
+    ],
+}
+
+# Gaps shorter than this between motions are not counted as idle.
+MIN_GAP = 0.05
+# How long one streamed goal update is considered "in motion".
+STREAM_PERIOD = 0.02
+
+
+def motion_intervals(records: List[CommandRecord]) -> List[Tuple[float, float]]:
+    """Time intervals during which each recorded command keeps something moving."""
+    intervals = []
+    for record in records:
+        if not record.accepted:
+            continue
+        if record.method == "send_goal_positions":
+            intervals.append((record.time, record.time + STREAM_PERIOD))
+        elif "duration" in record.kwargs:
+            intervals.append((record.time, record.time + float(record.kwargs["duration"])))
+        elif record.method == "turn_off_smoothly":
+            intervals.append((record.time, record.time + 3.0))
+    return sorted(intervals)
+
+
+def idle_gaps(intervals: List[Tuple[float, float]], start: float, end: float) -> List[float]:
+    """Gaps longer than MIN_GAP inside [start, end] not covered by any interval."""
+    gaps = []
+    cursor = start
+    for lo, hi in intervals:
+        if lo - cursor > MIN_GAP:
+            gaps.append(lo - cursor)
+        cursor = max(cursor, hi)
+    if end - cursor > MIN_GAP:
+        gaps.append(end - cursor)
+    return gaps
+
+
+def run_gesture(name: str, repeat: int = 3) -> Dict[str, Any]:
+    """Benchmark one ReachyDemo method (or a chain from CHAINS) on a fresh fake robot.
+
+    The gesture is played `repeat` times on fresh robots; timings and calls
+    come from the first run, overhead is the best of all runs.
+    """
+    from ai_replace_this_demo import ReachyDemo
+
+    steps = CHAINS.get(name, [name])
+
+    best_real = float("inf")
+    result: Dict[str, Any] = {}
+    for i in range(repeat):
+        clock = VirtualClock()
+        robot = FakeReachySDK(clock=clock)
+        demo = ReachyDemo(reachy=robot, clock=clock)
+        demo.engine.start()
+        try:
+            start = clock.monotonic()
+            real_start = time.perf_counter()
+            for step in steps:
+                getattr(demo, step)()
+            real = time.perf_counter() - real_start
+            end = clock.monotonic()
+        finally:
+            demo.engine.stop()
+        best_real = min(best_real, real)
+        if i == 0:
+            gaps = idle_gaps(motion_intervals(robot.log), start, end)
+            poses = _merge([demo.engine.pose_stats[step] for step in steps if step in demo.engine.pose_stats])
+            result = {
+                "show_time_s": round(end - start, 3),
+                "calls": len(robot.log),
+                "idle_s": round(sum(gaps), 3),
+                "max_gap_s": round(max(gaps, default=0.0), 3),
+                "poses": poses.as_dict() if poses else None,
+            }
+    result["real_time_ms"] = round(best_real * 1000, 3)
+    result["overhead_us_per_call"] = round(best_real * 1e6 / max(result["calls"], 1), 1)
+    return result
+
+
+def _merge(stats: List[PoseStats]) -> Optional[PoseStats]:
+    """Combine the pose stats of several gestures."""
+    if not stats:
+        return None
+    merged = PoseStats()
+    for item in stats:
+        merged.poses += item.poses
+        merged.parts += item.parts
+        merged.round_trips += item.round_trips
+        merged.saved += item.saved
+        merged.max_skew_ms = max(merged.max_skew_ms, item.max_skew_ms)
+    return merged
+
+
+def check(results: Dict[str, Dict[str, Any]], budgets: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Compare results with budgets; returns a list of failure messages."""
+    failures = []
+    for name, result in results.items():
+        budget = budgets.get(name)
+        if budget is None:
+            failures.append(f"{name}: no budget in bench_budgets.json")
+            continue
+        if result["show_time_s"] > budget["max_seconds"]:
+            failures.append(f"{name}: {result['show_time_s']:.2f}s exceeds budget {budget['max_seconds']:.2f}s")
+        if "calls" in budget and result["calls"] > budget["calls"]:
+            failures.append(f"{name}: {result['calls']} SDK calls, baseline is {budget['calls']}")
+    return failures
+
+
+def print_table(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"\n{'gesture':32s} {'show s':>7s} {'calls':>6s} {'idle s':>7s} {'max gap':>8s} {'µs/call':>8s}"
+          f" {'saved':>6s} {'skew µs':>8s}")
+    print("-" * 88)
+    for name, r in results.items():
+        poses = r["poses"] or {"saved": 0, "max_skew_ms": 0.0}
+        print(f"{name:32s} {r['show_time_s']:7.2f} {r['calls']:6d} {r['idle_s']:7.2f} "
+              f"{r['max_gap_s']:8.2f} {r['overhead_us_per_call']:8.1f}"
+              f" {poses['saved']:6d} {poses['max_skew_ms'] * 1000:8.1f}")
+    print()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ReachyDemo gestures against the fake robot")
+    parser.add_argument("--only", nargs="*", help="Gesture method or chain names to run (default: all)")
+    parser.add_argument("--budgets", default=DEFAULT_BUDGETS, help="Budget/baseline JSON file")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the results JSON")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per gesture for the overhead figure")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Store the measured call counts as the new baseline")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    names = args.only or GESTURES + list(CHAINS)
+    results = {name: run_gesture(name, repeat=args.repeat) for name in names}
+    print_table(results)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"generated": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=2)
+    print(f"📄 Results written to {args.output}")
+
+    budgets: Dict[str, Dict[str, Any]] = {}
+    if os.path.exists(args.budgets):
+        with open(args.budgets, "r", encoding="utf-8") as f:
+            budgets = json.load(f)
+
+    if args.update_baseline:
+        for name, result in results.items():
+            # New gestures get a 10% time allowance, rounded up to 0.1 s.
+            budgets.setdefault(name, {"max_seconds": math.ceil(result["show_time_s"] * 11) / 10})
+            budgets[name]["calls"] = result["calls"]
+        with open(args.budgets, "w", encoding="utf-8") as f:
+            json.dump(budgets, f, indent=2)
+            f.write("\n")
+        print(f"📌 Baseline updated in {args.budgets}")
+        return 0
+
+    failures = check(results, budgets)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        return 1
+    print("✅ All gestures within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Clocks - Real and virtual time sources
+======================================
+
+Everything that waits or timestamps (GestureEngine, CommandQueue, the fake
+robot) goes through a clock object instead of calling time.sleep /
+time.monotonic directly:
+
+    SystemClock   - wall-clock time, the default on stage.
+    VirtualClock  - simulated time that jumps forward instead of sleeping,
+                    so a full show runs at 100x+ speed in CI and benchmarks.
+
+Both provide monotonic(), sleep(), working() and new_event_loop(); the event
+loop from a VirtualClock runs its timers on virtual time too, and holds
+virtual time still while the loop awaits real work (an SDK call on a worker
+thread) inside working().
+
+Usage:
+    clock = VirtualClock()
+    engine = GestureEngine(reachy, clock=clock)
+    clock.sleep(3.0)          # returns immediately, clock.monotonic() += 3
+"""
+
+import asyncio
+import contextlib
+import selectors
+import threading
+import time
+from typing import Any, Iterator, List, Optional, Tuple
+
+# Real seconds a held VirtualClock loop waits for I/O before checking again.
+_HOLD_POLL_S = 0.005
+
+
+class SystemClock:
+    """Real time."""
+
+    virtual = False
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def working(self) -> contextlib.AbstractContextManager:
+        return contextlib.nullcontext()
+
+    def new_event_loop(self) -> asyncio.AbstractEventLoop:
+        return asyncio.new_event_loop()
+
+
+class VirtualClock:
+    """Simulated monotonic time that advances instead of sleeping.
+
+    Args:
+        start: Initial reading of monotonic().
+        speed: None to skip waits entirely, or a factor (e.g. 100.0) to still
+            spend `seconds / speed` of real time per wait.
+    """
+
+    virtual = True
+
+    def __init__(self, start: float = 0.0, speed: Optional[float] = None):
+        self._now = start
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._working = 0
+
+    def monotonic(self) -> float:
+        with self._lock:
+            return self._now
+
+    def advance(self, seconds: float) -> None:
+        """Move virtual time forward."""
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._now += seconds
+
+    def sleep(self, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        if self.speed:
+            time.sleep(seconds / self.speed)
+        self.advance(seconds)
+
+    @contextlib.contextmanager
+    def working(self) -> Iterator[None]:
+        """Hold virtual time on idle loops while real work (a worker-thread call) runs.
+
+        Without this an awaiting loop sees no I/O and jumps to its next timer
+        before the call has even returned.
+        """
+        with self._lock:
+            self._working += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._working -= 1
+
+    @property
+    def held(self) -> bool:
+        return self._working > 0
+
+    def new_event_loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop whose timers (asyncio.sleep, call_later) use virtual time."""
+        loop = asyncio.SelectorEventLoop(_VirtualSelector(self))
+        loop.time = self.monotonic
+        return loop
+
+
+class _VirtualSelector:
+    """Selector that turns the loop's idle wait into a jump of virtual time.
+
+    When the loop has a timer pending it asks select() to block until the
+    timer is due; instead we poll real I/O (thread-safe wakeups, sockets) and,
+    if nothing is ready, advance the clock by the requested timeout. While the
+    clock is held, it waits for real I/O in short real-time slices instead.
+    """
+
+    def __init__(self, clock: VirtualClock):
+        self._clock = clock
+        self._selector = selectors.DefaultSelector()
+
+    def select(self, timeout: Optional[float] = None) -> List[Tuple[Any, int]]:
+        if timeout is None:
+            # No timers at all: wait for real work from another thread.
+            return self._selector.select(None)
+        if self._clock.held:
+            return self._selector.select(min(timeout, _HOLD_POLL_S))
+        real = timeout / self._clock.speed if self._clock.speed else 0
+        events = self._selector.select(real)
+        if not events:
+            self._clock.advance(timeout)
+        return events
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._selector, name)
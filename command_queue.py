@@ -0,0 +1,202 @@
+"""
+Command Queue - Preemptible, prioritized demo commands
+======================================================
+
+Decouples reading keys from playing gestures. The control loop submits a
+command and immediately goes back to reading input; a worker thread pops
+commands by priority and plays them on the GestureEngine. A new command
+preempts the in-flight gesture at its next keyframe boundary, and
+EMERGENCY commands (Home, Reset) also flush queued robot motion and drop
+any stale pending commands.
+
+Every command logs its keypress-to-motion latency (time from submit to the
+first SDK call its own gesture makes; idle motion, gaze tracking and other
+background calls don't count) and warns when it exceeds the latency budget.
+
+Usage:
+    queue = CommandQueue(demo.engine)
+    queue.start()
+    queue.submit('5', demo.gesture_nodding)
+    queue.submit('R', demo.reset, Priority.EMERGENCY)
+    queue.stop()
+"""
+
+import concurrent.futures
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, List, Optional
+
+from event_log import event
+from gesture_engine import GestureEngine
+
+logger = logging.getLogger(__name__)
+
+# Keypress-to-motion budget; slower commands are logged as warnings.
+DEFAULT_LATENCY_BUDGET = 0.100
+
+
+class Priority(IntEnum):
+    """Command priority; higher values are served first."""
+
+    GESTURE = 0
+    EMERGENCY = 10
+
+
+@dataclass(order=True)
+class Command:
+    """A queued demo command."""
+
+    sort_key: tuple = field(init=False, repr=False)
+    key: str = field(compare=False)
+    action: Callable[..., Any] = field(compare=False)
+    priority: Priority = field(default=Priority.GESTURE, compare=False)
+    submitted_at: float = field(default=0.0, compare=False)
+    seq: int = field(default=0, compare=False)
+    latency: Optional[float] = field(default=None, compare=False)
+
+    def __post_init__(self) -> None:
+        self.sort_key = (-int(self.priority), self.seq)
+
+
+# The command whose action is running. Set on the worker thread around the
+# action, so the gesture tasks it plays inherit it and idle, gaze and other
+# background dispatches don't.
+_command: contextvars.ContextVar[Optional[Command]] = contextvars.ContextVar("command", default=None)
+
+
+class CommandQueue:
+    """Priority queue of commands played on a GestureEngine by a worker thread."""
+
+    def __init__(self, engine: GestureEngine, latency_budget: float = DEFAULT_LATENCY_BUDGET):
+        """Create a queue bound to an engine.
+
+        Args:
+            engine: Engine whose in-flight gesture gets preempted.
+            latency_budget: Keypress-to-motion budget in seconds.
+        """
+        self.engine = engine
+        self.latency_budget = latency_budget
+        self.latencies: List[float] = []
+        # Called as listener(command) on the first motion of each command.
+        self.listeners: List[Callable[[Command], None]] = []
+        self._heap: List[Command] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._active: Optional[Command] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        engine.listeners.append(self._on_dispatch)
+
+    # -------------------------------------------------------------------------
+    # Producer side
+    # -------------------------------------------------------------------------
+
+    def submit(self, key: str, action: Callable[..., Any],
+               priority: Priority = Priority.GESTURE,
+               pressed_at: Optional[float] = None) -> Command:
+        """Queue a command and preempt whatever is playing.
+
+        Args:
+            key: Key (or name) that triggered the command, used in logs.
+            action: Gesture method; called with `wait=False`.
+            priority: EMERGENCY commands jump the queue and flush motion.
+            pressed_at: Engine-clock time of the key event (defaults to now).
+        """
+        command = Command(key=key, action=action, priority=priority,
+                          submitted_at=pressed_at if pressed_at is not None else self.engine.clock.monotonic(),
+                          seq=next(self._seq))
+        # Before the push: the worker may start the new command as soon as it is
+        # queued, and the emergency flush must reach the loop ahead of it.
+        self.engine.preempt(emergency=priority >= Priority.EMERGENCY)
+        with self._cond:
+            if priority >= Priority.EMERGENCY:
+                dropped = len(self._heap)
+                self._heap.clear()
+                if dropped:
+                    logger.info(f"   🧹 Dropped {dropped} pending command(s)")
+            heapq.heappush(self._heap, command)
+            self._cond.notify()
+        event("command", "queued", key=key, priority=priority.name)
+        return command
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    # -------------------------------------------------------------------------
+    # Worker side
+    # -------------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the worker thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="command-queue", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Drop pending commands, preempt the current gesture and stop the worker."""
+        with self._cond:
+            self._running = False
+            self._heap.clear()
+            self._cond.notify()
+        self.engine.preempt()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _next(self) -> Optional[Command]:
+        with self._cond:
+            while self._running and not self._heap:
+                self._cond.wait()
+            if not self._running:
+                return None
+            return heapq.heappop(self._heap)
+
+    def _run(self) -> None:
+        while True:
+            command = self._next()
+            if command is None:
+                return
+            with self._cond:
+                self._active = command
+            token = _command.set(command)
+            try:
+                future = command.action(wait=False)
+                if self.pending:
+                    # Something arrived while this command was starting up.
+                    self.engine.preempt()
+                if isinstance(future, concurrent.futures.Future):
+                    concurrent.futures.wait([future])
+            except Exception as e:
+                logger.error(f"❌ Command {command.key} failed: {e}")
+            finally:
+                _command.reset(token)
+                with self._cond:
+                    self._active = None
+            if command.latency is None:
+                logger.debug(f"   Command {command.key} sent no motion")
+
+    def _on_dispatch(self, part: str, method: str, sent_at: float) -> None:
+        """Engine listener: the first SDK call of a command's own gesture closes its latency."""
+        command = _command.get()
+        if command is None or command.latency is not None or method == "cancel_all_goto":
+            return
+        command.latency = sent_at - command.submitted_at
+        self.latencies.append(command.latency)
+        event("command", "motion", key=command.key, latency_ms=round(command.latency * 1000, 2))
+        for listener in self.listeners:
+            listener(command)
+        ms = command.latency * 1000
+        if command.latency > self.latency_budget:
+            logger.warning(f"   ⏱️ [{command.key}] keypress→motion {ms:.0f} ms "
+                           f"(budget {self.latency_budget * 1000:.0f} ms)")
+        else:
+            logger.info(f"   ⏱️ [{command.key}] keypress→motion {ms:.0f} ms")
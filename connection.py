@@ -0,0 +1,350 @@
+"""
+Connection - Robot link with heartbeat, auto-reconnect and call deadlines
+=========================================================================
+
+Owns the ReachySDK object for one robot and keeps three promises:
+
+    - liveness is cached: a background heartbeat polls `is_connected()`
+      (itself under a deadline) every HEARTBEAT_S, so `connected` never
+      blocks on a stalled link;
+    - a lost link is re-established with exponential backoff (plus jitter),
+      building a fresh SDK object; `listeners` are told about the new one;
+    - every SDK call runs on a worker thread under a deadline (DEADLINES per
+      method, DEFAULT_DEADLINE otherwise). A hung gRPC request raises
+      CallTimeout after the deadline instead of freezing the show, and calls
+      made while the link is down fail fast with ConnectionDown.
+
+`stats()` counts calls, timeouts, errors, skipped calls and reconnects.
+
+Usage:
+    connection = ConnectionManager("10.0.0.11")
+    if connection.connect():
+        connection.start()
+        connection.call(connection.reachy.turn_on)
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_S = 1.0
+# Consecutive failed heartbeats before the link is declared down.
+HEARTBEAT_MISSES = 2
+CONNECT_TIMEOUT_S = 5.0
+BACKOFF_MIN_S = 0.5
+BACKOFF_MAX_S = 8.0
+
+DEFAULT_DEADLINE = 1.0
+# SDK calls that legitimately take longer than a goal update.
+DEADLINES: Dict[str, float] = {
+    "turn_on": 3.0,
+    "turn_off": 3.0,
+    "turn_off_smoothly": 5.0,
+    "disconnect": 2.0,
+}
+
+# Workers for SDK calls; a hung call holds one until it returns.
+_WORKERS = 4
+
+
+class CallTimeout(TimeoutError):
+    """An SDK call did not return before its deadline."""
+
+
+class ConnectionDown(ConnectionError):
+    """The robot link is down; the call was not attempted."""
+
+
+def build_sdk(host: str) -> Any:
+    """Connect a ReachySDK to 'host' or 'host:port' (several simulators on one machine)."""
+    from reachy2_sdk import ReachySDK
+
+    name, _, port = host.partition(":")
+    if port:
+        return ReachySDK(host=name, sdk_port=int(port))
+    return ReachySDK(host=host)
+
+
+class ConnectionManager:
+    """Cached liveness, reconnection and deadlines for one robot."""
+
+    def __init__(self, host: str, reachy: Any = None,
+                 factory: Optional[Callable[[str], Any]] = build_sdk,
+                 heartbeat: float = HEARTBEAT_S):
+        """Wrap a robot link (call connect() unless `reachy` is given).
+
+        Args:
+            host: Robot address ('host' or 'host:port').
+            reachy: Already-built SDK object (e.g. the fake robot); it is
+                re-polled but never rebuilt.
+            factory: Builds a new SDK object for `host` (None: never rebuild).
+            heartbeat: Seconds between liveness checks.
+        """
+        self.host = host
+        self.reachy = reachy
+        self.factory = factory if reachy is None else None
+        self.heartbeat = heartbeat
+        # Called as listener(reachy) from the heartbeat thread after a reconnect.
+        self.listeners: List[Callable[[Any], None]] = []
+        self._alive = False
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=_WORKERS, thread_name_prefix="sdk-call")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._down_since: Optional[float] = None
+        self.counters: Dict[str, int] = {"calls": 0, "timeouts": 0, "errors": 0, "skipped": 0,
+                                         "reconnects": 0, "reconnect_attempts": 0, "heartbeat_misses": 0}
+        self.heartbeat_rtt = 0.0
+        self.down_s = 0.0
+        if reachy is not None:
+            self._alive = self._poll()
+
+    # -------------------------------------------------------------------------
+    # Liveness
+    # -------------------------------------------------------------------------
+
+    @property
+    def connected(self) -> bool:
+        """Last known link state (never blocks)."""
+        return self.reachy is not None and self._alive
+
+    def connect(self) -> bool:
+        """Build the SDK object and check the link once (bounded by CONNECT_TIMEOUT_S)."""
+        self._alive = self._open() if self.factory is not None else self._poll()
+        return self._alive
+
+    def _open(self) -> bool:
+        try:
+            reachy = self._pool.submit(self.factory, self.host).result(timeout=CONNECT_TIMEOUT_S)
+        except concurrent.futures.TimeoutError:
+            logger.error(f"❌ {self.host}: no answer within {CONNECT_TIMEOUT_S:.0f}s")
+            return False
+        except Exception as e:
+            logger.error(f"❌ Connection error: {e}")
+            return False
+        self.reachy = reachy
+        return self._poll()
+
+    def _poll(self) -> bool:
+        if self.reachy is None:
+            return False
+        started = time.perf_counter()
+        try:
+            alive = bool(self._submit(self.reachy.is_connected).result(timeout=DEFAULT_DEADLINE))
+        except Exception:
+            alive = False
+        self.heartbeat_rtt = time.perf_counter() - started
+        return alive
+
+    def start(self) -> "ConnectionManager":
+        """Start the heartbeat thread (idempotent)."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="heartbeat", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=DEFAULT_DEADLINE + self.heartbeat)
+            self._thread = None
+
+    def _run(self) -> None:
+        misses = 0
+        while not self._stop.wait(self.heartbeat):
+            if self._poll():
+                misses = 0
+                self._mark(True)
+                continue
+            misses += 1
+            self.counters["heartbeat_misses"] += 1
+            if misses >= HEARTBEAT_MISSES:
+                self._mark(False)
+                self._reconnect()
+                misses = 0
+
+    def _mark(self, alive: bool) -> None:
+        with self._lock:
+            if alive == self._alive:
+                return
+            self._alive = alive
+            now = time.monotonic()
+            if alive:
+                self.down_s += now - (self._down_since or now)
+                self._down_since = None
+                logger.info(f"🔌 {self.host}: link is back")
+            else:
+                self._down_since = now
+                logger.warning(f"⚠️ {self.host}: link lost, reconnecting")
+
+    def _reconnect(self) -> None:
+        delay = BACKOFF_MIN_S
+        while not self._stop.is_set():
+            self.counters["reconnect_attempts"] += 1
+            old = self.reachy
+            if self._open() if self.factory is not None else self._poll():
+                if old is not None and old is not self.reachy:
+                    self._pool.submit(_quietly, getattr(old, "disconnect", None))
+                self.counters["reconnects"] += 1
+                self._mark(True)
+                for listener in self.listeners:
+                    listener(self.reachy)
+                return
+            logger.info(f"   🔌 {self.host}: retrying in {delay:.1f}s")
+            self._stop.wait(delay * random.uniform(0.8, 1.2))
+            delay = min(BACKOFF_MAX_S, delay * 2)
+
+    # -------------------------------------------------------------------------
+    # Calls under a deadline
+    # -------------------------------------------------------------------------
+
+    def _submit(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> concurrent.futures.Future:
+        return self._pool.submit(func, *args, **kwargs)
+
+    def _deadline(self, func: Callable[..., Any], deadline: Optional[float]) -> float:
+        return deadline if deadline is not None else DEADLINES.get(getattr(func, "__name__", ""),
+                                                                   DEFAULT_DEADLINE)
+
+    def call(self, func: Callable[..., Any], *args: Any, deadline: Optional[float] = None, **kwargs: Any) -> Any:
+        """Run an SDK call on a worker thread and wait at most its deadline.
+
+        Raises:
+            ConnectionDown: If the link is known to be down.
+            CallTimeout: If the call did not return in time (it keeps running
+                in the background; its result is dropped).
+        """
+        if not self._alive:
+            self.counters["skipped"] += 1
+            raise ConnectionDown(f"{self.host} is not connected")
+        self.counters["calls"] += 1
+        seconds = self._deadline(func, deadline)
+        future = self._submit(func, *args, **kwargs)
+        try:
+            return future.result(timeout=seconds)
+        except concurrent.futures.TimeoutError:
+            self.counters["timeouts"] += 1
+            raise CallTimeout(f"{getattr(func, '__name__', 'call')} took longer than {seconds:.1f}s") from None
+        except Exception:
+            self.counters["errors"] += 1
+            raise
+
+    async def acall(self, func: Callable[..., Any], *args: Any, deadline: Optional[float] = None,
+                    **kwargs: Any) -> Any:
+        """call() for coroutines: awaits the worker instead of blocking the loop.
+
+        The deadline is real time (a watchdog thread), not loop time: on a
+        VirtualClock loop, time jumps while the loop waits.
+
+        Raises:
+            ConnectionDown: If the link is known to be down.
+            CallTimeout: If the call did not return in time.
+        """
+        if not self._alive:
+            self.counters["skipped"] += 1
+            raise ConnectionDown(f"{self.host} is not connected")
+        self.counters["calls"] += 1
+        seconds = self._deadline(func, deadline)
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        future = self._submit(func, *args, **kwargs)
+        future.add_done_callback(functools.partial(_post, loop, _resolve, waiter))
+        _WATCHDOG.watch(time.monotonic() + seconds, loop, waiter,
+                        f"{getattr(func, '__name__', 'call')} took longer than {seconds:.1f}s")
+        try:
+            return await waiter
+        except CallTimeout:
+            self.counters["timeouts"] += 1
+            raise
+        except Exception:
+            self.counters["errors"] += 1
+            raise
+
+    def close(self) -> None:
+        """Stop the heartbeat and release the worker threads (hung calls are abandoned)."""
+        self.stop()
+        self._pool.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        down = self.down_s + (time.monotonic() - self._down_since if self._down_since else 0.0)
+        return {"connected": self.connected, **self.counters,
+                "heartbeat_rtt_ms": round(self.heartbeat_rtt * 1000, 2), "down_s": round(down, 2)}
+
+
+class _Watchdog:
+    """Fails awaited calls whose real-time deadline has passed (one thread for all loops)."""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, asyncio.AbstractEventLoop, asyncio.Future, str]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, at: float, loop: asyncio.AbstractEventLoop, waiter: asyncio.Future, message: str) -> None:
+        """Raise CallTimeout(message) in `waiter` at time.monotonic() `at`, unless it is done by then."""
+        with self._cond:
+            heapq.heappush(self._heap, (at, next(self._seq), loop, waiter, message))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="call-watchdog", daemon=True)
+                self._thread.start()
+            elif self._heap[0][3] is waiter:
+                self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                _, _, loop, waiter, message = heapq.heappop(self._heap)
+            if not waiter.done():
+                _post(loop, _expire, waiter, message)
+
+
+_WATCHDOG = _Watchdog()
+
+
+def _post(loop: asyncio.AbstractEventLoop, callback: Callable[..., None], *args: Any) -> None:
+    """Run callback(*args) on `loop` from any thread (dropped if the loop is closed)."""
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        pass
+
+
+def _resolve(waiter: asyncio.Future, future: concurrent.futures.Future) -> None:
+    if waiter.done():
+        return
+    if future.cancelled():
+        waiter.cancel()
+    elif future.exception() is not None:
+        waiter.set_exception(future.exception())
+    else:
+        waiter.set_result(future.result())
+
+
+def _expire(waiter: asyncio.Future, message: str) -> None:
+    if not waiter.done():
+        waiter.set_exception(CallTimeout(message))
+
+
+def _quietly(func: Optional[Callable[[], Any]]) -> None:
+    if func is None:
+        return
+    try:
+        func()
+    except Exception as e:
+        logger.debug(f"   Closing the old link failed: {e}")
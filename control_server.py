@@ -0,0 +1,407 @@
+"""
+Control Server - WebSocket/HTTP remote control for ReachyDemo
+=============================================================
+
+Embedded asyncio server (standard library only) so the browser can drive
+the robot: demo.html buttons and the Reveal.js slides in index.html send
+keys over a WebSocket instead of the operator alt-tabbing to the terminal.
+
+    GET /ws          WebSocket (JSON messages, see below)
+    GET /state       current state as JSON
+    GET /metrics     telemetry in Prometheus text format (when enabled)
+    GET /<file>      static files from this folder (index.html, demo.html)
+
+Client -> server:
+    {"type": "key", "key": "5"}            same keys as the terminal
+    {"type": "ping", "t": <client time>}
+
+Server -> clients (broadcast to every connected browser):
+    {"type": "state", ...}                 on connect, after every command and
+                                           periodically while clients are connected
+    {"type": "ack", "key": "5", "accepted": true, "server_ms": 0.2}
+    {"type": "pong", "t": <echoed>}
+    {"type": "error", "error": "..."}      to the sender of a malformed message
+
+Commands go through the same handler as the keyboard (and so through the
+preemptible CommandQueue); the server never waits for a gesture, so its
+own overhead per command is the time to parse a frame and queue it -
+reported as `server_ms` in every ack.
+
+Only pages served by this server may open the WebSocket: a handshake whose
+Origin is another site is refused (403), so a page elsewhere can't drive the
+robot through the operator's browser. Every request must also name this
+server in its Host header - a loopback name, the bound address or one of
+`allowed_hosts` - so a DNS-rebinding page (whose Origin and Host both carry
+the attacker's domain) is refused too. Unmasked client frames close the
+connection (1002), as do frames over MAX_FRAME bytes (1009).
+
+Usage:
+    python ai_replace_this_demo.py --serve            # ws://localhost:8765/ws
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+STATE_INTERVAL = 0.5
+# Largest client message (a key or a ping is a few dozen bytes).
+MAX_FRAME = 4096
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_STATIC_ROOT = os.path.dirname(os.path.abspath(__file__))
+_STATIC_TYPES = {".html", ".css", ".js", ".json", ".png", ".jpg", ".svg", ".ico"}
+
+OP_CONT, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+CLOSE_PROTOCOL_ERROR, CLOSE_TOO_BIG = 1002, 1009
+
+_LOOPBACK = {"localhost", "127.0.0.1", "::1"}
+_WILDCARD = {"", "0.0.0.0", "::"}
+
+
+class WebSocket:
+    """Minimal server-side RFC 6455 connection (text frames, ping/pong, close)."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.peer = writer.get_extra_info("peername")
+        self._send_lock = asyncio.Lock()
+
+    async def recv(self) -> Optional[str]:
+        """Next text message, or None once the connection is closed."""
+        message = bytearray()
+        while True:
+            try:
+                head = await self.reader.readexactly(2)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return None
+            fin, opcode = head[0] & 0x80, head[0] & 0x0F
+            masked, length = head[1] & 0x80, head[1] & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await self.reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+            if length + len(message) > MAX_FRAME:
+                logger.warning(f"⚠️ {self.peer}: {length} byte frame exceeds {MAX_FRAME}, closing")
+                await self._send_frame(OP_CLOSE, struct.pack("!H", CLOSE_TOO_BIG))
+                return None
+            if not masked:
+                # RFC 6455 5.1: every client frame is masked.
+                logger.warning(f"⚠️ {self.peer}: unmasked frame, closing")
+                await self._send_frame(OP_CLOSE, struct.pack("!H", CLOSE_PROTOCOL_ERROR))
+                return None
+            mask = await self.reader.readexactly(4)
+            payload = _unmask(await self.reader.readexactly(length), mask)
+
+            if opcode == OP_CLOSE:
+                await self._send_frame(OP_CLOSE, payload[:2])
+                return None
+            if opcode == OP_PING:
+                await self._send_frame(OP_PONG, payload)
+                continue
+            if opcode == OP_PONG:
+                continue
+            message += payload
+            if fin:
+                return message.decode("utf-8", errors="replace")
+
+    async def send(self, text: str) -> None:
+        await self._send_frame(OP_TEXT, text.encode("utf-8"))
+
+    async def _send_frame(self, opcode: int, payload: bytes) -> None:
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        async with self._send_lock:
+            self.writer.write(header + payload)
+            await self.writer.drain()
+
+
+def _unmask(payload: bytes, mask: bytes) -> bytes:
+    """XOR a client payload with its 4-byte mask (one big-integer XOR, not a byte loop)."""
+    length = len(payload)
+    key = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+
+
+def _endpoint(netloc: str) -> Tuple[str, Optional[int]]:
+    """(hostname, port) of a 'host[:port]' string, loopback aliases folded together."""
+    parts = urlsplit(f"//{netloc}")
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    host = (parts.hostname or "").lower()
+    return ("localhost" if host in _LOOPBACK else host), port
+
+
+def _known_host(host: str, allowed: Set[str], port: int) -> bool:
+    """True if a Host header names this server: an allowed name on its port."""
+    name, given = _endpoint(host)
+    return name in allowed and given in (None, port)
+
+
+def _same_origin(origin: Optional[str], host: str) -> bool:
+    """True if a handshake's Origin is a page served from `host` (the Host header).
+
+    Clients that send no Origin (scripts, not browsers) are allowed.
+    """
+    if origin is None:
+        return True
+    parts = urlsplit(origin)
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return False
+    return _endpoint(parts.netloc) == _endpoint(host)
+
+
+class ControlServer:
+    """Serves the control WebSocket on its own thread and event loop."""
+
+    def __init__(self, on_key: Callable[[str, Optional[float]], bool],
+                 state: Callable[[], Dict[str, Any]],
+                 host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 metrics: Optional[Callable[[], str]] = None, allowed_hosts: Iterable[str] = ()):
+        """Create the server (call start()).
+
+        Args:
+            on_key: Handler shared with the keyboard: on_key(key, pressed_at)
+                queues the command and returns False for unknown keys.
+            state: Returns a JSON-serialisable snapshot pushed to clients.
+            host: Interface to bind (loopback by default).
+            port: TCP port (0 picks a free one, stored in `port` once bound).
+            metrics: Returns Prometheus text served at /metrics (optional).
+            allowed_hosts: Extra names clients may reach the server by (e.g.
+                the machine's LAN address when binding 0.0.0.0); loopback
+                names and `host` are always allowed.
+        """
+        self.on_key = on_key
+        self.state = state
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        # A wildcard bind address is not a name a client can reach us by.
+        self.allowed_hosts = {"localhost"} | {("localhost" if name in _LOOPBACK else name.lower())
+                                             for name in (host, *allowed_hosts) if name not in _WILDCARD}
+        self.clients: Set[WebSocket] = set()
+        self.commands = 0
+        self.server_ms: list = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._push_task: Optional[asyncio.Task] = None
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def start(self) -> "ControlServer":
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="control-server", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5.0)
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+
+        async def _shutdown() -> None:
+            # Closing the sockets ends every connection handler normally
+            # (cancelling them would trip asyncio's client_connected_cb check).
+            if self._server is not None:
+                self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            self._push_task.cancel()
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            if tasks:
+                await asyncio.wait(tasks, timeout=1.0)
+            asyncio.get_running_loop().stop()
+
+        if self._thread.is_alive():
+            asyncio.run_coroutine_threadsafe(_shutdown(), self._loop)
+            self._thread.join(timeout=2.0)
+        self._loop = None
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port))
+        except OSError as e:
+            logger.error(f"❌ Control server could not bind {self.host}:{self.port}: {e}")
+            self._ready.set()
+            return
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"🌐 Control server on http://{self.host}:{self.port}/demo.html (ws://{self.host}:{self.port}/ws)")
+        self._ready.set()
+        self._push_task = self._loop.create_task(self._push_state())
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.close()
+
+    # -------------------------------------------------------------------------
+    # HTTP / WebSocket handling
+    # -------------------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._writers.add(writer)
+        try:
+            await self._serve(reader, writer)
+        finally:
+            self._writers.discard(writer)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+
+        lines = request.decode("latin-1").split("\r\n")
+        try:
+            method, path, _ = lines[0].split(" ", 2)
+        except ValueError:
+            writer.close()
+            return
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        path = path.split("?", 1)[0]
+        if not _known_host(headers.get("host", ""), self.allowed_hosts, self.port):
+            logger.warning(f"⚠️ Refused request for host {headers.get('host')!r}")
+            self._respond(writer, 403, "text/plain", b"Unknown host")
+        elif path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+            await self._websocket(reader, writer, headers)
+            return
+        elif method == "GET" and path == "/state":
+            self._respond(writer, 200, "application/json", json.dumps(self.state()).encode())
+        elif method == "GET" and path == "/metrics" and self.metrics is not None:
+            self._respond(writer, 200, "text/plain; version=0.0.4", self.metrics().encode())
+        elif method == "GET":
+            self._static(writer, path)
+        else:
+            self._respond(writer, 405, "text/plain", b"Method not allowed")
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    def _respond(self, writer: asyncio.StreamWriter, status: int, content_type: str, body: bytes) -> None:
+        reason = {200: "OK", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed"}.get(status, "")
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+
+    def _static(self, writer: asyncio.StreamWriter, path: str) -> None:
+        name = os.path.normpath(path.lstrip("/") or "index.html")
+        full = os.path.join(_STATIC_ROOT, name)
+        if (name.startswith("..") or os.path.splitext(name)[1] not in _STATIC_TYPES
+                or not os.path.isfile(full)):
+            self._respond(writer, 404, "text/plain", b"Not found")
+            return
+        with open(full, "rb") as f:
+            body = f.read()
+        self._respond(writer, 200, mimetypes.guess_type(full)[0] or "application/octet-stream", body)
+
+    async def _websocket(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                         headers: Dict[str, str]) -> None:
+        origin = headers.get("origin")
+        if not _same_origin(origin, headers.get("host", "")):
+            logger.warning(f"⚠️ Refused WebSocket from origin {origin}")
+            self._respond(writer, 403, "text/plain", b"Forbidden origin")
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+            writer.close()
+            return
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        await writer.drain()
+
+        ws = WebSocket(reader, writer)
+        self.clients.add(ws)
+        logger.info(f"🌐 Browser connected ({len(self.clients)} client(s))")
+        try:
+            await ws.send(json.dumps({"type": "state", **self.state()}))
+            while True:
+                text = await ws.recv()
+                if text is None:
+                    break
+                await self._on_message(ws, text)
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(ws)
+            logger.info(f"🌐 Browser disconnected ({len(self.clients)} client(s))")
+            writer.close()
+
+    async def _on_message(self, ws: WebSocket, text: str) -> None:
+        received = time.monotonic()
+        try:
+            message = json.loads(text)
+        except json.JSONDecodeError:
+            await ws.send(json.dumps({"type": "error", "error": "invalid JSON"}))
+            return
+        if not isinstance(message, dict):
+            await ws.send(json.dumps({"type": "error", "error": "expected a JSON object"}))
+            return
+        kind = message.get("type")
+        if kind == "ping":
+            await ws.send(json.dumps({"type": "pong", "t": message.get("t")}))
+        elif kind == "key":
+            key = str(message.get("key", "")).strip().upper()
+            accepted = bool(key) and self.on_key(key, received)
+            server_ms = (time.monotonic() - received) * 1000
+            self.commands += 1
+            self.server_ms.append(server_ms)
+            await ws.send(json.dumps({"type": "ack", "key": key, "accepted": accepted,
+                                      "server_ms": round(server_ms, 3)}))
+            await self.broadcast({"type": "state", **self.state()})
+
+    async def broadcast(self, message: Dict[str, Any]) -> None:
+        """Send a message to every connected client, dropping dead ones."""
+        if not self.clients:
+            return
+        text = json.dumps(message)
+        clients = list(self.clients)
+        results = await asyncio.gather(*(ws.send(text) for ws in clients), return_exceptions=True)
+        for ws, result in zip(clients, results):
+            if isinstance(result, Exception):
+                self.clients.discard(ws)
+
+    async def _push_state(self) -> None:
+        while True:
+            await asyncio.sleep(STATE_INTERVAL)
+            if self.clients:
+                await self.broadcast({"type": "state", **self.state()})
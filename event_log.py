@@ -0,0 +1,287 @@
+"""
+Event Log - Off-thread logging and machine-readable show events
+===============================================================
+
+Log calls made on the engine loop (every gesture logs a few lines) must not
+wait on a terminal or a disk. EventLog replaces logging.basicConfig with:
+
+    - a QueueHandler on the root logger: the calling thread only stamps the
+      record and enqueues it, nothing is formatted or written there;
+    - a QueueListener thread that formats the console lines (same format as
+      before) and, with a path, appends one JSON object per record to a
+      .jsonl file.
+
+Every record carries the monotonic time of the engine clock (`mono`), the
+gesture it was logged from (`gesture`, `gesture_id`, one id per play) and
+the show cue, if any. `event()` adds structured records that only go to the
+file, with a `phase`:
+
+    gesture   start / motion (first SDK command) / end / cancelled
+    cue       fired / landed (show timeline, offsets from plan in ms)
+    command   queued / motion (key press to first motion)
+
+`python event_log.py show.jsonl` turns a file into per-gesture and per-cue
+timing tables after the show.
+
+Usage:
+    events = EventLog(path="show.jsonl").start()
+    events.attach(demo.engine)
+    event("cue", "fired", cue="slump", fired_ms=0.4)
+    events.stop()   # flushes
+"""
+
+import argparse
+import contextlib
+import contextvars
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+CONSOLE_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Structured events go to this logger; it is silent until an EventLog starts.
+_events = logging.getLogger("events")
+_events.setLevel(logging.WARNING)
+_events.propagate = True
+
+_gesture: contextvars.ContextVar[str] = contextvars.ContextVar("event_gesture", default="")
+_gesture_id: contextvars.ContextVar[int] = contextvars.ContextVar("event_gesture_id", default=0)
+_cue: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("event_cue", default=None)
+_ids = itertools.count(1)
+
+
+def event(kind: str, phase: str, **fields: Any) -> None:
+    """Record a structured event (no-op unless an EventLog is running)."""
+    if _events.isEnabledFor(logging.INFO):
+        _events.info(f"{kind} {phase}", extra={"event": kind, "phase": phase, "fields": fields})
+
+
+@contextlib.contextmanager
+def gesture_span(name: str, cue: Optional[str] = None) -> Iterator[int]:
+    """Tag everything logged inside with a new gesture id; logs start/end/cancelled events.
+
+    Yields:
+        The gesture id.
+    """
+    gesture_id = next(_ids)
+    tokens = [_gesture.set(name), _gesture_id.set(gesture_id)]
+    if cue is not None:
+        tokens.append(_cue.set(cue))
+    event("gesture", "start")
+    phase = "cancelled"
+    try:
+        yield gesture_id
+        phase = "end"
+    finally:
+        event("gesture", phase)
+        for var, token in zip((_gesture, _gesture_id, _cue), tokens):
+            var.reset(token)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records as they are: formatting happens on the listener thread."""
+
+    def __init__(self, q: "queue.SimpleQueue[logging.LogRecord]", clock: Callable[[], float]):
+        super().__init__(q)
+        self.clock = clock
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.mono = self.clock()
+        record.gesture = _gesture.get()
+        record.gesture_id = _gesture_id.get()
+        record.cue = _cue.get()
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "mono": round(getattr(record, "mono", 0.0), 6),
+            "wall": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "gesture": getattr(record, "gesture", "") or None,
+            "gesture_id": getattr(record, "gesture_id", 0) or None,
+            "cue": getattr(record, "cue", None),
+        }
+        if hasattr(record, "event"):
+            data.update(event=record.event, phase=record.phase, **record.fields)
+        else:
+            data["msg"] = record.getMessage()
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _NotEvent(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not hasattr(record, "event")
+
+
+class EventLog:
+    """Queue-based logging setup with an optional JSON-lines event file."""
+
+    def __init__(self, level: int = logging.INFO, path: Optional[str] = None,
+                 clock: Optional[Any] = None):
+        """Configure (call start()).
+
+        Args:
+            level: Console level.
+            path: JSON-lines file for every record and event (optional).
+            clock: Source of `mono` timestamps (engine clock; time.monotonic if None).
+        """
+        self.level = level
+        self.path = path
+        self.clock = clock
+        self._queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self._handler = _QueueHandler(self._queue, self._monotonic)
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._file: Optional[logging.Handler] = None
+        self._motion_seen = 0
+
+    def _monotonic(self) -> float:
+        return self.clock.monotonic() if self.clock is not None else time.monotonic()
+
+    def start(self) -> "EventLog":
+        """Route the root logger through the queue (replaces existing handlers)."""
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        console.setLevel(self.level)
+        console.addFilter(_NotEvent())
+        handlers: List[logging.Handler] = [console]
+        if self.path:
+            self._file = logging.FileHandler(self.path, mode="w", encoding="utf-8")
+            self._file.setFormatter(JsonFormatter())
+            handlers.append(self._file)
+            _events.setLevel(logging.INFO)
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self._handler)
+        root.setLevel(self.level)
+        self._listener = logging.handlers.QueueListener(self._queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+        return self
+
+    def attach(self, engine: Any) -> "EventLog":
+        """Stamp records with `engine.clock` and log each gesture's first SDK command."""
+        self.clock = engine.clock
+        engine.listeners.append(self._on_dispatch)
+        return self
+
+    def _on_dispatch(self, part: str, method: str, sent_at: float) -> None:
+        gesture_id = _gesture_id.get()
+        if gesture_id and gesture_id != self._motion_seen:
+            self._motion_seen = gesture_id
+            event("gesture", "motion", part=part, method=method, at=sent_at)
+
+    def stop(self) -> None:
+        """Flush the queue and close the file (logging falls back to stderr)."""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._listener = None
+        root = logging.getLogger()
+        root.removeHandler(self._handler)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        _events.setLevel(logging.WARNING)
+        logging.basicConfig(level=self.level, format=CONSOLE_FORMAT)
+
+
+# =============================================================================
+# Reports
+# =============================================================================
+
+def load(path: str) -> List[Dict[str, Any]]:
+    """Records of a JSON-lines event file, in order."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Per-gesture and per-cue timing from the events of a show.
+
+    Returns:
+        {"gestures": [...], "cues": [...], "commands": [...]}; times in
+        seconds from the first record, delays in ms.
+    """
+    # Records logged before attach() carry another clock: time from the first event.
+    t0 = next((record["mono"] for record in records if "event" in record), 0.0)
+    gestures: Dict[int, Dict[str, Any]] = {}
+    started: Dict[int, float] = {}
+    cues: List[Dict[str, Any]] = []
+    commands: List[Dict[str, Any]] = []
+    for record in records:
+        kind, phase = record.get("event"), record.get("phase")
+        if kind == "gesture":
+            gesture_id = record["gesture_id"]
+            row = gestures.setdefault(gesture_id, {
+                "id": gesture_id, "gesture": record["gesture"], "cue": record["cue"],
+                "start_s": None, "motion_ms": None, "duration_s": None, "outcome": None})
+            if phase == "start":
+                started[gesture_id] = record["mono"]
+                row["start_s"] = round(record["mono"] - t0, 3)
+            elif phase == "motion" and gesture_id in started and row["motion_ms"] is None:
+                row["motion_ms"] = round((record.get("at", record["mono"]) - started[gesture_id]) * 1000, 2)
+            elif phase in ("end", "cancelled") and gesture_id in started:
+                row["duration_s"] = round(record["mono"] - started[gesture_id], 3)
+                row["outcome"] = phase
+        elif kind == "cue" and phase == "fired":
+            cues.append({"cue": record["cue_id"], "act": record.get("act"), "planned_s": record["planned_s"],
+                         "fired_ms": record["fired_ms"], "landed_ms": None})
+        elif kind == "cue" and phase == "landed":
+            for row in reversed(cues):
+                if row["cue"] == record["cue_id"]:
+                    row["landed_ms"] = record["landed_ms"]
+                    break
+        elif kind == "command" and phase == "queued":
+            commands.append({"key": record["key"], "queued_s": round(record["mono"] - t0, 3), "latency_ms": None})
+        elif kind == "command" and phase == "motion":
+            for row in reversed(commands):
+                if row["key"] == record["key"] and row["latency_ms"] is None:
+                    row["latency_ms"] = record["latency_ms"]
+                    break
+    return {"gestures": list(gestures.values()), "cues": cues, "commands": commands}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Timing report from a JSON-lines event file")
+    parser.add_argument("path", help="Event file written with --events")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    summary = summarize(load(args.path))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    print(f"\n{'id':>4s} {'gesture':32s} {'cue':10s} {'start s':>8s} {'motion ms':>10s} {'dur s':>7s}  outcome")
+    for row in summary["gestures"]:
+        motion = "" if row["motion_ms"] is None else f"{row['motion_ms']:10.1f}"
+        duration = "" if row["duration_s"] is None else f"{row['duration_s']:7.2f}"
+        print(f"{row['id']:4d} {row['gesture']:32s} {row['cue'] or '':10s} {row['start_s'] or 0:8.2f} "
+              f"{motion:>10s} {duration:>7s}  {row['outcome'] or ''}")
+    if summary["cues"]:
+        print(f"\n{'cue':12s} {'act':10s} {'planned s':>9s} {'fired ms':>9s} {'landed ms':>10s}")
+        for row in summary["cues"]:
+            landed = "" if row["landed_ms"] is None else f"{row['landed_ms']:10.1f}"
+            print(f"{row['cue']:12s} {row['act'] or '':10s} {row['planned_s']:9.2f} {row['fired_ms']:9.1f} {landed}")
+    if summary["commands"]:
+        print(f"\n{'key':4s} {'queued s':>9s} {'key→motion ms':>14s}")
+        for row in summary["commands"]:
+            latency = "" if row["latency_ms"] is None else f"{row['latency_ms']:14.1f}"
+            print(f"{row['key']:4s} {row['queued_s']:9.2f} {latency}")
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
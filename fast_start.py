@@ -0,0 +1,198 @@
+"""
+Fast Start - Overlapped startup and a time-to-first-cue breakdown
+=================================================================
+
+The plain startup is serial: banner, `import reachy2_sdk` inside the
+connect, the gRPC connection, gesture compilation, then a 2 s homing move
+(wait=True) before the operator gets a prompt. After a crash on stage all
+of that stands between the presenter and the next cue. With --fast-start:
+
+    - the SDK import starts on a thread before anything else, so the
+      connect only finds it in sys.modules;
+    - gestures.json compiles while the link comes up (every ReachyDemo
+      does this) and fleet robots connect in parallel;
+    - the prompt is shown at once; the demo boots on a "startup" thread
+      and keys pressed before it is ready are held and queued, in order,
+      the moment it is;
+    - only the motor power-up is waited for: homing is queued as the first
+      command, and an early key takes over from it like any other.
+
+StartupProfile times each phase from launch; the breakdown is logged at
+the first cue (and each phase goes to the event log as a "startup" event).
+
+Usage:
+    profile = StartupProfile()
+    prewarm_sdk(profile)
+    startup = FastStart(boot, dispatch, profile).begin()
+    startup.submit("5")     # held until boot() returns True
+"""
+
+import _thread
+import contextlib
+import importlib
+import logging
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from event_log import event
+
+logger = logging.getLogger(__name__)
+
+SDK_MODULE = "reachy2_sdk"
+
+
+class StartupProfile:
+    """Start and end of each startup phase, in seconds from launch."""
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = time.monotonic() if started is None else started
+        self.phases: List[Tuple[str, float, float]] = []
+        self.marks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._reported = False
+
+    def now(self) -> float:
+        return time.monotonic() - self.started
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the block as phase `name` (thread-safe; phases may overlap)."""
+        start = self.now()
+        try:
+            yield
+        finally:
+            end = self.now()
+            with self._lock:
+                self.phases.append((name, start, end))
+            event("startup", name, start_s=round(start, 4), end_s=round(end, 4))
+
+    def mark(self, name: str) -> None:
+        """Record a milestone ("prompt", "ready", "first cue") the first time it happens."""
+        with self._lock:
+            if name in self.marks:
+                return
+            self.marks[name] = at = self.now()
+        event("startup", name, at_s=round(at, 4))
+
+    def watch(self, queue: Any) -> None:
+        """Mark the first motion of homing and of the first cue on a CommandQueue."""
+
+        def on_motion(command: Any) -> None:
+            if command.key == "home":
+                self.mark("home moving")
+                return
+            self.mark("first cue")
+            if not self._reported:
+                self._reported = True
+                logger.info(self.report())
+
+        queue.listeners.append(on_motion)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"phases": [{"name": name, "start_s": round(start, 4), "end_s": round(end, 4)}
+                               for name, start, end in self.phases],
+                    "marks": {name: round(at, 4) for name, at in self.marks.items()}}
+
+    def report(self) -> str:
+        """Phases and milestones in start order."""
+        with self._lock:
+            rows = [(start, f"   {name:22s} {start:6.2f} → {end:6.2f} s  ({(end - start) * 1000:7.1f} ms)")
+                    for name, start, end in self.phases]
+            rows += [(at, f"   {name:22s} {at:6.2f} s") for name, at in self.marks.items()]
+            first = self.marks.get("first cue")
+        title = f"🚀 Startup breakdown (first cue at {first:.2f} s)" if first is not None else "🚀 Startup breakdown"
+        return "\n".join([title] + [row for _, row in sorted(rows)])
+
+
+def prewarm_sdk(profile: StartupProfile) -> threading.Thread:
+    """Import the robot SDK on a thread (a missing SDK is left to the connect to report)."""
+
+    def run() -> None:
+        with profile.phase("sdk import"):
+            try:
+                importlib.import_module(SDK_MODULE)
+            except ImportError:
+                pass
+
+    thread = threading.Thread(target=run, name="sdk-import", daemon=True)
+    thread.start()
+    return thread
+
+
+class FastStart:
+    """Boots the demo on a thread while the prompt already takes keys."""
+
+    def __init__(self, boot: Callable[[], bool], dispatch: Callable[[str, Optional[float]], Any],
+                 profile: StartupProfile):
+        """Prepare a background boot (call begin()).
+
+        Args:
+            boot: Connects and starts everything; returns False if no robot connected.
+            dispatch: Queues a key once booted: dispatch(key, pressed_at).
+            profile: Where the "boot" phase and the "ready" mark go.
+        """
+        self.boot = boot
+        self.dispatch = dispatch
+        self.profile = profile
+        self.ready = False
+        self.failed = False
+        self._held: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def begin(self) -> "FastStart":
+        self._thread = threading.Thread(target=self._run, name="startup", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        try:
+            with self.profile.phase("boot"):
+                ok = self.boot()
+        except Exception as e:
+            logger.error(f"❌ Startup failed: {e}")
+            ok = False
+        with self._lock:
+            held, self._held = self._held, []
+            if ok:
+                self.profile.mark("ready")
+                # Under the lock, so a key pressed meanwhile lands after the early ones.
+                for key, pressed_at in held:
+                    self.dispatch(key, pressed_at)
+                self.ready = True
+            else:
+                self.failed = True
+        self._done.set()
+        if not ok:
+            _interrupt_main()
+            return
+        logger.info(f"🚀 Ready {self.profile.now():.2f} s after launch"
+                    + (f", playing {len(held)} early command(s)" if held else ""))
+
+    def submit(self, key: str, pressed_at: Optional[float] = None) -> None:
+        """Queue `key` now if booted, else hold it until boot finishes."""
+        with self._lock:
+            if self.ready:
+                self.dispatch(key, pressed_at)
+                return
+            if self.failed:
+                return
+            self._held.append((key, time.monotonic() if pressed_at is None else pressed_at))
+        logger.info(f"   ⏳ [{key}] queued until the robot is ready")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until boot finished; True if it succeeded."""
+        self._done.wait(timeout)
+        return self.ready
+
+
+def _interrupt_main() -> None:
+    """Wake the prompt (blocked in input() or a key read) with a KeyboardInterrupt."""
+    if hasattr(signal, "pthread_kill"):
+        signal.pthread_kill(threading.main_thread().ident, signal.SIGINT)
+    else:
+        _thread.interrupt_main()
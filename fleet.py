@@ -0,0 +1,254 @@
+"""
+Fleet - Drive several Reachy robots in unison
+=============================================
+
+Holds one ReachyDemo (and so one GestureEngine loop thread) per robot and
+fans every gesture out to all of them at once. Each robot's gesture is
+scheduled on its own loop for the same absolute start time on the shared
+monotonic clock, a few milliseconds in the future, so robots start together
+instead of one after another.
+
+For every gesture the fleet reports how far each robot's first command
+landed from the common start time. A robot that disconnects or fails a
+gesture is dropped from the next fan-outs (and retried whenever it reports
+being connected again); the rest of the show goes on.
+
+The fleet looks like a single ReachyDemo to the rest of the script:
+`fleet.gesture_nodding(wait=False)` returns one Future for all robots, and
+`fleet.engine` preempts, reports busy and notifies listeners for all of
+them (per-robot tools such as telemetry use the first robot).
+
+Usage:
+    python ai_replace_this_demo.py --host 10.0.0.11 10.0.0.12
+    python ai_replace_this_demo.py --mock --host a b c
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# How far ahead the common start time is set; covers scheduling on N loops.
+SYNC_MARGIN = 0.02
+
+
+class _FanList(list):
+    """Listener list whose append/remove also apply to every robot's engine."""
+
+    def __init__(self, targets: List[List[Any]]):
+        super().__init__()
+        self._targets = targets
+
+    def append(self, item: Any) -> None:
+        super().append(item)
+        for target in self._targets:
+            target.append(item)
+
+    def remove(self, item: Any) -> None:
+        super().remove(item)
+        for target in self._targets:
+            if item in target:
+                target.remove(item)
+
+
+class FleetEngine:
+    """GestureEngine facade over every robot's engine."""
+
+    def __init__(self, engines: List[Any]):
+        self.engines = engines
+        self.primary = engines[0]
+        self.clock = self.primary.clock
+        self.listeners = _FanList([e.listeners for e in engines])
+        self.ack_listeners = _FanList([e.ack_listeners for e in engines])
+
+    def __getattr__(self, name: str) -> Any:
+        # Per-robot tools (telemetry, recording, show timeline) use the first robot.
+        return getattr(self.primary, name)
+
+    @property
+    def busy(self) -> bool:
+        return any(engine.busy for engine in self.engines)
+
+    def preempt(self, emergency: bool = False) -> bool:
+        return any([engine.preempt(emergency=emergency) for engine in self.engines])
+
+    def stop(self) -> None:
+        for engine in self.engines:
+            engine.stop()
+
+
+class ReachyFleet:
+    """Several ReachyDemo instances driven as one."""
+
+    def __init__(self, demos: List[Any]):
+        """Wrap connected demos (see ReachyFleet.connect)."""
+        if not demos:
+            raise ValueError("a fleet needs at least one robot")
+        self.demos = demos
+        self.engine = FleetEngine([demo.engine for demo in demos])
+        self.down: Dict[str, str] = {}
+        # name -> {host: first-command offset from the common start, in ms}
+        self.reports: Dict[str, Dict[str, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, hosts: List[str], make_demo: Callable[[str], Any]) -> Optional["ReachyFleet"]:
+        """Build one demo per host, keeping only the robots that connected.
+
+        Args:
+            hosts: Robot addresses ('host' or 'host:port').
+            make_demo: Builds a ReachyDemo for a host.
+
+        Returns:
+            The fleet, or None if no robot connected.
+        """
+        demos = []
+        # Connect all robots at once: startup takes the slowest link, not the sum.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(hosts), thread_name_prefix="connect") as pool:
+            built = list(pool.map(make_demo, hosts))
+        for host, demo in zip(hosts, built):
+            if demo.reachy and demo.connected:
+                demos.append(demo)
+            else:
+                logger.warning(f"⚠️ {host}: not connected, leaving it out of the fleet")
+        if not demos:
+            return None
+        fleet = cls(demos)
+        logger.info(f"🤖 Fleet of {len(demos)} robot(s): {', '.join(d.host for d in demos)}")
+        return fleet
+
+    # -------------------------------------------------------------------------
+    # ReachyDemo look-alike
+    # -------------------------------------------------------------------------
+
+    @property
+    def primary(self) -> Any:
+        return self.demos[0]
+
+    @property
+    def reachy(self) -> Any:
+        return self.primary.reachy
+
+    @property
+    def connected(self) -> bool:
+        return any(demo.connected for demo in self.demos)
+
+    @property
+    def host(self) -> str:
+        return ",".join(demo.host for demo in self.demos)
+
+    def __getattr__(self, name: str) -> Any:
+        if "demos" not in self.__dict__ or name.startswith("_"):
+            raise AttributeError(name)
+        method = getattr(type(self.primary.gestures), name, None)
+        if method is None or not hasattr(method, "coro"):
+            raise AttributeError(name)
+
+        def fan_out(*args: Any, wait: bool = True, **kwargs: Any) -> Any:
+            return self.play(name, *args, wait=wait, **kwargs)
+
+        fan_out.__name__ = name
+        return fan_out
+
+    def disconnect(self) -> None:
+        for demo in self.demos:
+            try:
+                demo.disconnect()
+            except Exception as e:
+                logger.warning(f"⚠️ {demo.host}: disconnect failed: {e}")
+
+    # -------------------------------------------------------------------------
+    # Fan-out
+    # -------------------------------------------------------------------------
+
+    def alive(self) -> List[Any]:
+        """Robots that take part in the next gesture."""
+        alive = []
+        for demo in self.demos:
+            if demo.reachy and demo.connected:
+                if self.down.pop(demo.host, None) is not None:
+                    logger.info(f"🤖 {demo.host} is back")
+                alive.append(demo)
+            elif demo.host not in self.down:
+                self.down[demo.host] = "disconnected"
+                logger.warning(f"⚠️ {demo.host} dropped out; continuing with the others")
+        return alive
+
+    def play(self, name: str, *args: Any, wait: bool = True,
+             func: Optional[Callable[..., Awaitable[Any]]] = None, **kwargs: Any) -> Any:
+        """Start gesture `name` on every live robot at one common start time.
+
+        `func` plays a gesture coroutine function (taking the demo) instead
+        of the demo's gesture `name` (e.g. one from gesture_registry).
+
+        Returns:
+            None when wait=True, otherwise a Future done once every robot is.
+        """
+        demos = self.alive()
+        combined: concurrent.futures.Future = concurrent.futures.Future()
+        if not demos:
+            combined.set_result(None)
+            return None if wait else combined
+
+        start_at = self.engine.clock.monotonic() + SYNC_MARGIN
+        first: Dict[str, Optional[float]] = {demo.host: None for demo in demos}
+        remaining = [len(demos)]
+
+        def finished(demo: Any, future: concurrent.futures.Future) -> None:
+            if not future.cancelled() and future.exception() is not None:
+                self.down.setdefault(demo.host, str(future.exception()))
+                logger.warning(f"⚠️ {demo.host}: {name} failed ({future.exception()}); "
+                               "continuing with the others")
+            with self._lock:
+                remaining[0] -= 1
+                done = remaining[0] == 0
+            if done:
+                self._report(name, start_at, first)
+                combined.set_result(None)
+
+        for demo in demos:
+            coro = func(demo, *args, **kwargs) if func else demo.gesture(name)(*args, **kwargs)
+            listener = self._first_command(demo, first)
+            demo.engine.listeners.append(listener)
+            future = demo.engine.play(_at(demo.engine, start_at, coro), wait=False, name=name)
+            future.add_done_callback(self._on_done(demo, listener, finished))
+        if wait:
+            combined.result()
+            return None
+        return combined
+
+    @staticmethod
+    def _on_done(demo: Any, listener: Callable[..., None],
+                 finished: Callable[[Any, concurrent.futures.Future], None]) -> Callable[..., None]:
+        def callback(future: concurrent.futures.Future) -> None:
+            demo.engine.listeners.remove(listener)
+            finished(demo, future)
+        return callback
+
+    @staticmethod
+    def _first_command(demo: Any, first: Dict[str, Optional[float]]) -> Callable[[str, str, float], None]:
+        def listener(part: str, method: str, sent_at: float) -> None:
+            if first[demo.host] is None:
+                first[demo.host] = sent_at
+        return listener
+
+    def _report(self, name: str, start_at: float, first: Dict[str, Optional[float]]) -> None:
+        offsets = {host: None if t is None else (t - start_at) * 1000 for host, t in first.items()}
+        self.reports[name] = offsets
+        measured = [v for v in offsets.values() if v is not None]
+        if len(measured) > 1:
+            detail = ", ".join(f"{host} {v:+.1f}" for host, v in offsets.items() if v is not None)
+            logger.info(f"   🤖 {name}: start skew {max(measured) - min(measured):.1f} ms ({detail} ms)")
+
+
+async def _at(engine: Any, start_at: float, coro: Awaitable[Any]) -> Any:
+    """Wait for the common start time on this robot's loop, then play."""
+    try:
+        await engine.sleep(start_at - engine.clock.monotonic())
+    except asyncio.CancelledError:
+        coro.close()
+        raise
+    return await coro
@@ -0,0 +1,511 @@
+"""
+Gaze Tracker - Follow the audience with the head
+================================================
+
+The gestures point the head at fixed stage coordinates. GazeTracker keeps
+the head on a moving target instead, fed by a pluggable source:
+
+    FileSource      replays a recorded track ("t x y z" or JSON lines)
+    UdpSource       datagrams from a pose/face tracker ("x y z" or JSON)
+    VideoSource     stand-in for a recorded video: a person wandering
+                    through the audience, seen by a detector at 30 fps with
+                    detection latency, noise and missed frames
+
+Sources run on their own threads and only publish their newest target (one
+reference assignment), so the engine loop reads a target without ever
+waiting on a file, a socket or a detector.
+
+On the engine loop, at a steady `rate_hz` (30 Hz default):
+
+    - an alpha-beta filter smooths the targets and predicts them
+      LOOKAHEAD_S ahead (covering detection and command latency);
+    - the point goes through the engine's cached look_at IK (head_ik) and
+      the head joints move at most MAX_SPEED_DPS towards it;
+    - the pose is streamed as one send_goal_positions (skipped when it
+      moved less than DEADBAND_DEG).
+
+While it runs the tracker claims the head (`engine.claims`), so IdleMotion
+leaves the head to it and keeps only the antennas alive.
+
+Like IdleMotion it never competes with real motion: ticks are skipped while
+a gesture plays, the head track is held, the robot is settling or the link
+is down, and tracking resumes from the present pose. Targets older than
+STALE_S are not followed. `stats()` reports the end-to-end lag, from a
+target's capture to the first commanded pose that used it.
+
+Usage:
+    tracker = GazeTracker(engine, parse_source("udp:5005")).start()   # 127.0.0.1 only
+    tracker = GazeTracker(engine, parse_source("udp:0.0.0.0:5005")).start()   # from the LAN
+    print(tracker.stats())
+    tracker.stop()
+
+    python gaze_tracker.py video --seconds 10     # against the fake robot
+"""
+
+import abc
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+from clock import SystemClock
+from gesture_engine import GestureEngine
+from motion_generators import noise
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE_HZ = 30.0
+# Head joint speed limit while tracking.
+MAX_SPEED_DPS = 90.0
+DEADBAND_DEG = 0.1
+
+# Alpha-beta filter gains (position, velocity) and how far ahead it aims.
+ALPHA = 0.5
+BETA = 0.1
+LOOKAHEAD_S = 0.08
+# Longest extrapolation past the newest target.
+MAX_PREDICT_S = 0.25
+STALE_S = 1.0
+
+# UdpSource's bind address when the spec names none (LAN needs it explicit).
+DEFAULT_UDP_HOST = "127.0.0.1"
+
+# Lag samples kept for stats().
+LAG_WINDOW = 1024
+# Owner name of the head in engine.claims while tracking.
+CLAIM = "gaze"
+
+
+@dataclass
+class Target:
+    """A gaze target (metres, robot frame) and the engine-clock time it was captured."""
+
+    x: float
+    y: float
+    z: float
+    stamp: float
+
+
+# =============================================================================
+# Sources
+# =============================================================================
+
+class TargetSource(abc.ABC):
+    """Base class: a thread that publishes the newest target; readers never wait."""
+
+    name = "source"
+
+    def __init__(self):
+        self.clock: Any = SystemClock()
+        self.updates = 0
+        self.errors = 0
+        self._latest: Optional[Target] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def latest(self) -> Optional[Target]:
+        """Newest target (a plain attribute read; safe from any thread)."""
+        return self._latest
+
+    def publish(self, x: float, y: float, z: float, stamp: Optional[float] = None) -> None:
+        self._latest = Target(float(x), float(y), float(z), self.clock.monotonic() if stamp is None else stamp)
+        self.updates += 1
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "TargetSource":
+        """Start reading on a background thread (idempotent)."""
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._guarded, name=f"gaze-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _guarded(self) -> None:
+        try:
+            self._run()
+        except Exception as e:
+            logger.error(f"❌ Gaze source {self.name} stopped: {e}")
+
+    @abc.abstractmethod
+    def _run(self) -> None:
+        """Read targets and publish() them until `_stop` is set (source thread)."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"source": self.name, "updates": self.updates, "errors": self.errors}
+
+
+def parse_point(text: str) -> Dict[str, float]:
+    """Parse '{"x": .., "y": .., "z": .., "t": ..}' or 't x y z' / 'x y z' (commas allowed).
+
+    Raises:
+        ValueError: If the text is not a point.
+    """
+    text = text.strip()
+    if text.startswith("{"):
+        data = json.loads(text)
+        return {key: float(data[key]) for key in ("t", "x", "y", "z") if key in data}
+    values = [float(v) for v in text.replace(",", " ").split()]
+    if len(values) == 3:
+        return dict(zip("xyz", values))
+    if len(values) == 4:
+        return dict(zip("txyz", values))
+    raise ValueError(f"expected 3 or 4 numbers, got {len(values)}")
+
+
+class FileSource(TargetSource):
+    """Replays a recorded target track with its original timing."""
+
+    name = "file"
+
+    def __init__(self, path: str, loop: bool = False):
+        """Replay `path` (call start()).
+
+        Args:
+            path: One point per line; lines without 't' are played 1/30 s apart.
+            loop: Start over at the end of the file.
+        """
+        super().__init__()
+        self.path = path
+        self.loop = loop
+
+    def _run(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as f:
+            points = []
+            for line in f:
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                try:
+                    points.append(parse_point(line))
+                except (ValueError, KeyError) as e:
+                    self.errors += 1
+                    logger.debug(f"   {self.path}: skipping {line.strip()!r}: {e}")
+        if not points:
+            logger.warning(f"⚠️ {self.path}: no gaze targets")
+            return
+        while not self._stop.is_set():
+            started = self.clock.monotonic()
+            t0 = points[0].get("t", 0.0)
+            for i, point in enumerate(points):
+                delay = started + point.get("t", t0 + i / 30.0) - t0 - self.clock.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    return
+                if all(key in point for key in "xyz"):
+                    self.publish(point["x"], point["y"], point["z"])
+            if not self.loop:
+                return
+
+
+class UdpSource(TargetSource):
+    """Targets from UDP datagrams (one point each), stamped on arrival.
+
+    Listens on loopback unless given a host: a tracker on another machine
+    needs an explicit address (e.g. 0.0.0.0), since anyone who can reach
+    the port can steer the head.
+    """
+
+    name = "udp"
+
+    def __init__(self, port: int, host: str = DEFAULT_UDP_HOST):
+        super().__init__()
+        self.host = host
+        self.port = port
+
+    def _run(self) -> None:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.bind((self.host, self.port))
+            # Wake up regularly to notice stop()
+            sock.settimeout(0.2)
+            logger.info(f"👀 Gaze targets on udp://{self.host}:{self.port}")
+            while not self._stop.is_set():
+                try:
+                    data, _ = sock.recvfrom(4096)
+                except socket.timeout:
+                    continue
+                try:
+                    point = parse_point(data.decode("utf-8"))
+                    self.publish(point["x"], point["y"], point["z"])
+                except (ValueError, KeyError, UnicodeDecodeError):
+                    self.errors += 1
+
+
+class VideoSource(TargetSource):
+    """Recorded-video stand-in: a face wandering through the audience, seen by a detector.
+
+    Each frame is captured at `fps`, "detected" `latency` seconds later
+    with `jitter_m` of noise, and missed with probability `dropout`. Targets
+    carry the capture time, so the tracker's lag includes the detector's.
+    """
+
+    name = "video"
+
+    def __init__(self, fps: float = 30.0, latency: float = 0.04, jitter_m: float = 0.01,
+                 dropout: float = 0.05, seed: Optional[int] = None, duration: float = 60.0):
+        super().__init__()
+        self.fps = fps
+        self.latency = latency
+        self.jitter_m = jitter_m
+        self.dropout = dropout
+        self.duration = duration
+        self._rng = random.Random(seed)
+        # Audience plane 1.5-2.5 m out, 2 m wide, heads 0.2-0.5 m above the robot's
+        t = np.arange(0.0, duration, 1.0 / fps)
+        wander = noise(t, np.array([0.5, 1.0, 0.15]), smoothness=3.0, seed=self._rng.randrange(1 << 30))
+        self._track = wander + np.array([2.0, 0.0, 0.35])
+
+    def _run(self) -> None:
+        started = self.clock.monotonic()
+        frame = 0
+        while not self._stop.is_set():
+            captured = started + frame / self.fps
+            delay = captured + self.latency - self.clock.monotonic()
+            if delay > 0 and self._stop.wait(delay):
+                return
+            if self._rng.random() >= self.dropout:
+                x, y, z = self._track[frame % len(self._track)]
+                j = self.jitter_m
+                self.publish(x + self._rng.gauss(0, j), y + self._rng.gauss(0, j), z + self._rng.gauss(0, j),
+                             stamp=captured)
+            frame += 1
+
+
+def parse_source(spec: str) -> TargetSource:
+    """Build a source from 'file:PATH', 'udp:PORT', 'udp:HOST:PORT' or 'video[:SEED]'.
+
+    'udp:PORT' listens on loopback only; give a HOST to listen on the LAN.
+
+    Raises:
+        ValueError: If the spec names no known source.
+    """
+    kind, _, rest = spec.partition(":")
+    if kind == "file" and rest:
+        return FileSource(rest)
+    if kind == "udp" and rest:
+        host, _, port = rest.rpartition(":")
+        return UdpSource(int(port), host or DEFAULT_UDP_HOST)
+    if kind == "video":
+        return VideoSource(seed=int(rest) if rest else None)
+    raise ValueError(f"unknown gaze source {spec!r} (file:PATH, udp:[HOST:]PORT or video[:SEED])")
+
+
+# =============================================================================
+# Filter and tracker
+# =============================================================================
+
+class AlphaBetaFilter:
+    """Constant-velocity alpha-beta filter on 3D points, with bounded prediction."""
+
+    def __init__(self, alpha: float = ALPHA, beta: float = BETA):
+        self.alpha = alpha
+        self.beta = beta
+        self.position: Optional[np.ndarray] = None
+        self.velocity = np.zeros(3)
+        self.t = 0.0
+
+    def update(self, point: np.ndarray, t: float) -> None:
+        if self.position is None:
+            self.position, self.velocity, self.t = point.copy(), np.zeros(3), t
+            return
+        dt = t - self.t
+        if dt <= 0.0:
+            return
+        predicted = self.position + self.velocity * dt
+        residual = point - predicted
+        self.position = predicted + self.alpha * residual
+        self.velocity = self.velocity + (self.beta / dt) * residual
+        self.t = t
+
+    def predict(self, t: float) -> np.ndarray:
+        return self.position + self.velocity * min(max(t - self.t, 0.0), MAX_PREDICT_S)
+
+    def reset(self) -> None:
+        self.position = None
+
+
+class GazeTracker:
+    """Streams head poses that follow a TargetSource at a steady rate."""
+
+    def __init__(self, engine: GestureEngine, source: TargetSource, rate_hz: float = DEFAULT_RATE_HZ,
+                 max_speed_dps: float = MAX_SPEED_DPS, lookahead: float = LOOKAHEAD_S):
+        """Create a tracker (call start()).
+
+        Args:
+            engine: Engine whose loop runs the ticks and whose look_at cache solves the IK.
+            source: Where targets come from (started and stopped with the tracker).
+            rate_hz: Control rate.
+            max_speed_dps: Head joint speed limit.
+            lookahead: How far ahead of the newest target the filter aims.
+        """
+        self.engine = engine
+        self.source = source
+        self.rate_hz = rate_hz
+        self.max_speed_dps = max_speed_dps
+        self.lookahead = lookahead
+        self.filter = AlphaBetaFilter()
+        self._task: Optional[asyncio.Task] = None
+        self._pose: Optional[np.ndarray] = None
+        self._seen: Optional[Target] = None
+        self._lags: Deque[float] = deque(maxlen=LAG_WINDOW)
+        self._started_at: Optional[float] = None
+        self.ticks = 0
+        self.sent = 0
+        self.used = 0
+        self.stale = 0
+        self.yields = 0
+        self.max_tick_s = 0.0
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> "GazeTracker":
+        """Start the source and the control loop (idempotent)."""
+        self.source.clock = self.engine.clock
+        self.source.start()
+        self.engine.start()
+        self.engine.call_soon(self._spawn)
+        return self
+
+    def _spawn(self) -> None:
+        if not self.running:
+            self._started_at = self.engine.clock.monotonic()
+            self.engine.claims["head"] = CLAIM
+            self._task = asyncio.ensure_future(self._run())
+            self._task.add_done_callback(self._release)
+
+    def _release(self, task: asyncio.Task) -> None:
+        if self.engine.claims.get("head") == CLAIM:
+            del self.engine.claims["head"]
+
+    def stop(self) -> None:
+        """Stop following (the head keeps its last pose) and stop the source."""
+        self.engine.call_soon(lambda: self._task.cancel() if self._task is not None else None)
+        self.source.stop()
+
+    # -------------------------------------------------------------------------
+    # Ticks
+    # -------------------------------------------------------------------------
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.rate_hz
+        joints = {"head": self.engine.joints("head")}
+        next_tick = loop.time()
+        while True:
+            next_tick = max(next_tick + period, loop.time())
+            await self.engine.sleep(next_tick - loop.time())
+            await self._tick(self.engine.clock.monotonic(), joints)
+
+    async def _tick(self, now: float, joints: Dict[str, List[Any]]) -> None:
+        started = time.perf_counter()
+        self.ticks += 1
+        target = self.source.latest()
+        if target is None:
+            return
+        fresh = target is not self._seen
+        if fresh:
+            self._seen = target
+            self.filter.update(np.array([target.x, target.y, target.z]), target.stamp)
+        if now - target.stamp > STALE_S:
+            self.stale += 1
+            return
+        if not self.engine.idle_for("head", now=now):
+            if self._pose is not None:
+                self.yields += 1
+            self._pose = None
+            return
+        if self._pose is None:
+            present = self.engine.present("head")
+            if present is None:
+                return
+            self._pose = np.array(present)
+
+        aim = self.filter.predict(now + self.lookahead)
+        solution = await self.engine.solve_look_at(*aim)
+        if solution is None:
+            return
+        goal = np.array(solution)
+        step = self.max_speed_dps / self.rate_hz
+        pose = self._pose + np.clip(goal - self._pose, -step, step)
+        if np.max(np.abs(pose - self._pose)) >= DEADBAND_DEG:
+            await self.engine.stream({"head": pose.tolist()}, joints)
+            self._pose = pose
+            self.sent += 1
+        if fresh:
+            # The target is in the commanded pose (or the head is already there)
+            self.used += 1
+            self._lags.append(self.engine.clock.monotonic() - target.stamp)
+        self.max_tick_s = max(self.max_tick_s, time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """Lag from target capture to commanded pose, rate and yields."""
+        elapsed = self.engine.clock.monotonic() - self._started_at if self._started_at is not None else 0.0
+        lags = np.array(self._lags) * 1000 if self._lags else None
+        return {
+            "running": self.running,
+            **self.source.stats(),
+            "ticks": self.ticks,
+            "rate_hz": round(self.ticks / elapsed, 2) if elapsed > 0 else 0.0,
+            "sent": self.sent,
+            "targets_used": self.used,
+            "stale": self.stale,
+            "yields": self.yields,
+            "lag_ms": None if lags is None else {
+                "mean": round(float(lags.mean()), 2),
+                "p50": round(float(np.percentile(lags, 50)), 2),
+                "p95": round(float(np.percentile(lags, 95)), 2),
+                "max": round(float(lags.max()), 2),
+            },
+            "max_tick_us": round(self.max_tick_s * 1e6, 1),
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Follow a gaze source with the fake robot and report lag")
+    parser.add_argument("source", help="file:PATH, udp:[HOST:]PORT or video[:SEED]")
+    parser.add_argument("--seconds", type=float, default=10.0, help="How long to track")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE_HZ, help="Control rate (Hz)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    from mock_reachy import FakeReachySDK
+
+    engine = GestureEngine(FakeReachySDK())
+    engine.start()
+    tracker = GazeTracker(engine, parse_source(args.source), rate_hz=args.rate).start()
+    try:
+        time.sleep(args.seconds)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        tracker.stop()
+        stats = tracker.stats()
+        engine.stop()
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""
+Gesture Compiler - Keyframe data to dense joint trajectories
+============================================================
+
+Gestures are declared as per-part keyframes in gestures.json. At startup
+this module compiles each one into dense, minimum-jerk joint trajectories
+sampled on a fixed control grid (NumPy), so playback is just replaying a
+precomputed array. Compiled gestures are cached in .gesture_cache/, keyed by
+a SHA-256 of the gesture definition, and only recompiled when it changes.
+
+Keyframe format (one list per part; `at` is when the move starts):
+
+    "nodding": {
+        "requires": ["head"],
+        "parts": {
+            "head": [
+                {"at": 0.0, "pose": [0, 10, 0], "duration": 0.3},
+                {"at": 0.35, "pose": [0, -5, 0], "duration": 0.25}
+            ]
+        },
+        "duration": 1.0,
+        "finish": [{"posture": "elbow_90", "duration": 1.0}]
+    }
+
+The first keyframe of each part is played as a regular goto from wherever
+the robot is; the following ones are streamed from the compiled arrays.
+Entries with a "motion" key are procedural layers (see motion_generators)
+added on top of the keyed pose, e.g. four nods:
+
+    {"at": 0.3, "motion": "sinusoid", "amplitude": [0, 7.5, 0], "tempo": 1.7, "cycles": 4}
+
+`finish` lists fire-and-forget gotos/postures sent once the gesture ends.
+
+Usage:
+    library = GestureLibrary.load()
+    gesture = library['nodding']
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from gesture_validator import validate_library
+from motion_generators import layers_end, min_jerk, render, span
+
+logger = logging.getLogger(__name__)
+
+# Bump when the compiled layout or interpolation changes to invalidate caches.
+COMPILER_VERSION = 2
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gestures.json")
+DEFAULT_RATE_HZ = 50.0
+
+# Degrees of freedom per part, in the SDK's goto() joint order.
+PART_DOF = {"head": 3, "l_arm": 7, "r_arm": 7, "l_antenna": 1, "r_antenna": 1}
+
+_EPS = 1e-6
+
+
+@dataclass
+class CompiledGesture:
+    """A gesture sampled on a fixed control grid."""
+
+    name: str
+    digest: str
+    rate: float
+    duration: float
+    # Grid ticks where something has to be sent, ascending.
+    ticks: np.ndarray
+    # part -> (samples[n_ticks, dof], send_mask[n_ticks])
+    parts: Dict[str, Tuple[np.ndarray, np.ndarray]]
+    # tick -> [(part, pose, duration)] lead-in gotos
+    leads: Dict[int, List[Tuple[str, List[float], float]]] = field(default_factory=dict)
+    finish: List[Dict[str, Any]] = field(default_factory=list)
+    requires: List[str] = field(default_factory=list)
+
+    @property
+    def streamed_samples(self) -> int:
+        """Number of per-part goal updates sent during playback."""
+        return int(sum(send.sum() for _, send in self.parts.values()))
+
+
+# =============================================================================
+# Compilation
+# =============================================================================
+
+def gesture_digest(name: str, spec: Dict[str, Any], rate: float) -> str:
+    """Content hash of one gesture definition (plus compiler settings)."""
+    payload = json.dumps({"name": name, "spec": spec, "rate": rate, "version": COMPILER_VERSION},
+                         sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _keyframes(name: str, part: str, frames: List[Dict[str, Any]]) -> List[Tuple[float, np.ndarray, float]]:
+    """Validate a part's keyframes and normalise them to (start, pose, duration)."""
+    if part not in PART_DOF:
+        raise ValueError(f"{name}: unknown part '{part}'")
+    if not frames or "motion" in frames[0]:
+        raise ValueError(f"{name}/{part}: must start with a pose keyframe")
+
+    out = []
+    free_at = 0.0
+    for i, frame in enumerate(frames):
+        if "motion" in frame:
+            continue
+        pose = np.atleast_1d(np.asarray(frame["pose"], dtype=np.float64))
+        start = float(frame.get("at", free_at))
+        duration = float(frame["duration"])
+        if pose.shape != (PART_DOF[part],):
+            raise ValueError(f"{name}/{part}[{i}]: expected {PART_DOF[part]} values, got {pose.size}")
+        if duration <= 0:
+            raise ValueError(f"{name}/{part}[{i}]: duration must be positive")
+        if start < free_at - _EPS:
+            raise ValueError(f"{name}/{part}[{i}]: starts at {start:.2f}s before the "
+                             f"previous move ends at {free_at:.2f}s")
+        out.append((start, pose, duration))
+        free_at = start + duration
+    return out
+
+
+def _layers(name: str, part: str, frames: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate a part's motion layers; they may only start once the lead-in has landed."""
+    lead_end = float(frames[0].get("at", 0.0)) + float(frames[0]["duration"])
+    layers = []
+    for i, frame in enumerate(frames):
+        if "motion" not in frame:
+            continue
+        try:
+            span(frame)
+            render(frame, np.zeros(1), PART_DOF[part])
+        except ValueError as e:
+            raise ValueError(f"{name}/{part}[{i}]: {e}") from None
+        if float(frame.get("at", 0.0)) < lead_end - _EPS:
+            raise ValueError(f"{name}/{part}[{i}]: motion starts before the lead-in lands at {lead_end:.2f}s")
+        layers.append(frame)
+    return layers
+
+
+def compile_gesture(name: str, spec: Dict[str, Any], rate: float = DEFAULT_RATE_HZ) -> CompiledGesture:
+    """Compile one gesture definition into dense trajectories.
+
+    Raises:
+        ValueError: If the definition is malformed.
+    """
+    frames = {part: _keyframes(name, part, kfs) for part, kfs in spec.get("parts", {}).items()}
+    layers = {part: _layers(name, part, kfs) for part, kfs in spec.get("parts", {}).items()}
+    end = max((max(kf[-1][0] + kf[-1][2], layers_end(layers[part])) for part, kf in frames.items()),
+              default=0.0)
+    duration = max(end, float(spec.get("duration", 0.0)))
+
+    n_ticks = int(math.ceil(duration * rate - _EPS)) + 1
+    t = np.arange(n_ticks, dtype=np.float64) / rate
+
+    parts: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    leads: Dict[int, List[Tuple[str, List[float], float]]] = {}
+    active = np.zeros(n_ticks, dtype=bool)
+
+    for part, kfs in frames.items():
+        start0, pose0, duration0 = kfs[0]
+        lead_tick = min(int(math.ceil(start0 * rate - _EPS)), n_ticks - 1)
+        leads.setdefault(lead_tick, []).append((part, pose0.tolist(), duration0))
+        active[lead_tick] = True
+
+        q = np.empty((n_ticks, pose0.size), dtype=np.float64)
+        q[:] = pose0
+        previous = pose0
+        for start, pose, seg in kfs[1:]:
+            moving = (t >= start) & (t < start + seg)
+            s = min_jerk((t[moving] - start) / seg)
+            q[moving] = previous + s[:, None] * (pose - previous)
+            q[t >= start + seg] = pose
+            previous = pose
+        for layer in layers[part]:
+            q += render(layer, t, pose0.size)
+
+        # Stream only after the lead-in goto has landed, and only on change.
+        send = np.zeros(n_ticks, dtype=bool)
+        send[1:] = np.any(np.abs(np.diff(q, axis=0)) > _EPS, axis=1)
+        send &= t >= start0 + duration0 - _EPS
+        parts[part] = (q.astype(np.float32), send)
+        active |= send
+
+    return CompiledGesture(
+        name=name,
+        digest=gesture_digest(name, spec, rate),
+        rate=rate,
+        duration=duration,
+        ticks=np.flatnonzero(active),
+        parts=parts,
+        leads=leads,
+        finish=list(spec.get("finish", [])),
+        requires=list(spec.get("requires", [])),
+    )
+
+
+# =============================================================================
+# Disk cache
+# =============================================================================
+
+def _save(path: str, gesture: CompiledGesture) -> None:
+    meta = {
+        "name": gesture.name,
+        "digest": gesture.digest,
+        "rate": gesture.rate,
+        "duration": gesture.duration,
+        "leads": [[tick, part, pose, dur] for tick, items in gesture.leads.items() for part, pose, dur in items],
+        "finish": gesture.finish,
+        "requires": gesture.requires,
+        "parts": list(gesture.parts),
+    }
+    arrays = {"ticks": gesture.ticks, "meta": np.array(json.dumps(meta))}
+    for part, (q, send) in gesture.parts.items():
+        arrays[f"q_{part}"] = q
+        arrays[f"send_{part}"] = send
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+def _load(path: str) -> CompiledGesture:
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        leads: Dict[int, List[Tuple[str, List[float], float]]] = {}
+        for tick, part, pose, dur in meta["leads"]:
+            leads.setdefault(int(tick), []).append((part, pose, dur))
+        return CompiledGesture(
+            name=meta["name"],
+            digest=meta["digest"],
+            rate=meta["rate"],
+            duration=meta["duration"],
+            ticks=data["ticks"],
+            parts={part: (data[f"q_{part}"], data[f"send_{part}"]) for part in meta["parts"]},
+            leads=leads,
+            finish=meta["finish"],
+            requires=meta["requires"],
+        )
+
+
+class GestureLibrary:
+    """All compiled gestures from one definition file."""
+
+    def __init__(self, gestures: Dict[str, CompiledGesture], path: str = DEFAULT_PATH,
+                 cache_dir: Optional[str] = None):
+        self.gestures = gestures
+        self.path = path
+        self.cache_dir = cache_dir
+
+    def __getitem__(self, name: str) -> CompiledGesture:
+        return self.gestures[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.gestures
+
+    def __iter__(self):
+        return iter(self.gestures)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PATH, cache_dir: Optional[str] = None,
+             validate: bool = True) -> "GestureLibrary":
+        """Compile every gesture in `path`, reusing cached arrays when unchanged.
+
+        Args:
+            path: Gesture definition file (JSON).
+            cache_dir: Where compiled arrays live (defaults to .gesture_cache/ next to `path`).
+            validate: Check limits, speed and collisions (see gesture_validator; cached).
+
+        Raises:
+            ValueError: If a gesture is malformed or fails validation.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            document = json.load(f)
+        rate = float(document.get("rate_hz", DEFAULT_RATE_HZ))
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), ".gesture_cache")
+        os.makedirs(cache_dir, exist_ok=True)
+
+        start = time.perf_counter()
+        gestures: Dict[str, CompiledGesture] = {}
+        compiled = 0
+        for name, spec in document.get("gestures", {}).items():
+            digest = gesture_digest(name, spec, rate)
+            cached = os.path.join(cache_dir, f"{digest}.npz")
+            if os.path.exists(cached):
+                try:
+                    gestures[name] = _load(cached)
+                    continue
+                except Exception as e:
+                    logger.warning(f"⚠️ Ignoring unreadable gesture cache {cached}: {e}")
+            gestures[name] = compile_gesture(name, spec, rate)
+            _save(cached, gestures[name])
+            compiled += 1
+
+        if validate:
+            problems = validate_library(gestures, cache_dir)
+            if problems:
+                raise ValueError(f"{path}: {len(problems)} unsafe gesture move(s):\n"
+                                 + "\n".join(f"  {problem}" for problem in problems))
+
+        elapsed = (time.perf_counter() - start) * 1000
+        logger.info(f"📦 Loaded {len(gestures)} gestures ({compiled} compiled, "
+                    f"{len(gestures) - compiled} cached) in {elapsed:.1f} ms")
+        return cls(gestures, path, cache_dir)
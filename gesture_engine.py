@@ -0,0 +1,696 @@
+"""
+Gesture Engine - Non-blocking asyncio motion playback
+=====================================================
+
+Runs every ReachyDemo gesture as a coroutine on a dedicated event loop
+thread. Each body part (head, arms, antennas) is its own timed track, so an
+antenna wiggle no longer waits behind a head move and the thread that
+triggered the gesture stays free while the motion is playing.
+
+Usage:
+    engine = GestureEngine(reachy)
+    engine.play(some_gesture())               # blocks until the gesture ends
+    future = engine.play(some_gesture(), wait=False)
+    engine.stop()
+
+Gestures are written against the tracks:
+
+    await engine.parallel(
+        engine.head.goto([0, 15, 0], 0.5),
+        engine.l_antenna.goto(40, 0.15, hold=0.2),
+    )
+
+Moves that should start together go out as one pose, all sent before any
+reply is awaited and skipping parts already commanded to the same goal;
+`engine.pose_stats` keeps the start skew and round trips saved per gesture:
+
+    await engine.pose({"l_antenna": 15, "r_antenna": -15}, 0.5)
+    await engine.look_at(0.5, 0.3, 0.1, 1.0)    # cached head IK (head_ik.py)
+
+Periodic motion is generated rather than unrolled, and streamed at the
+control rate from the part's present pose:
+
+    await engine.animate("head", [{"motion": "sinusoid", "amplitude": [0, 3, 0],
+                                   "tempo": 0.6, "cycles": 3}])
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import logging
+import operator
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from clock import SystemClock
+from connection import CallTimeout, ConnectionDown
+from event_log import gesture_span
+import head_ik
+from head_ik import LookAtCache
+from motion_generators import DEFAULT_RATE_HZ, trajectory
+from transitions import plan_transition
+
+if TYPE_CHECKING:
+    from connection import ConnectionManager
+    from gesture_compiler import CompiledGesture
+
+logger = logging.getLogger(__name__)
+
+# Body parts that get their own track, in dispatch order.
+PARTS = ("head", "l_arm", "r_arm", "l_antenna", "r_antenna")
+
+# Joint attributes per part, in goto() order, used to stream goal positions.
+_ARM_JOINTS = ("shoulder.pitch", "shoulder.roll", "elbow.yaw", "elbow.pitch",
+               "wrist.roll", "wrist.pitch", "wrist.yaw")
+JOINTS = {
+    "head": ("neck.roll", "neck.pitch", "neck.yaw"),
+    "l_arm": _ARM_JOINTS,
+    "r_arm": _ARM_JOINTS,
+    "l_antenna": (),
+    "r_antenna": (),
+}
+
+Goal = Union[float, List[float]]
+
+# SDK calls after which the engine no longer knows a part's goal.
+_FORGET_PART = ("look_at", "rotate_by", "cancel_all_goto")
+_FORGET_ALL = ("goto_posture", "turn_off", "turn_off_smoothly", "cancel_all_goto", "send_goal_positions")
+
+# Name of the top-level gesture being played (for pose statistics).
+_gesture: contextvars.ContextVar[str] = contextvars.ContextVar("gesture", default="")
+
+
+@dataclass
+class PoseStats:
+    """Round trips and start skew of the poses sent by one gesture."""
+
+    poses: int = 0
+    parts: int = 0
+    round_trips: int = 0
+    saved: int = 0
+    max_skew_ms: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"poses": self.poses, "parts": self.parts, "round_trips": self.round_trips,
+                "saved": self.saved, "max_skew_ms": round(self.max_skew_ms, 3)}
+
+
+class Track:
+    """Timed command track for a single body part.
+
+    Commands on one track run strictly one after another; commands on
+    different tracks overlap freely.
+    """
+
+    def __init__(self, engine: "GestureEngine", name: str):
+        self.engine = engine
+        self.name = name
+        self.commands = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def part(self) -> Any:
+        """The SDK object driven by this track, or None if unavailable."""
+        return self.engine.resolve(self.name)
+
+    async def goto(self, goal: Goal, duration: float, hold: Optional[float] = None) -> None:
+        """Send a non-blocking goto and keep the track busy for `hold` seconds.
+
+        Args:
+            goal: Joint goal (list for head/arms, degrees for antennas).
+            duration: Duration of the move on the robot.
+            hold: Time before the next command on this track (defaults to duration).
+        """
+        await self.send("goto", goal, duration=duration, hold=hold)
+
+    async def send(self, method: str, *args: Any, hold: Optional[float] = None, **kwargs: Any) -> None:
+        """Call `method` on the part, then hold the track.
+
+        A missing part or a rejected command is logged and skipped; the hold
+        is still honoured so the other tracks keep their timing.
+        """
+        if hold is None:
+            hold = kwargs.get("duration", 0.0)
+        async with self._lock:
+            await self.engine.dispatch(self.name, self.part, method, *args, **kwargs)
+            self.commands += 1
+            await self.engine.sleep(hold)
+
+
+class GestureEngine:
+    """Plays gesture coroutines on a background event loop."""
+
+    def __init__(self, reachy: Any, clock: Optional[Any] = None, connection: Optional["ConnectionManager"] = None):
+        """Create an engine bound to a connected robot.
+
+        Args:
+            reachy: ReachySDK instance (may be None; every command is then skipped).
+            clock: Time source (SystemClock by default, VirtualClock to fast-forward).
+            connection: Runs every SDK call under a deadline and skips calls
+                while the link is down (calls go straight to `reachy` if None).
+        """
+        self.reachy = reachy
+        self.clock = clock or SystemClock()
+        self.connection = connection
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._current: Optional[concurrent.futures.Future] = None
+        # Emergency cancel_all_goto in flight; later commands wait for it.
+        self._flushing: Optional[asyncio.Task] = None
+        self.tracks: Dict[str, Track] = {name: Track(self, name) for name in PARTS}
+        # Called as listener(part, method, clock_time) for every SDK command sent.
+        self.listeners: List[Callable[[str, str, float], None]] = []
+        # Called as recorder(part, method, args, kwargs, clock_time) with the full
+        # command as it is sent; streamed goals arrive as send_goal_positions({part: goals}).
+        self.recorders: List[Callable[[str, str, tuple, dict, float], None]] = []
+        # Called as ack_listener(part, method, seconds) once each SDK call returns.
+        self.ack_listeners: List[Callable[[str, str, float], None]] = []
+        # Set while the robot has not settled in neutral after a gesture.
+        self._unsettled = False
+        self._settle_until = float("-inf")
+        # Parts streamed by a background controller (the gaze tracker) -> its
+        # name; idle motion leaves them alone. Loop thread only.
+        self.claims: Dict[str, str] = {}
+        # Last goal sent to each part, while it is still known to be valid.
+        self._goals: Dict[str, Goal] = {}
+        self.pose_stats: Dict[str, PoseStats] = {}
+        # Cached head IK for look_at() targets.
+        self.gaze = LookAtCache()
+
+    def __getattr__(self, name: str) -> Track:
+        tracks = self.__dict__.get("tracks", {})
+        if name in tracks:
+            return tracks[name]
+        raise AttributeError(name)
+
+    # -------------------------------------------------------------------------
+    # Loop lifecycle
+    # -------------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the event loop thread (idempotent)."""
+        if self.running:
+            return
+        self._loop = self.clock.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="gesture-engine", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def stop(self) -> None:
+        """Cancel pending gestures and stop the loop thread."""
+        if not self.running:
+            return
+
+        def _shutdown() -> None:
+            for task in asyncio.all_tasks(self._loop):
+                task.cancel()
+            # One more pass so the cancelled tasks (gestures, idle motion) unwind.
+            self._loop.call_soon(self._loop.stop)
+
+        self._loop.call_soon_threadsafe(_shutdown)
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def play(self, coro: Awaitable[Any], wait: bool = True,
+             name: str = "") -> Union[Any, concurrent.futures.Future]:
+        """Schedule a gesture coroutine on the engine loop.
+
+        Args:
+            coro: Gesture coroutine.
+            wait: Block until it finishes (True) or return a Future (False).
+            name: Gesture name used to file pose statistics.
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(_named(name, coro), self._loop)
+        self._current = future
+        if wait:
+            try:
+                return future.result()
+            except concurrent.futures.CancelledError:
+                return None
+        return future
+
+    def call_soon(self, callback: Callable[..., Any], *args: Any) -> bool:
+        """Run callback(*args) on the loop thread (from any thread).
+
+        Returns:
+            False if the loop is not running.
+        """
+        loop = self._loop
+        if not self.running or loop is None:
+            return False
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            return False
+        return True
+
+    def ping(self, callback: Callable[[float], None]) -> bool:
+        """Measure loop responsiveness: callback(lag_seconds) runs on the loop thread."""
+        posted = time.perf_counter()
+        return self.call_soon(lambda: callback(time.perf_counter() - posted))
+
+    @property
+    def busy(self) -> bool:
+        """True while the most recently played gesture is still running."""
+        return self._current is not None and not self._current.done()
+
+    def idle_for(self, *parts: str, now: Optional[float] = None, margin: float = 0.0) -> bool:
+        """True when background motion (idle, gaze) may move `parts` now.
+
+        No gesture is playing, the last one's finish moves ended at least
+        `margin` seconds before `now`, no track of `parts` is held and the
+        link is up. Call it on the loop thread.
+        """
+        if now is None:
+            now = self.clock.monotonic()
+        if self.busy or now < self._settle_until + margin:
+            return False
+        if any(self.tracks[part]._lock.locked() for part in parts):
+            return False
+        return self.connection is None or self.connection.connected
+
+    def preempt(self, emergency: bool = False) -> bool:
+        """Stop the in-flight gesture at its next keyframe boundary.
+
+        Tracks only await between keyframes, so cancellation never splits a
+        command: the keyframe already sent finishes and acts as the blend-out.
+        An emergency preempt also flushes the robot's queued gotos so the
+        next command moves immediately. Safe to call from any thread: the
+        flush is scheduled on the loop, ahead of anything played afterwards.
+
+        Returns:
+            True if a running gesture was cancelled.
+        """
+        future = self._current
+        cancelled = future is not None and future.cancel()
+        if emergency:
+            self.start()
+            self.call_soon(self._flush)
+        if cancelled:
+            logger.info(f"   ✋ Gesture preempted{' (emergency)' if emergency else ''}")
+        return cancelled
+
+    def _flush(self) -> None:
+        """Drop every goto queued on the robot (loop thread only)."""
+        self._flushing = asyncio.ensure_future(self._send("reachy", self.reachy, "cancel_all_goto", (), {}))
+
+    # -------------------------------------------------------------------------
+    # Motion primitives
+    # -------------------------------------------------------------------------
+
+    def resolve(self, name: str) -> Any:
+        """Map a track name to its SDK object."""
+        if self.reachy is None:
+            return None
+        if name.endswith("_antenna"):
+            head = getattr(self.reachy, "head", None)
+            return getattr(head, name, None) if head is not None else None
+        return getattr(self.reachy, name, None)
+
+    async def dispatch(self, name: str, target: Any, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Issue one SDK call, never letting a failing part break the gesture.
+
+        Runs on the loop thread; the call itself runs on a connection worker
+        and is awaited under its deadline.
+        """
+        return await self._send(name, target, method, args, kwargs)
+
+    async def _send(self, name: str, target: Any, method: str, args: tuple, kwargs: Dict[str, Any],
+                    recorded: Optional[tuple] = None) -> Any:
+        """dispatch() with the arguments shown to recorders overridable (streamed goals)."""
+        if target is None:
+            logger.debug(f"   {name}: unavailable, skipping {method}")
+            return None
+        flushing = self._flushing
+        if flushing is not None and not flushing.done() and flushing is not asyncio.current_task():
+            # Workers run calls concurrently: let the emergency flush land first.
+            await asyncio.wait([flushing])
+        if method in ("goto", "goto_posture"):
+            kwargs.setdefault("wait", False)
+        sent_at = self.clock.monotonic()
+        if method in _FORGET_ALL and (name == "reachy" or method == "turn_off"):
+            self._goals.clear()
+        elif method in _FORGET_PART:
+            self._goals.pop(name, None)
+        # Recorded as sent, not on return, so recordings stay in send order.
+        for recorder in self.recorders:
+            recorder(name, method, args if recorded is None else recorded, kwargs, sent_at)
+        started = time.perf_counter()
+        try:
+            if self.connection is not None:
+                with self.clock.working():
+                    result = await self.connection.acall(getattr(target, method), *args, **kwargs)
+            else:
+                result = getattr(target, method)(*args, **kwargs)
+        except CallTimeout as e:
+            logger.warning(f"⚠️ {name}.{method}: {e}")
+            self._goals.pop(name, None)
+            return None
+        except Exception as e:
+            logger.debug(f"   {name}.{method} failed: {e}")
+            self._goals.pop(name, None)
+            return None
+        finally:
+            for listener in self.listeners:
+                listener(name, method, sent_at)
+            for listener in self.ack_listeners:
+                listener(name, method, time.perf_counter() - started)
+        if method == "goto" and args and getattr(result, "id", result) != -1:
+            self._goals[name] = args[0]
+        return result
+
+    async def sleep(self, seconds: float) -> None:
+        """Pause the calling coroutine without blocking other tracks."""
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    async def parallel(self, *coros: Awaitable[Any]) -> List[Any]:
+        """Run several track sequences at once and wait for all of them."""
+        return await asyncio.gather(*coros)
+
+    async def sequence(self, *coros: Awaitable[Any]) -> None:
+        """Run steps one after another (useful as one branch of `parallel`)."""
+        pending = list(coros)
+        try:
+            while pending:
+                await pending.pop(0)
+        finally:
+            for coro in pending:
+                coro.close()
+
+    def joints(self, name: str) -> List[Any]:
+        """SDK joint objects of a part, in goto() order ([] if unavailable)."""
+        part = self.resolve(name)
+        if part is None:
+            return []
+        if not JOINTS[name]:
+            return [part]
+        try:
+            return [operator.attrgetter(path)(part) for path in JOINTS[name]]
+        except AttributeError:
+            return []
+
+    async def replay(self, gesture: "CompiledGesture") -> None:
+        """Play a compiled gesture: lead-in gotos, then streamed goal positions.
+
+        Only the precomputed active ticks are visited, with deadlines taken
+        from the start time so slow ticks don't accumulate drift.
+        """
+        loop = asyncio.get_running_loop()
+        joints = {name: self.joints(name) for name in gesture.parts}
+        period = 1.0 / gesture.rate
+        async with _locked(*(self.tracks[name] for name in gesture.parts)):
+            shift, durations = 0.0, {}
+            if 0 in gesture.leads and (self._unsettled or self.clock.monotonic() < self._settle_until):
+                shift, durations = await self._transition(gesture.leads[0])
+            self._unsettled = True
+            t0 = loop.time() + shift
+            for tick in gesture.ticks.tolist():
+                await self.sleep(t0 + tick * period - loop.time())
+                leads = gesture.leads.get(tick)
+                if leads:
+                    await self._send_pose({name: pose[0] if name.endswith("_antenna") else pose
+                                     for name, pose, _ in leads},
+                                    {name: durations.get(name, duration) if tick == 0 else duration
+                                     for name, _, duration in leads})
+                goals = {name: samples[tick].tolist() for name, (samples, send) in gesture.parts.items()
+                         if send[tick] and joints[name]}
+                if goals:
+                    await self.stream(goals, joints)
+            await self.sleep(t0 + gesture.duration - loop.time())
+
+        for step in gesture.finish:
+            if "posture" in step:
+                await self.posture(step["posture"], step["duration"], hold=0)
+            else:
+                await self.tracks[step["part"]].goto(step["pose"], step["duration"], hold=0)
+        self._unsettled = not gesture.finish
+        self._settle_until = self.clock.monotonic() + max((step["duration"] for step in gesture.finish),
+                                                          default=0.0)
+
+    async def stream(self, goals: Dict[str, List[float]], joints: Optional[Dict[str, List[Any]]] = None) -> None:
+        """Write goal positions for several parts and send them in one call.
+
+        Args:
+            goals: Joint goals per part, in goto() order.
+            joints: Pre-resolved joint objects per part (looked up if omitted).
+        """
+        sent = {}
+        for name, values in goals.items():
+            targets = joints[name] if joints is not None else self.joints(name)
+            try:
+                for joint, value in zip(targets, values):
+                    joint.goal_position = value
+                sent[name] = values
+            except Exception as e:
+                logger.debug(f"   {name}: goal update failed: {e}")
+        if sent:
+            await self._send("reachy", self.reachy, "send_goal_positions", (), {}, recorded=(sent,))
+
+    async def animate(self, name: str, layers: List[Dict[str, Any]], duration: Optional[float] = None,
+                      rate: float = DEFAULT_RATE_HZ) -> None:
+        """Stream procedural motion layers (see motion_generators) on one part.
+
+        The whole trajectory is computed up front from the part's present pose
+        and streamed at `rate`, with deadlines taken from the start time.
+
+        Args:
+            name: Part to move.
+            layers: Motion layers; `at` is relative to now.
+            duration: Length of the motion (defaults to the end of the last layer).
+            rate: Control rate in Hz.
+        """
+        loop = asyncio.get_running_loop()
+        async with _locked(self.tracks[name]):
+            joints = {name: self.joints(name)}
+            base = self.present(name)
+            if base is None or not joints[name]:
+                return
+            t, q = trajectory(base, layers, duration, rate)
+            send = np.zeros(len(t), dtype=bool)
+            send[1:] = np.any(np.abs(np.diff(q, axis=0)) > 1e-6, axis=1)
+            self._unsettled = True
+            t0 = loop.time()
+            for tick in np.flatnonzero(send).tolist():
+                await self.sleep(t0 + t[tick] - loop.time())
+                await self.stream({name: q[tick].tolist()}, joints)
+            await self.sleep(t0 + t[-1] - loop.time())
+
+    def present(self, name: str) -> Optional[List[float]]:
+        """Present joint positions of a part, in goto() order (None if unreadable)."""
+        joints = self.joints(name)
+        try:
+            return [float(joint.present_position) for joint in joints] if joints else None
+        except Exception as e:
+            logger.debug(f"   {name}: present position unavailable: {e}")
+            return None
+
+    async def _transition(self, leads: List[Any]) -> Tuple[float, Dict[str, float]]:
+        """Drop the motion still queued on the lead parts and plan lead-ins from the present pose.
+
+        Parts the gesture doesn't move keep finishing the previous one.
+        """
+        await asyncio.gather(*(self.dispatch(name, self.resolve(name), "cancel_all_goto")
+                               for name, _, _ in leads))
+        current = {}
+        for name, _, _ in leads:
+            pose = self.present(name)
+            if pose is not None:
+                current[name] = pose
+        shift, durations = plan_transition(current, leads)
+        logger.debug(f"   ↪️ Direct transition, timeline shifted {shift:+.2f}s")
+        return shift, durations
+
+    async def pose(self, goals: Dict[str, Goal], duration: Union[float, Dict[str, float]],
+                   hold: Optional[float] = None) -> None:
+        """Move several parts together as one synchronized pose.
+
+        Args:
+            goals: Goal per part (list for head/arms, degrees for antennas).
+            duration: Move duration, shared or per part.
+            hold: Time the parts stay busy (defaults to the longest duration).
+        """
+        durations = duration if isinstance(duration, dict) else {name: duration for name in goals}
+        async with _locked(*(self.tracks[name] for name in PARTS if name in goals)):
+            await self._send_pose(goals, durations)
+            await self.sleep(max(durations.values(), default=0.0) if hold is None else hold)
+
+    async def _send_pose(self, goals: Dict[str, Goal], durations: Dict[str, float]) -> None:
+        """Send every goto of a pose before awaiting any reply; the caller holds the tracks."""
+        stats = self.pose_stats.setdefault(_gesture.get(), PoseStats())
+        stats.poses += 1
+        stats.parts += len(goals)
+        starts: List[float] = []
+
+        async def send(name: str) -> None:
+            starts.append(time.perf_counter())
+            await self.dispatch(name, self.resolve(name), "goto", goals[name], duration=durations[name])
+
+        due = []
+        for name in PARTS:
+            if name not in goals:
+                continue
+            if self._goals.get(name) == goals[name]:
+                stats.saved += 1
+                continue
+            due.append(name)
+            self.tracks[name].commands += 1
+            stats.round_trips += 1
+        if len(due) == 1:
+            await send(due[0])
+        elif due:
+            await asyncio.gather(*(send(name) for name in due))
+        if starts:
+            stats.max_skew_ms = max(stats.max_skew_ms, (max(starts) - min(starts)) * 1000)
+
+    async def look_at(self, x: float, y: float, z: float, duration: float = 2.0,
+                      hold: Optional[float] = None) -> None:
+        """Point the head at a Cartesian target using the cached IK solution.
+
+        Sends the joint goals directly as a head goto (skipped if the head is
+        already there) instead of the SDK's look_at; falls back to look_at
+        when the SDK's head IK can't solve the target.
+
+        Args:
+            x, y, z: Target in the robot frame (metres).
+            duration: Move duration.
+            hold: Time the head track stays busy (defaults to `duration`).
+        """
+        goal = await self.solve_look_at(x, y, z)
+        if goal is None:
+            await self.head.send("look_at", x, y, z, duration=duration, hold=hold)
+        else:
+            await self.pose({"head": goal}, duration, hold)
+
+    async def solve_look_at(self, x: float, y: float, z: float) -> Optional[List[float]]:
+        """Head joint goals facing a target: cached, else one SDK head IK round trip.
+
+        Returns:
+            None if the head has no IK or the call failed (nothing is cached).
+        """
+        solution = self.gaze.lookup(x, y, z)
+        if solution is not None:
+            return solution
+        ik = getattr(self.resolve("head"), "inverse_kinematics", None)
+        if ik is None:
+            return None
+        point = self.gaze.centre(x, y, z)
+        started = time.perf_counter()
+        try:
+            with self.clock.working():
+                if self.connection is None:
+                    solution = head_ik.solve(ik, *point)
+                else:
+                    solution = await self.connection.acall(head_ik.solve, ik, *point)
+        except Exception as e:
+            logger.debug(f"   head IK for {point} failed: {e}")
+            return None
+        self.gaze.store(*point, solution, time.perf_counter() - started)
+        return solution
+
+    def prewarm_look_at(self, targets: Iterable[Tuple[float, float, float]]) -> int:
+        """Solve look_at targets ahead of time (blocking; call before the show).
+
+        Returns:
+            Number of targets cached.
+        """
+        ik = getattr(self.resolve("head"), "inverse_kinematics", None)
+        if ik is None:
+            logger.info("   ℹ️ No head IK in this SDK: look_at goes to the robot uncached")
+            return 0
+        if self.connection is not None:
+            return self.gaze.prewarm(targets, functools.partial(self.connection.call, ik))
+        return self.gaze.prewarm(targets, ik)
+
+    async def posture(self, name: str, duration: float, hold: Optional[float] = None) -> None:
+        """Whole-body posture move; holds every arm and head track."""
+        async with _locked(self.tracks["head"], self.tracks["l_arm"], self.tracks["r_arm"]):
+            await self.dispatch("reachy", self.reachy, "goto_posture", name, duration=duration)
+            self._unsettled = False
+            self._settle_until = self.clock.monotonic() + duration
+            await self.sleep(duration if hold is None else hold)
+
+    async def power(self, on: bool, part: str = "reachy", settle: float = 0.0) -> None:
+        """Turn the whole robot (or one part) on/off, then wait `settle` seconds."""
+        target = self.reachy if part == "reachy" else self.resolve(part)
+        await self.dispatch(part, target, "turn_on" if on else "turn_off")
+        await self.sleep(settle)
+
+    async def call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking SDK call in a worker thread (under its deadline)."""
+        loop = asyncio.get_running_loop()
+        sent_at = self.clock.monotonic()
+        self._goals.clear()
+        for listener in self.listeners:
+            listener("reachy", getattr(func, "__name__", "call"), sent_at)
+        for recorder in self.recorders:
+            recorder("reachy", getattr(func, "__name__", "call"), args, {}, sent_at)
+        try:
+            with self.clock.working():
+                if self.connection is None:
+                    return await loop.run_in_executor(None, functools.partial(func, *args))
+                return await self.connection.acall(func, *args)
+        except (CallTimeout, ConnectionDown) as e:
+            logger.warning(f"⚠️ {getattr(func, '__name__', 'call')}: {e}")
+            return None
+
+
+async def _named(name: str, coro: Awaitable[Any]) -> Any:
+    """Run a gesture coroutine with its name set for pose statistics and the event log."""
+    if not name:
+        return await coro
+    _gesture.set(name)
+    with gesture_span(name):
+        return await coro
+
+
+class _locked:
+    """Acquire several track locks in a fixed order."""
+
+    def __init__(self, *tracks: Track):
+        self.tracks = tracks
+
+    async def __aenter__(self) -> None:
+        held: List[Track] = []
+        try:
+            for track in self.tracks:
+                await track._lock.acquire()
+                held.append(track)
+        except BaseException:
+            # Cancelled while waiting on a later lock: __aexit__ won't run.
+            for track in reversed(held):
+                track._lock.release()
+            raise
+
+    async def __aexit__(self, *exc: Any) -> None:
+        for track in reversed(self.tracks):
+            track._lock.release()
+
+
+def motion(func: Callable[..., Awaitable[Any]]) -> Callable[..., Any]:
+    """Turn an `async def` gesture method into a regular method.
+
+    The decorated method plays the coroutine on `self.engine`; it blocks by
+    default, or returns a Future with `wait=False`. The raw coroutine
+    function stays reachable as `.coro` so gestures can await each other.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self: Any, *args: Any, wait: bool = True, **kwargs: Any) -> Any:
+        return self.engine.play(func(self, *args, **kwargs), wait=wait, name=func.__name__)
+
+    wrapper.coro = func
+    return wrapper
@@ -0,0 +1,295 @@
+"""
+Gesture Registry - Key bindings, lazy gesture imports and hot reload
+====================================================================
+
+One table binds keys to gestures. Each entry names its gesture by source
+("module:Class.method" or "module:function"), with a label, the act it
+belongs to in the controls text, its queue priority and a time budget.
+The key dispatch and the printed controls are both generated from the
+table, so adding a gesture is one `add()` line.
+
+    - Sources are imported on first use, not at startup; the module's
+      file time is taken as it is imported.
+    - `refresh()` re-reads gesture modules that changed on disk
+      (importlib.reload) while the demo, its engine and the ReachySDK
+      connection stay up. A module that fails to import keeps its
+      previous version.
+    - "Class.method" sources name a method of a class built around the
+      demo (`Class(demo)`, composition, not inheritance). The class is
+      looked up again on every play, and `lookup()` gives the demo the
+      same current class, so after a reload every entry point runs the
+      new code, helpers included.
+    - Gestures are played as coroutine functions taking the demo
+      (`@motion` methods are unwrapped to their `.coro`) through
+      `demo.play()`, so a fleet fans them out like any other gesture.
+    - Budgets default to `max_seconds` in bench_budgets.json; a gesture
+      that runs longer logs a warning.
+
+Usage:
+    registry = GestureRegistry(module="gestures_demo")
+    registry.add("5", "DemoGestures.gesture_nodding", "Nodding in agreement", act="ACT 2")
+    queue.submit("5", registry.action("5", demo))
+    print(registry.controls())
+"""
+
+import concurrent.futures
+import importlib
+import importlib.util
+import json
+import logging
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from command_queue import Priority
+
+logger = logging.getLogger(__name__)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGETS = os.path.join(HERE, "bench_budgets.json")
+
+
+@dataclass
+class GestureEntry:
+    """One key binding."""
+
+    key: str
+    source: str
+    label: str
+    act: str
+    priority: Priority = Priority.GESTURE
+    budget: Optional[float] = None
+
+    @property
+    def module(self) -> str:
+        return self.source.partition(":")[0]
+
+    @property
+    def name(self) -> str:
+        """Gesture name (last part of the source), used in logs and reports."""
+        return self.source.rpartition(".")[2].rpartition(":")[2]
+
+
+class GestureRegistry:
+    """Key -> gesture table with lazy imports and reload on change."""
+
+    def __init__(self, module: Optional[str] = None, budgets: str = DEFAULT_BUDGETS):
+        """Create an empty registry.
+
+        Args:
+            module: Module used for sources given without 'module:'.
+            budgets: Budget file for entries without their own budget.
+        """
+        self.module = module
+        self.budgets_path = budgets
+        self.entries: Dict[str, GestureEntry] = {}
+        self.reloads = 0
+        self._funcs: Dict[str, Callable[..., Any]] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._budgets: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+
+    def add(self, key: str, source: str, label: str, act: str,
+            priority: Priority = Priority.GESTURE, budget: Optional[float] = None) -> GestureEntry:
+        """Bind `key` to a gesture (nothing is imported yet).
+
+        Args:
+            key: Single key (upper case), or a chord such as "X+Z" (see
+                key_input.KeyReader) for commands that must not fire by accident.
+            source: "module:Class.method", "module:function", or a path in
+                the registry's default module.
+            label: Text shown in the controls.
+            act: Section of the controls the key is listed under.
+            priority: Queue priority (EMERGENCY cuts in and flushes motion).
+            budget: Most seconds the gesture should take (default: bench_budgets.json).
+
+        Raises:
+            ValueError: If the key is taken or the source has no module.
+        """
+        if "+" in key:
+            # Same spelling as KeyReader's chord events.
+            key = "+".join(sorted(part.upper() for part in key.split("+")))
+        if key in self.entries:
+            raise ValueError(f"key {key!r} is already bound to {self.entries[key].source}")
+        if ":" not in source:
+            if self.module is None:
+                raise ValueError(f"{source}: no module (use 'module:{source}')")
+            source = f"{self.module}:{source}"
+        entry = GestureEntry(key=key, source=source, label=label, act=act, priority=priority, budget=budget)
+        self.entries[key] = entry
+        return entry
+
+    def chords(self) -> List[str]:
+        """Bound chords, to register with a KeyReader."""
+        return [key for key in self.entries if "+" in key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def __getitem__(self, key: str) -> GestureEntry:
+        return self.entries[key]
+
+    def __iter__(self) -> Iterator[GestureEntry]:
+        return iter(self.entries.values())
+
+    # -------------------------------------------------------------------------
+    # Lazy import and reload
+    # -------------------------------------------------------------------------
+
+    def lookup(self, source: str) -> Any:
+        """Object at `source`, importing its module on first use.
+
+        Args:
+            source: "module:Class", "module:function", or a path in the
+                registry's default module. After a reload this is the new object.
+
+        Raises:
+            ImportError: If the module cannot be imported.
+            AttributeError: If the module has no such object.
+        """
+        if ":" not in source:
+            source = f"{self.module}:{source}"
+        name, _, path = source.partition(":")
+        with self._lock:
+            module = self._import(name)
+            target: Any = module
+            for attr in path.split("."):
+                target = getattr(target, attr)
+            return target
+
+    def _import(self, name: str) -> Any:
+        """Import a gesture module, noting its file time as of the import (caller holds the lock)."""
+        module = sys.modules.get(name)
+        if module is None:
+            # Taken before the import: an edit made meanwhile still counts as a change.
+            spec = importlib.util.find_spec(name)
+            mtime = _mtime(spec, "origin") if spec is not None else 0.0
+            module = importlib.import_module(name)
+            self._mtimes.setdefault(name, mtime)
+        else:
+            self._mtimes.setdefault(name, _mtime(module))
+        return module
+
+    def resolve(self, entry: GestureEntry) -> Callable[..., Any]:
+        """Coroutine function of a gesture, taking the demo, importing its module on first use.
+
+        Raises:
+            ImportError: If the module cannot be imported.
+            AttributeError: If the module has no such gesture.
+        """
+        with self._lock:
+            func = self._funcs.get(entry.source)
+            if func is not None:
+                return func
+            owner, _, attr = entry.source.partition(":")[2].rpartition(".")
+            if not owner:
+                target = self.lookup(entry.source)
+                func = getattr(target, "coro", target)
+            else:
+                cls = self.lookup(f"{entry.module}:{owner}")
+                method = getattr(cls, attr)
+                method = getattr(method, "coro", method)
+
+                def func(demo: Any, *args: Any, **kwargs: Any) -> Any:
+                    return method(cls(demo), *args, **kwargs)
+
+                func.__name__ = attr
+            self._funcs[entry.source] = func
+            return func
+
+    def refresh(self) -> List[str]:
+        """Reload the gesture modules changed on disk since they were imported.
+
+        Returns:
+            Names of the modules reloaded.
+        """
+        reloaded = []
+        with self._lock:
+            for name, seen in list(self._mtimes.items()):
+                module = sys.modules.get(name)
+                if module is None or _mtime(module) == seen:
+                    continue
+                self._mtimes[name] = _mtime(module)
+                try:
+                    importlib.reload(module)
+                except Exception as e:
+                    logger.error(f"❌ Reloading {name} failed, keeping the previous version: {e}")
+                    continue
+                self._funcs = {source: func for source, func in self._funcs.items()
+                               if source.partition(":")[0] != name}
+                reloaded.append(name)
+        if reloaded:
+            self.reloads += len(reloaded)
+            logger.info(f"🔁 Reloaded {', '.join(reloaded)}")
+        return reloaded
+
+    # -------------------------------------------------------------------------
+    # Dispatch
+    # -------------------------------------------------------------------------
+
+    def budget(self, entry: GestureEntry) -> Optional[float]:
+        if entry.budget is not None:
+            return entry.budget
+        if self._budgets is None:
+            try:
+                with open(self.budgets_path, "r", encoding="utf-8") as f:
+                    self._budgets = json.load(f)
+            except (OSError, ValueError):
+                self._budgets = {}
+        return self._budgets.get(entry.name, {}).get("max_seconds")
+
+    def action(self, key: str, demo: Any) -> Callable[..., Any]:
+        """Queue action for `key`: plays the gesture on `demo` (a ReachyDemo or fleet).
+
+        The gesture is resolved when the action runs, so a module reloaded
+        after the key was queued still plays its new version.
+        """
+        entry = self.entries[key]
+
+        def run(wait: bool = True) -> Any:
+            func = self.resolve(entry)
+            clock = demo.engine.clock
+            started = clock.monotonic()
+            future = demo.play(entry.name, func=func, wait=False)
+            future.add_done_callback(lambda _: self._check(entry, clock.monotonic() - started))
+            if not wait:
+                return future
+            try:
+                return future.result()
+            except concurrent.futures.CancelledError:
+                return None
+
+        run.__name__ = entry.name
+        return run
+
+    def _check(self, entry: GestureEntry, elapsed: float) -> None:
+        budget = self.budget(entry)
+        if budget is not None and elapsed > budget:
+            logger.warning(f"⚠️ {entry.name} took {elapsed:.2f}s (budget {budget:.2f}s)")
+
+    def controls(self, title: str = "DEMO CONTROLS", extra: Optional[Dict[str, List[str]]] = None) -> str:
+        """Controls text, one section per act in registration order.
+
+        Args:
+            title: Heading line.
+            extra: Non-gesture lines ("Q = Quit") to list under an act.
+        """
+        acts: Dict[str, List[str]] = {}
+        for entry in self:
+            acts.setdefault(entry.act, []).append(f"{entry.key} = {entry.label}")
+        for act, items in (extra or {}).items():
+            acts.setdefault(act, []).extend(items)
+        lines = ["", "=" * 60, f"  {title}", "=" * 60]
+        for act, items in acts.items():
+            lines += ["", f"  {act}"] + [f"    {item}" for item in items]
+        lines += ["", "=" * 60, ""]
+        return "\n".join(lines)
+
+
+def _mtime(module: Any, attr: str = "__file__") -> float:
+    try:
+        return os.path.getmtime(getattr(module, attr))
+    except (AttributeError, OSError, TypeError):
+        return 0.0
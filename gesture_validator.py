@@ -0,0 +1,348 @@
+"""
+Gesture Validator - Joint limits, speed and self-collision checks at load time
+==============================================================================
+
+Checks every compiled gesture before the show instead of finding a typo live
+on stage:
+
+    limits     every keyed pose, streamed sample and `finish` goto stays
+               inside the joint ranges in JOINT_LIMITS
+    velocity   the streamed trajectory, and each lead-in goto (assumed to
+               start from REST), stays under transitions.VELOCITY_LIMITS
+    collision  a coarse capsule model of both arms (upper arm + forearm) is
+               kept clear of the other arm, the head and the torso
+
+The collision model is deliberately crude (fixed link lengths, head and
+torso as a sphere and a vertical capsule): it catches an arm swung through
+the body, not a finger brushing the chest. Parts a gesture doesn't move are
+assumed to be at REST (the elbow_90 posture gestures return to).
+
+Results are cached in .gesture_cache/validation.json, keyed by the gesture's
+content digest, so an unchanged gesture is never re-checked and nothing of
+this runs on the live hot path. GestureLibrary.load() refuses to load a
+library with violations.
+
+Usage:
+    python gesture_validator.py                 # check gestures.json
+    python gesture_validator.py --code          # also the hand-coded gestures (fake robot)
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from transitions import VELOCITY_LIMITS
+
+if TYPE_CHECKING:
+    from gesture_compiler import CompiledGesture
+
+logger = logging.getLogger(__name__)
+
+# Bump when the checks or tables change to invalidate cached results.
+VALIDATOR_VERSION = 1
+
+CACHE_FILE = "validation.json"
+
+# Joint ranges in degrees, in goto() order. Approximate Reachy 2 ranges with
+# a safety margin; right arm roll/yaw mirror the left arm's.
+_ARM_LIMITS = [(-180.0, 90.0), (-120.0, 60.0), (-90.0, 90.0), (-135.0, 5.0),
+               (-45.0, 45.0), (-45.0, 45.0), (-90.0, 90.0)]
+JOINT_LIMITS: Dict[str, List[Tuple[float, float]]] = {
+    "head": [(-40.0, 40.0), (-40.0, 40.0), (-90.0, 90.0)],
+    "r_arm": _ARM_LIMITS,
+    "l_arm": [(lo, hi) if i not in (1, 2, 4, 6) else (-hi, -lo) for i, (lo, hi) in enumerate(_ARM_LIMITS)],
+    "l_antenna": [(-80.0, 80.0)],
+    "r_antenna": [(-80.0, 80.0)],
+}
+
+# Where parts a gesture doesn't move are assumed to be (elbow_90 posture).
+REST: Dict[str, List[float]] = {
+    "head": [0.0, 0.0, 0.0],
+    "r_arm": [0.0, -15.0, 0.0, -90.0, 0.0, 0.0, 0.0],
+    "l_arm": [0.0, 15.0, 0.0, -90.0, 0.0, 0.0, 0.0],
+    "l_antenna": [0.0],
+    "r_antenna": [0.0],
+}
+
+# Coarse body model (metres; x forward, y left, z up, origin between the shoulders).
+SHOULDER_Y = 0.2
+UPPER_ARM = 0.28
+FOREARM = 0.28
+ARM_RADIUS = 0.04
+HEAD_CENTER = (0.0, 0.0, 0.3)
+HEAD_RADIUS = 0.12
+TORSO_BOTTOM = -0.6  # torso: a thin vertical column below the shoulders
+TORSO_RADIUS = 0.05
+
+# Points sampled along each arm link for the distance checks.
+_LINK_POINTS = 6
+_EPS = 1e-6
+
+
+@dataclass(frozen=True)
+class Violation:
+    """One failed check."""
+
+    gesture: str
+    kind: str  # "limit" | "velocity" | "collision"
+    part: str
+    at: float
+    detail: str
+
+    def __str__(self) -> str:
+        return f"{self.gesture}/{self.part} @ {self.at:.2f}s: {self.kind}: {self.detail}"
+
+
+# =============================================================================
+# Checks
+# =============================================================================
+
+def check_pose(part: str, pose: Sequence[float]) -> List[str]:
+    """Joint-limit problems of one pose (empty if it is fine)."""
+    problems = []
+    values = np.atleast_1d(np.asarray(pose, dtype=np.float64))
+    for i, (value, (lo, hi)) in enumerate(zip(values.tolist(), JOINT_LIMITS[part])):
+        if not lo - _EPS <= value <= hi + _EPS:
+            problems.append(f"joint {i} at {value:.1f}° is outside [{lo:.0f}, {hi:.0f}]")
+    return problems
+
+
+def _rotation(axis: int, degrees: np.ndarray) -> np.ndarray:
+    """Stack of rotation matrices [n, 3, 3] about x (0), y (1) or z (2)."""
+    a = np.radians(degrees)
+    c, s = np.cos(a), np.sin(a)
+    r = np.zeros(a.shape + (3, 3))
+    i, j = [k for k in range(3) if k != axis]
+    r[..., axis, axis] = 1.0
+    r[..., i, i] = c
+    r[..., j, j] = c
+    # Right-handed: y rotates z into x, x and z rotate the first axis into the second.
+    sign = -1.0 if axis == 1 else 1.0
+    r[..., i, j] = -sign * s
+    r[..., j, i] = sign * s
+    return r
+
+
+def arm_points(side: str, q: np.ndarray) -> np.ndarray:
+    """Points along the upper arm and forearm [n, 2 * _LINK_POINTS, 3] for joint samples q[n, 7]."""
+    q = np.asarray(q, dtype=np.float64)
+    mirror = side == "l_arm"
+    if mirror:
+        # Solve as a right arm: mirror the angles about x and z across the sagittal plane.
+        q = q * np.array([1, -1, -1, 1, -1, 1, -1])
+    shoulder = np.array([0.0, -SHOULDER_Y, 0.0])
+    down = np.array([0.0, 0.0, -1.0])
+    upper = _rotation(1, q[:, 0]) @ _rotation(0, q[:, 1])
+    elbow = shoulder + upper @ (down * UPPER_ARM)
+    lower = upper @ _rotation(2, q[:, 2]) @ _rotation(1, q[:, 3])
+    hand = elbow + lower @ (down * FOREARM)
+
+    s = np.linspace(0.0, 1.0, _LINK_POINTS)[None, :, None]
+    points = np.concatenate([shoulder + s * (elbow - shoulder)[:, None, :],
+                             elbow[:, None, :] + s * (hand - elbow)[:, None, :]], axis=1)
+    if mirror:
+        points[..., 1] *= -1.0
+    return points
+
+
+def _first_collision(q_r: np.ndarray, q_l: np.ndarray) -> Optional[Tuple[int, str, float]]:
+    """First (tick, what, clearance in metres) where the arms hit something, or None."""
+    right, left = arm_points("r_arm", q_r), arm_points("l_arm", q_l)
+    # The shoulder point itself is attached to the body.
+    arms = {"r_arm": right[:, 1:], "l_arm": left[:, 1:]}
+
+    gaps = {"arm-arm": np.linalg.norm(arms["r_arm"][:, :, None] - arms["l_arm"][:, None], axis=-1)
+            .min(axis=(1, 2)) - 2 * ARM_RADIUS}
+    for side, points in arms.items():
+        head = np.linalg.norm(points - np.array(HEAD_CENTER), axis=-1).min(axis=1)
+        gaps[f"{side}-head"] = head - HEAD_RADIUS - ARM_RADIUS
+        below = np.clip(points[..., 2], TORSO_BOTTOM, 0.0)
+        axis = np.stack([np.zeros_like(below), np.zeros_like(below), below], axis=-1)
+        torso = np.linalg.norm(points - axis, axis=-1).min(axis=1)
+        gaps[f"{side}-torso"] = torso - TORSO_RADIUS - ARM_RADIUS
+
+    first = None
+    for what, gap in gaps.items():
+        hits = np.flatnonzero(gap < 0.0)
+        if hits.size and (first is None or hits[0] < first[0]):
+            first = (int(hits[0]), what, float(gap[hits[0]]))
+    return first
+
+
+def validate_gesture(gesture: "CompiledGesture") -> List[Violation]:
+    """Run every check on one compiled gesture."""
+    found: List[Violation] = []
+
+    for tick, leads in sorted(gesture.leads.items()):
+        for part, pose, duration in leads:
+            for problem in check_pose(part, pose):
+                found.append(Violation(gesture.name, "limit", part, tick / gesture.rate, problem))
+            start = np.asarray(REST[part])
+            peak = 1.875 * float(np.abs(np.atleast_1d(pose) - start).max()) / duration
+            if peak > VELOCITY_LIMITS[part]:
+                found.append(Violation(gesture.name, "velocity", part, tick / gesture.rate,
+                                       f"lead-in from rest peaks at {peak:.0f}°/s "
+                                       f"(limit {VELOCITY_LIMITS[part]:.0f})"))
+
+    for part, (samples, send) in gesture.parts.items():
+        lo, hi = np.array(JOINT_LIMITS[part]).T
+        outside = np.flatnonzero(send & np.any((samples < lo - _EPS) | (samples > hi + _EPS), axis=1))
+        if outside.size:
+            tick = int(outside[0])
+            found.append(Violation(gesture.name, "limit", part, tick / gesture.rate,
+                                   "; ".join(check_pose(part, samples[tick]))))
+        moving = np.flatnonzero(send[1:]) + 1
+        if moving.size:
+            speed = np.abs(samples[moving] - samples[moving - 1]).max(axis=1) * gesture.rate
+            worst = int(np.argmax(speed))
+            if speed[worst] > VELOCITY_LIMITS[part]:
+                found.append(Violation(gesture.name, "velocity", part, moving[worst] / gesture.rate,
+                                       f"streamed at {speed[worst]:.0f}°/s (limit {VELOCITY_LIMITS[part]:.0f})"))
+
+    for step in gesture.finish:
+        if "part" in step:
+            for problem in check_pose(step["part"], step["pose"]):
+                found.append(Violation(gesture.name, "limit", step["part"], gesture.duration, problem))
+
+    if "r_arm" in gesture.parts or "l_arm" in gesture.parts:
+        n_ticks = len(next(iter(gesture.parts.values()))[0])
+        arms = {side: gesture.parts[side][0] if side in gesture.parts else np.tile(REST[side], (n_ticks, 1))
+                for side in ("r_arm", "l_arm")}
+        hit = _first_collision(arms["r_arm"], arms["l_arm"])
+        if hit is not None:
+            tick, what, gap = hit
+            found.append(Violation(gesture.name, "collision", what.split("-")[0], tick / gesture.rate,
+                                   f"{what} overlap of {-gap * 100:.1f} cm"))
+    return found
+
+
+# =============================================================================
+# Cached validation of a whole library
+# =============================================================================
+
+def _tables_digest() -> str:
+    payload = json.dumps({"version": VALIDATOR_VERSION, "limits": JOINT_LIMITS, "rest": REST,
+                          "velocity": VELOCITY_LIMITS,
+                          "body": [SHOULDER_Y, UPPER_ARM, FOREARM, ARM_RADIUS, HEAD_CENTER,
+                                   HEAD_RADIUS, TORSO_BOTTOM, TORSO_RADIUS]},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def validate_library(gestures: Dict[str, "CompiledGesture"], cache_dir: str) -> List[Violation]:
+    """Validate every gesture, reusing cached results for unchanged ones.
+
+    Args:
+        gestures: Compiled gestures by name.
+        cache_dir: Directory holding validation.json.
+
+    Returns:
+        All violations found (empty if the library is safe to play).
+    """
+    path = os.path.join(cache_dir, CACHE_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    tables = _tables_digest()
+    fresh: Dict[str, List[Dict[str, Any]]] = {}
+    found: List[Violation] = []
+    checked = 0
+    for name, gesture in gestures.items():
+        key = f"{gesture.digest}:{tables}"
+        if key not in cache:
+            cache[key] = [asdict(v) for v in validate_gesture(gesture)]
+            checked += 1
+        fresh[key] = cache[key]
+        found.extend(Violation(**v) for v in cache[key])
+
+    if checked:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(fresh, f, indent=1)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not cache gesture validation in {path}: {e}")
+        logger.info(f"🛡️ Validated {checked} gesture(s): {len(found)} problem(s)")
+    return found
+
+
+# =============================================================================
+# Hand-coded gestures (run against the fake robot)
+# =============================================================================
+
+def validate_code() -> List[Violation]:
+    """Play every ReachyDemo gesture on the fake robot and check what it sends.
+
+    Checks the joint limits of every goto and, at each arm goto, the collision
+    model for the two arms' latest goals.
+    """
+    from ai_replace_this_demo import ReachyDemo
+    from clock import VirtualClock
+    from mock_reachy import FakeReachySDK
+
+    names = [name for name, value in vars(ReachyDemo).items() if hasattr(value, "coro")]
+    found: List[Violation] = []
+    for name in names:
+        clock = VirtualClock()
+        robot = FakeReachySDK(clock=clock)
+        demo = ReachyDemo(reachy=robot, clock=clock)
+        demo.engine.start()
+        try:
+            start = clock.monotonic()
+            getattr(demo, name)()
+        finally:
+            demo.engine.stop()
+        goals = {side: list(REST[side]) for side in ("r_arm", "l_arm")}
+        for record in robot.log:
+            if record.method != "goto" or record.part not in JOINT_LIMITS:
+                continue
+            at = record.time - start
+            for problem in check_pose(record.part, record.args[0]):
+                found.append(Violation(name, "limit", record.part, at, problem))
+            if record.part in goals:
+                goals[record.part] = list(np.atleast_1d(record.args[0]))
+                hit = _first_collision(np.array([goals["r_arm"]]), np.array([goals["l_arm"]]))
+                if hit is not None:
+                    found.append(Violation(name, "collision", record.part, at,
+                                           f"{hit[1]} overlap of {-hit[2] * 100:.1f} cm"))
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check gestures against joint limits, speed and collisions")
+    parser.add_argument("path", nargs="?", help="Gesture definition file (default: gestures.json)")
+    parser.add_argument("--code", action="store_true", help="Also check the hand-coded gestures")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    from gesture_compiler import DEFAULT_PATH, GestureLibrary
+
+    try:
+        library = GestureLibrary.load(args.path or DEFAULT_PATH, validate=False)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    found = validate_library(library.gestures, library.cache_dir)
+    if args.code:
+        found += validate_code()
+    for violation in found:
+        print(f"❌ {violation}")
+    if not found:
+        print(f"✅ All gestures pass ({len(library.gestures)} data-driven"
+              f"{', plus hand-coded' if args.code else ''})")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
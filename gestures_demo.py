@@ -0,0 +1,329 @@
+"""
+Demo Gestures - The show's gesture coroutines
+=============================================
+
+Every gesture of 'AI, Replace This' as an `@motion` method of DemoGestures,
+a thin object built around a ReachyDemo. The demo does not inherit these:
+it looks DemoGestures up through the key registry each time it needs it, so
+the module is imported on first use and, after a --reload, every entry
+point (keys, show cues, `demo.gesture_nodding()`, the shared `_perform`)
+runs the new code.
+
+A gesture is a coroutine against the demo's engine, power manager, compiled
+gesture library and show timeline. Most replay a compiled gesture from
+gestures.json through `_perform()`; the rest are written out here.
+
+Usage:
+    demo = ReachyDemo(reachy=FakeReachySDK())
+    demo.gesture_nodding()                       # blocks until done
+    DemoGestures(demo).gesture_nodding()         # the same
+    registry.add("5", "gestures_demo:DemoGestures.gesture_nodding", ...)
+"""
+
+import logging
+from typing import Any
+
+from gesture_engine import motion
+from head_ik import STAGE_TARGETS
+from power_manager import MOTOR_PARTS, ON, SOFT
+
+logger = logging.getLogger(__name__)
+
+
+class DemoGestures:
+    """The show's gestures, played on a ReachyDemo (or anything with the same parts)."""
+
+    def __init__(self, demo: Any):
+        self.demo = demo
+
+    @property
+    def reachy(self) -> Any:
+        return self.demo.reachy
+
+    @property
+    def connected(self) -> bool:
+        return self.demo.connected
+
+    @property
+    def engine(self) -> Any:
+        return self.demo.engine
+
+    @property
+    def power(self) -> Any:
+        return self.demo.power
+
+    @property
+    def library(self) -> Any:
+        return self.demo.library
+
+    @property
+    def show(self) -> Any:
+        return self.demo.show
+
+    async def _perform(self, name: str) -> bool:
+        """Replay a compiled gesture from gestures.json.
+
+        Returns:
+            False if the robot (or a part the gesture requires) is missing.
+        """
+        if not self.reachy:
+            return False
+        gesture = self.library[name]
+        if any(not getattr(self.reachy, part, None) for part in gesture.requires):
+            return False
+        await self.power.ensure(gesture.parts, ON)
+        await self.engine.replay(gesture)
+        return True
+
+    # =========================================================================
+    # ACT 1: THE DISMISSIVE HANDWAVE (Opener)
+    # =========================================================================
+
+    @motion
+    async def slump_defeated(self) -> None:
+        """Make robot appear 'defeated' - the starting position.
+
+        Presenter says: "Everyone's worried about AI replacing them. But watch this..."
+        """
+        logger.info("🎭 Slumping into defeated posture...")
+
+        if not self.reachy or not self.connected:
+            return
+
+        eng = self.engine
+
+        # Go compliant-looking but keep the motors warm for the snap
+        await self.power.ensure(MOTOR_PARTS, SOFT)
+
+        # Arms hang, head droops down
+        await eng.pose({
+            'r_arm': [0, -15, 0, 0, 0, 0, 0],
+            'l_arm': [0, 15, 0, 0, 0, 0, 0],
+            'head': [0, -25, 0],
+        }, 1.5)
+
+        logger.info("   Robot is now slumped. Ready for the handwave command.")
+
+    @motion
+    async def snap_to_attention(self) -> None:
+        """Snap robot to attention - the power moment.
+
+        Presenter waves hand and commands: "AI, stand at attention!"
+        """
+        logger.info("🎭 Snapping to ATTENTION!")
+
+        if not self.reachy or not self.connected:
+            return
+
+        eng = self.engine
+
+        # Full torque: motors are already warm, so this is one write per part
+        await self.power.ensure(MOTOR_PARTS, ON)
+
+        # Snap to elbow_90 posture (arms forward, ready)
+        await eng.posture('elbow_90', 1.2, hold=0)
+
+        # Head looks at presenter while the antennas perk up
+        await eng.parallel(
+            eng.look_at(*STAGE_TARGETS['presenter'], hold=1.5),  # Look slightly to the side
+            eng.pose({'l_antenna': 15, 'r_antenna': -15}, 0.5),
+        )
+
+        logger.info("   ✅ Robot at attention. YOU are in command.")
+
+    @motion
+    async def dismissive_handwave_sequence(self) -> None:
+        """Full sequence: slump → pause → snap to attention.
+
+        This is the complete opener. Run this before you start talking.
+        """
+        # Cue offsets (slump, pauses for the presenter, snap) live in show.json
+        await self.show.run(act='opener')
+
+    # =========================================================================
+    # ACT 2: THE LIVE IMPROV DIRECTOR (Main Demo)
+    # =========================================================================
+
+    @motion
+    async def gesture_boring_meeting(self) -> None:
+        """Gesture: Reacting to boring meetings.
+
+        Head droops (bored) → suddenly perks up → confused antenna twitch.
+        Presenter: "AI, replace sitting through boring meetings!"
+        """
+        logger.info("🎭 Gesture: BORING MEETING reaction")
+
+        if not await self._perform('boring_meeting'):
+            return
+
+        logger.info("   ✅ Even AI finds meetings tedious!")
+
+    @motion
+    async def gesture_pointing(self) -> None:
+        """Gesture: Pointing at the presentation screen.
+
+        Presenter: "AI, replace pointing at charts for me!"
+        """
+        logger.info("🎭 Gesture: POINTING at screen")
+
+        if not await self._perform('pointing'):
+            return
+
+        logger.info("   ✅ The classic presenter move - delegated!")
+
+    @motion
+    async def gesture_nodding(self) -> None:
+        """Gesture: Nodding in agreement (the meeting essential).
+
+        Presenter: "AI, replace nodding in meetings for me!"
+        """
+        logger.info("🎭 Gesture: NODDING in agreement")
+
+        if not await self._perform('nodding'):
+            return
+
+        logger.info("   ✅ The most automated action in corporate history!")
+
+    @motion
+    async def gesture_shrug(self) -> None:
+        """Gesture: Shrugging (I don't know / whatever).
+
+        Presenter: "Can you even decide to replace me?"
+        Robot shrugs.
+        """
+        logger.info("🎭 Gesture: SHRUG")
+
+        if not await self._perform('shrug'):
+            return
+
+        logger.info("   ✅ It can't even want things. YOU are the one with goals.")
+
+    @motion
+    async def gesture_holding(self) -> None:
+        """Gesture: Arms extended, palms up (ready to hold things).
+
+        Presenter: "AI, replace holding things for me!"
+        """
+        logger.info("🎭 Gesture: HOLDING / receiving")
+
+        if not await self._perform('holding'):
+            return
+
+        logger.info("   ✅ Basic manipulation - solved!")
+
+    # =========================================================================
+    # ACT 3: THE EMOTION AMPLIFIER (Closer)
+    # =========================================================================
+
+    @motion
+    async def emotion_curious(self) -> None:
+        """Emotion: CURIOUS - head tilts, leans forward, antenna perked.
+
+        Presenter: "AI, show me CURIOUS"
+        """
+        logger.info("🎭 Emotion: CURIOUS")
+
+        if not await self._perform('curious'):
+            return
+
+        logger.info("   ✅ Curiosity displayed - but only because YOU directed it.")
+
+    @motion
+    async def emotion_defeated(self) -> None:
+        """Emotion: DEFEATED - slumps, looks down.
+
+        Presenter: "AI, show me DEFEATED"
+        """
+        logger.info("🎭 Emotion: DEFEATED")
+
+        if not await self._perform('defeated'):
+            return
+
+        logger.info("   ✅ AI can ACT defeated, but it doesn't FEEL defeated.")
+
+    @motion
+    async def emotion_excited(self) -> None:
+        """Emotion: EXCITED - antennas wiggle, arms up, energetic.
+
+        Presenter: "AI, show me EXCITED"
+        """
+        logger.info("🎭 Emotion: EXCITED")
+
+        if not await self._perform('excited'):
+            return
+
+        logger.info("   ✅ Excitement performed - because YOU scripted it!")
+
+    @motion
+    async def emotion_listening(self) -> None:
+        """Emotion: LISTENING - tracks speaker, subtle nods.
+
+        Presenter: "AI, show me LISTENING"
+        """
+        logger.info("🎭 Emotion: LISTENING")
+
+        if not self.reachy or not self.reachy.head:
+            return
+
+        # Look at speaker
+        await self.engine.look_at(*STAGE_TARGETS['speaker'], duration=0.5, hold=0.5)
+
+        # Subtle nods and a little gaze drift while "listening", then a slight
+        # head tilt (engaged) - one generated trajectory streamed from the gaze pose
+        await self.engine.animate('head', [
+            {"motion": "sinusoid", "amplitude": [0, 3, 0], "tempo": 0.9, "cycles": 3},
+            {"motion": "noise", "amplitude": [0, 0, 1.5], "smoothness": 0.8, "seed": 7, "duration": 3.3},
+            {"at": 3.3, "motion": "ease", "to": [8, 0, 0], "duration": 0.5},
+        ], duration=3.8)
+
+        logger.info("   ✅ Active listening - performed, not felt.")
+
+    # =========================================================================
+    # CLOSER & UTILITIES
+    # =========================================================================
+
+    @motion
+    async def goodbye_wave(self) -> None:
+        """Closing gesture: A friendly wave goodbye.
+
+        Presenter: "AI didn't replace me today. It AMPLIFIED me."
+        """
+        logger.info("🎭 GOODBYE WAVE")
+
+        if not await self._perform('goodbye_wave'):
+            return
+
+        logger.info("   ✅ And that's a wrap! AI, standing down.")
+
+    @motion
+    async def reset(self) -> None:
+        """Reset robot to limp/off state."""
+        logger.info("🔄 Resetting robot...")
+
+        if self.reachy and self.connected:
+            await self.engine.call(self.reachy.turn_off_smoothly)
+
+        logger.info("   Robot is now compliant/off.")
+
+    @motion
+    async def home(self) -> None:
+        """Return to home/default posture."""
+        logger.info("🏠 Going to home posture...")
+
+        if not self.reachy:
+            return
+
+        eng = self.engine
+        await self.power.ensure(MOTOR_PARTS, ON)
+        await eng.posture('default', 2.0)
+
+        logger.info("   ✅ Home position.")
+
+    @motion
+    async def freeze(self) -> None:
+        """Emergency stop: hold the current pose.
+
+        Bound as an EMERGENCY command, so the queue has already cancelled the
+        gesture and flushed every queued goto by the time this runs.
+        """
+        logger.info("🛑 Emergency stop: holding pose")
@@ -0,0 +1,161 @@
+"""
+Head IK - Cached look_at solutions for the head
+===============================================
+
+`head.look_at(x, y, z)` makes the robot solve the head's inverse kinematics
+on every call. Gaze targets on stage repeat (the presenter's spot, the
+screen, the audience), so the solutions are cached instead:
+
+    - targets are quantized to a GRID_M grid (half a centimetre of error is
+      well under a degree at stage distances);
+    - a miss asks the SDK's head IK (`head.inverse_kinematics`, one round
+      trip to the robot) for the joints that face the target, and keeps the
+      answer in an LRU of CAPACITY entries, prewarmed at startup for
+      STAGE_TARGETS;
+    - GestureEngine.look_at() sends the cached joints straight as a head
+      goto (skipped when the head is already there), and falls back to the
+      SDK's own look_at when the IK is unavailable.
+
+`stats()` reports the hit rate and the time saved by hits compared with the
+IK round trips the misses actually took.
+
+Usage:
+    cache = LookAtCache()
+    cache.prewarm(STAGE_TARGETS.values(), reachy.head.inverse_kinematics)
+    joints = cache.lookup(0.5, 0.3, 0.1)      # None on a miss
+    cache.store(0.5, 0.3, 0.1, solution, seconds)
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cartesian gaze targets used by the show (metres, robot frame: x forward, y left, z up).
+STAGE_TARGETS: Dict[str, Tuple[float, float, float]] = {
+    "presenter": (0.5, 0.2, 0.1),
+    "speaker": (0.5, 0.3, 0.1),
+    "audience": (1.0, 0.0, 0.0),
+    "screen": (0.5, -0.4, 0.2),
+}
+
+GRID_M = 0.005
+CAPACITY = 4096
+
+Point = Tuple[float, float, float]
+
+
+def look_at_orientation(x: float, y: float, z: float) -> List[float]:
+    """Head orientation [roll, pitch, yaw] (degrees) that faces (x, y, z).
+
+    In the joint convention of the authored gestures: positive yaw turns
+    left, negative pitch looks down. The SDK's head IK turns this into neck
+    joint goals.
+    """
+    yaw = math.degrees(math.atan2(y, x))
+    pitch = math.degrees(math.atan2(z, math.hypot(x, y)))
+    return [0.0, pitch, yaw]
+
+
+def solve(ik: Callable[..., List[float]], x: float, y: float, z: float) -> List[float]:
+    """Neck joint goals that face (x, y, z), from the SDK's head IK `ik`."""
+    return [float(v) for v in ik(rpy=look_at_orientation(x, y, z))]
+
+
+class LookAtCache:
+    """Grid-quantized LRU of look_at target -> head joint solution."""
+
+    def __init__(self, grid: float = GRID_M, capacity: int = CAPACITY):
+        """Create an empty cache.
+
+        Args:
+            grid: Quantization step for targets (metres).
+            capacity: Most solutions kept; the least recently used is evicted.
+        """
+        self.grid = grid
+        self.capacity = capacity
+        self._solutions: "OrderedDict[Tuple[int, int, int], List[float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._solves = 0
+        self._solve_s = 0.0
+        self._hit_s = 0.0
+
+    def _key(self, x: float, y: float, z: float) -> Tuple[int, int, int]:
+        return (round(x / self.grid), round(y / self.grid), round(z / self.grid))
+
+    def centre(self, x: float, y: float, z: float) -> Point:
+        """Centre of the grid cell holding (x, y, z): the point a miss should be solved for.
+
+        Every target in the cell then gets the same answer.
+        """
+        kx, ky, kz = self._key(x, y, z)
+        return (kx * self.grid, ky * self.grid, kz * self.grid)
+
+    def lookup(self, x: float, y: float, z: float) -> Optional[List[float]]:
+        """Cached head joint goals for a target (None on a miss)."""
+        started = time.perf_counter()
+        key = self._key(x, y, z)
+        solution = self._solutions.get(key)
+        if solution is None:
+            self.misses += 1
+            return None
+        self._solutions.move_to_end(key)
+        self.hits += 1
+        self._hit_s += time.perf_counter() - started
+        return list(solution)
+
+    def store(self, x: float, y: float, z: float, solution: List[float], seconds: float) -> None:
+        """Keep the IK solution for a target's cell.
+
+        Args:
+            solution: Head joint goals returned by the IK.
+            seconds: How long the IK call took (the cost a later hit saves).
+        """
+        key = self._key(x, y, z)
+        self._solutions[key] = [float(v) for v in solution]
+        self._solutions.move_to_end(key)
+        if len(self._solutions) > self.capacity:
+            self._solutions.popitem(last=False)
+        self._solves += 1
+        self._solve_s += seconds
+
+    def prewarm(self, targets: Iterable[Point], ik: Callable[..., List[float]]) -> int:
+        """Solve `targets` ahead of time with the head IK `ik` (not counted as lookups).
+
+        A target the IK fails on is left to be solved (or looked at) later.
+
+        Returns:
+            Number of targets now cached.
+        """
+        for target in targets:
+            point = self.centre(*target)
+            started = time.perf_counter()
+            try:
+                solution = solve(ik, *point)
+            except Exception as e:
+                logger.debug(f"   look_at {point}: IK failed: {e}")
+                continue
+            self.store(*point, solution, time.perf_counter() - started)
+        return len(self._solutions)
+
+    def __len__(self) -> int:
+        return len(self._solutions)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and the IK round trips saved by cache hits."""
+        lookups = self.hits + self.misses
+        mean_solve = self._solve_s / self._solves if self._solves else 0.0
+        mean_hit = self._hit_s / self.hits if self.hits else 0.0
+        return {
+            "entries": len(self._solutions),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "mean_solve_us": round(mean_solve * 1e6, 2),
+            "mean_hit_us": round(mean_hit * 1e6, 2),
+            "saved_ms": round(max(0.0, mean_solve - mean_hit) * self.hits * 1000, 4),
+        }
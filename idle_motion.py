@@ -0,0 +1,265 @@
+"""
+Idle Motion - Keep the robot looking alive between cues
+=======================================================
+
+After home() or snap_to_attention() the robot would otherwise freeze until
+the next cue. IdleMotion runs on the engine loop and layers small motions
+on top of wherever the robot stopped:
+
+    breathing     slow head pitch sway (BREATH_DEG at BREATH_HZ)
+    gaze drift    smooth noise on head yaw and pitch
+    twitch        an occasional antenna flick (about every TWITCH_EVERY_S)
+
+The motion is generated in blocks of BLOCK_S with motion_generators on a
+worker thread, so the loop only indexes a precomputed array per tick, and
+streamed as one send_goal_positions per tick at `rate_hz` (10 Hz default).
+
+It never competes with real motion:
+
+    - a tick is skipped while a gesture is playing, a track is held, a
+      move sent by someone else is still running, the robot is settling,
+      the motors are off or the link is down; after that it waits QUIET_S
+      and restarts from the new pose;
+    - parts claimed by another controller (`engine.claims`: the head while
+      a gaze tracker runs) are left out, and its streams don't count as
+      activity; the antennas keep idling;
+    - a token bucket caps SDK calls at `max_calls_per_s`, and ticks are
+      skipped while the loop-thread CPU spent on idle motion over the last
+      second exceeds `cpu_budget`.
+
+A tick is the only thing a cue can ever wait behind; `stats()` reports its
+mean and worst cost (plus calls, yields, capped ticks and CPU share).
+
+Usage:
+    idle = IdleMotion(engine)
+    idle.start()      # between cues
+    print(idle.stats())
+"""
+
+import asyncio
+import contextvars
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from gesture_engine import GestureEngine
+from motion_generators import trajectory
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE_HZ = 10.0
+MAX_CALLS_PER_S = 12.0
+# Share of one core the idle ticks may use on the loop thread.
+CPU_BUDGET = 0.01
+
+# Quiet time after the last real motion before idling starts.
+QUIET_S = 1.0
+# True inside the idle task, so its own commands don't count as activity.
+_idling: contextvars.ContextVar[bool] = contextvars.ContextVar("idling", default=False)
+BLOCK_S = 16.0
+
+BREATH_DEG = 1.2
+BREATH_HZ = 0.25
+DRIFT_DEG = (1.0, 3.0)        # head pitch, yaw
+DRIFT_SMOOTHNESS_S = 2.5
+TWITCH_DEG = 12.0
+TWITCH_EVERY_S = 6.0
+
+IDLE_PARTS = ("head", "l_antenna", "r_antenna")
+_POWER_OFF = ("turn_off", "turn_off_smoothly")
+
+
+def idle_layers(duration: float, rng: random.Random) -> Dict[str, List[Dict[str, Any]]]:
+    """Motion layers of one idle block, per part."""
+    twitches = []
+    t = rng.expovariate(1.0 / TWITCH_EVERY_S)
+    while t < duration - 1.0:
+        twitches.append(t)
+        t += rng.expovariate(1.0 / TWITCH_EVERY_S)
+    head = [
+        {"motion": "sinusoid", "amplitude": [0, BREATH_DEG, 0], "tempo": BREATH_HZ,
+         "cycles": int(duration * BREATH_HZ)},
+        {"motion": "noise", "amplitude": [0, *DRIFT_DEG], "smoothness": DRIFT_SMOOTHNESS_S,
+         "seed": rng.randrange(1 << 30), "duration": duration},
+    ]
+    antennas = {
+        side: [{"at": at, "motion": "sinusoid", "amplitude": sign * TWITCH_DEG, "tempo": 1.5, "cycles": 1}
+               for at in twitches]
+        for side, sign in (("l_antenna", 1.0), ("r_antenna", -1.0))
+    }
+    return {"head": head, **antennas}
+
+
+class IdleMotion:
+    """Background micro-motion that yields to every real gesture."""
+
+    def __init__(self, engine: GestureEngine, rate_hz: float = DEFAULT_RATE_HZ,
+                 max_calls_per_s: float = MAX_CALLS_PER_S, cpu_budget: float = CPU_BUDGET,
+                 seed: Optional[int] = None):
+        """Create an idle behaviour (call start()).
+
+        Args:
+            engine: Engine whose loop runs the ticks.
+            rate_hz: Command rate while idling.
+            max_calls_per_s: Hard cap on idle SDK calls per second.
+            cpu_budget: Most loop-thread CPU (fraction of a core) idle ticks may use.
+            seed: Random seed for the drift and twitches (None: random).
+        """
+        self.engine = engine
+        self.rate_hz = rate_hz
+        self.max_calls_per_s = max_calls_per_s
+        self.cpu_budget = cpu_budget
+        self._rng = random.Random(seed)
+        self._task: Optional[asyncio.Task] = None
+        self._block: Optional[Dict[str, np.ndarray]] = None
+        self._base: Optional[Dict[str, List[float]]] = None
+        self._t0 = 0.0
+        self._claimed: frozenset = frozenset()
+        self._busy_until = float("-inf")
+        self._powered = True
+        self._tokens = max_calls_per_s
+        self._refilled = 0.0
+        self._cpu: Deque[Tuple[float, float]] = deque()
+        self.ticks = 0
+        self.calls = 0
+        self.yields = 0
+        self.capped = 0
+        self.cpu_skipped = 0
+        self.cpu_s = 0.0
+        self.max_tick_s = 0.0
+        self._started_at: Optional[float] = None
+        engine.recorders.append(self._on_command)
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> "IdleMotion":
+        """Start idling on the engine loop (idempotent)."""
+        self.engine.start()
+        self.engine.call_soon(self._spawn)
+        return self
+
+    def _spawn(self) -> None:
+        if not self.running:
+            self._started_at = self.engine.clock.monotonic()
+            self._refilled = self._started_at
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self) -> None:
+        """Stop idling (the robot keeps its last idle pose)."""
+        self.engine.call_soon(lambda: self._task.cancel() if self._task is not None else None)
+
+    def _on_command(self, part: str, method: str, args: tuple, kwargs: dict, sent_at: float) -> None:
+        if _idling.get():
+            return
+        if method == "send_goal_positions" and args and set(args[0]) <= set(self.engine.claims):
+            # A claimed part's controller streaming (gaze), not a move to wait for.
+            return
+        self._busy_until = max(self._busy_until, sent_at + float(kwargs.get("duration", 0.0)))
+        if method in _POWER_OFF:
+            self._powered = False
+        elif method == "turn_on":
+            self._powered = True
+
+    # -------------------------------------------------------------------------
+    # Ticks
+    # -------------------------------------------------------------------------
+
+    def _quiet(self, now: float) -> bool:
+        if not self._powered or now < self._busy_until + QUIET_S:
+            return False
+        return self.engine.idle_for(*IDLE_PARTS, now=now, margin=QUIET_S)
+
+    async def _run(self) -> None:
+        _idling.set(True)
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.rate_hz
+        joints = {part: self.engine.joints(part) for part in IDLE_PARTS}
+        next_tick = loop.time()
+        while True:
+            next_tick = max(next_tick + period, loop.time())
+            await self.engine.sleep(next_tick - loop.time())
+            now = self.engine.clock.monotonic()
+            claimed = frozenset(self.engine.claims)
+            if claimed != self._claimed:
+                # Restart from the present pose: a released part moved meanwhile.
+                self._claimed = claimed
+                self._block = self._base = None
+            if not self._quiet(now):
+                if self._base is not None:
+                    self.yields += 1
+                self._block = self._base = None
+                continue
+            if self._block is None or (now - self._t0) * self.rate_hz >= BLOCK_S * self.rate_hz - 1:
+                if self._base is None:
+                    self._base = {part: self.engine.present(part) for part in IDLE_PARTS}
+                    joints = {part: self.engine.joints(part) for part in IDLE_PARTS}
+                    if any(pose is None for pose in self._base.values()):
+                        self._base = None
+                        continue
+                base, seed = self._base, self._rng.randrange(1 << 30)
+                block = await loop.run_in_executor(None, _block, base, seed, self.rate_hz)
+                if not self._quiet(self.engine.clock.monotonic()) or self._base is not base:
+                    continue
+                self._block, self._t0 = block, self.engine.clock.monotonic()
+            await self._tick(now, joints)
+
+    async def _tick(self, now: float, joints: Dict[str, List[Any]]) -> None:
+        self._tokens = min(self.max_calls_per_s, self._tokens + (now - self._refilled) * self.max_calls_per_s)
+        self._refilled = now
+        if self._tokens < 1.0:
+            self.capped += 1
+            return
+        while self._cpu and self._cpu[0][0] < now - 1.0:
+            self._cpu.popleft()
+        if sum(cost for _, cost in self._cpu) > self.cpu_budget:
+            self.cpu_skipped += 1
+            return
+
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        index = min(int((now - self._t0) * self.rate_hz), len(self._block["head"]) - 1)
+        # Only parts that moved since the previous tick (antennas rest between twitches).
+        goals = {part: q[index].tolist() for part, q in self._block.items()
+                 if part not in self._claimed and (index == 0 or np.any(np.abs(q[index] - q[index - 1]) > 1e-3))}
+        if not goals:
+            return
+        # Measured up to the send: the call itself runs on a worker, not the loop.
+        cost = time.thread_time() - cpu_started
+        self._cpu.append((now, cost))
+        self._tokens -= 1.0
+        self.ticks += 1
+        self.calls += 1
+        self.cpu_s += cost
+        self.max_tick_s = max(self.max_tick_s, time.perf_counter() - started)
+        await self.engine.stream(goals, joints)
+
+    def stats(self) -> Dict[str, Any]:
+        """Idle overhead: calls, yields, caps and the cost of one tick."""
+        elapsed = self.engine.clock.monotonic() - self._started_at if self._started_at is not None else 0.0
+        return {
+            "running": self.running,
+            "ticks": self.ticks,
+            "calls": self.calls,
+            "calls_per_s": round(self.calls / elapsed, 2) if elapsed > 0 else 0.0,
+            "yields": self.yields,
+            "capped": self.capped,
+            "cpu_skipped": self.cpu_skipped,
+            "cpu_share": round(self.cpu_s / elapsed, 5) if elapsed > 0 else 0.0,
+            "mean_tick_us": round(self.cpu_s / self.ticks * 1e6, 1) if self.ticks else 0.0,
+            "max_tick_us": round(self.max_tick_s * 1e6, 1),
+        }
+
+
+def _block(base: Dict[str, List[float]], seed: int, rate: float) -> Dict[str, np.ndarray]:
+    """Sample one idle block around `base` (runs on a worker thread)."""
+    layers = idle_layers(BLOCK_S, random.Random(seed))
+    return {part: trajectory(base[part], layers[part], BLOCK_S, rate)[1] for part in IDLE_PARTS}
@@ -0,0 +1,245 @@
+"""
+Key Input - Single-keystroke, low-latency key reader
+====================================================
+
+Reads keys straight from the terminal (no Enter, no line buffering) on a
+background thread and fires one KeyEvent per key-down:
+
+    - POSIX: termios cbreak mode + select() on stdin (Ctrl-C still works)
+    - Windows: msvcrt polling
+
+Holding a key down only fires once: terminal auto-repeat is suppressed as
+long as the same key keeps arriving within `repeat_window`. Registered
+chords (e.g. "H+R") fire when both keys arrive within `chord_window`; keys
+that are not part of any chord are never delayed.
+
+Each event carries the monotonic time at which the key was read, so it can
+be passed on as CommandQueue.submit(..., pressed_at=event.time) to measure
+keypress-to-motion latency end to end.
+
+Usage:
+    with KeyReader(chords=["H+R"]) as keys:
+        event = keys.read()
+        print(event.key, event.time)
+"""
+
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+# Escape sequences of the keys worth naming.
+ESCAPES = {
+    "\x1b[A": "UP",
+    "\x1b[B": "DOWN",
+    "\x1b[C": "RIGHT",
+    "\x1b[D": "LEFT",
+    "\x1b": "ESC",
+}
+
+
+@dataclass(frozen=True)
+class KeyEvent:
+    """A key-down (or chord) with the monotonic time it was read."""
+
+    key: str
+    time: float
+    chord: bool = False
+
+
+class KeyReader:
+    """Background reader turning raw keystrokes into KeyEvents."""
+
+    def __init__(self, on_key: Optional[Callable[[KeyEvent], None]] = None,
+                 repeat_window: float = 0.25, chords: Iterable[str] = (),
+                 chord_window: float = 0.06, stream: TextIO = sys.stdin):
+        """Create a reader (call start() or use it as a context manager).
+
+        Args:
+            on_key: Callback run on the reader thread for each event; if
+                omitted, events are queued for read().
+            repeat_window: Repeats of the same key closer than this are dropped.
+            chords: Key combinations such as "H+R" to report as one event.
+            chord_window: Maximum spacing between the keys of a chord.
+            stream: Terminal to read from.
+        """
+        self.on_key = on_key
+        self.repeat_window = repeat_window
+        self.chord_window = chord_window
+        self.chords = {frozenset(k.upper() for k in chord.split("+")) for chord in chords}
+        self._chord_keys = set().union(*self.chords) if self.chords else set()
+        self.stream = stream
+        self.events: "queue.Queue[KeyEvent]" = queue.Queue()
+        self.suppressed = 0
+        self._last_key: Optional[str] = None
+        self._last_time = float("-inf")
+        self._held: Optional[KeyEvent] = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._saved_attrs = None
+
+    @staticmethod
+    def supported(stream: TextIO = sys.stdin) -> bool:
+        """True if `stream` is an interactive terminal we can read raw keys from."""
+        try:
+            return stream.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def start(self) -> "KeyReader":
+        if self._running:
+            return self
+        self._enter_raw()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="key-reader", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=0.5)
+            self._thread = None
+        self._restore()
+
+    def __enter__(self) -> "KeyReader":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def read(self, timeout: Optional[float] = None) -> Optional[KeyEvent]:
+        """Next queued event (None on timeout)."""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    # -------------------------------------------------------------------------
+    # Terminal handling
+    # -------------------------------------------------------------------------
+
+    def _enter_raw(self) -> None:
+        if os.name == "nt":
+            return
+        import termios
+        import tty
+
+        fd = self.stream.fileno()
+        self._saved_attrs = termios.tcgetattr(fd)
+        tty.setcbreak(fd)
+
+    def _restore(self) -> None:
+        if self._saved_attrs is None:
+            return
+        import termios
+
+        termios.tcsetattr(self.stream.fileno(), termios.TCSADRAIN, self._saved_attrs)
+        self._saved_attrs = None
+
+    def _read_chars(self, timeout: float) -> str:
+        """Whatever is available within `timeout` seconds ('' if nothing)."""
+        if os.name == "nt":
+            import msvcrt
+
+            deadline = time.monotonic() + timeout
+            while not msvcrt.kbhit():
+                if time.monotonic() >= deadline:
+                    return ""
+                time.sleep(0.002)
+            chars = []
+            while msvcrt.kbhit():
+                chars.append(msvcrt.getwch())
+            return "".join(chars)
+
+        import select
+
+        fd = self.stream.fileno()
+        ready, _, _ = select.select([fd], [], [], timeout)
+        if not ready:
+            return ""
+        return os.read(fd, 64).decode("utf-8", errors="ignore")
+
+    @staticmethod
+    def _split(chars: str) -> List[str]:
+        """Split a read into keys, keeping escape sequences whole."""
+        keys = []
+        i = 0
+        while i < len(chars):
+            if chars[i] == "\x1b" and chars[i:i + 3] in ESCAPES:
+                keys.append(ESCAPES[chars[i:i + 3]])
+                i += 3
+            elif chars[i] == "\x1b":
+                keys.append("ESC")
+                i += 1
+            elif chars[i] in "\r\n":
+                i += 1
+            else:
+                keys.append(chars[i].upper())
+                i += 1
+        return keys
+
+    # -------------------------------------------------------------------------
+    # Event processing
+    # -------------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while self._running:
+            timeout = 0.05
+            if self._held is not None:
+                timeout = max(0.0, self._held.time + self.chord_window - time.monotonic())
+            try:
+                chars = self._read_chars(timeout)
+            except (OSError, ValueError) as e:
+                logger.error(f"❌ Key reader stopped: {e}")
+                return
+            now = time.monotonic()
+            for key in self._split(chars):
+                self.feed(key, now)
+            self._flush_held(time.monotonic())
+
+    def feed(self, key: str, now: float) -> None:
+        """Process one key read at `now` (also usable without a terminal)."""
+        key = key.upper()
+        if key == self._last_key and now - self._last_time < self.repeat_window:
+            # Auto-repeat of a held key: keep sliding the window, fire nothing.
+            self._last_time = now
+            self.suppressed += 1
+            return
+        self._last_key, self._last_time = key, now
+
+        held = self._held
+        if held is not None and frozenset((held.key, key)) in self.chords:
+            self._held = None
+            self._emit(KeyEvent("+".join(sorted((held.key, key))), held.time, chord=True))
+            return
+        self._flush_held(now, force=True)
+        if key in self._chord_keys:
+            self._held = KeyEvent(key, now)
+        else:
+            self._emit(KeyEvent(key, now))
+
+    def _flush_held(self, now: float, force: bool = False) -> None:
+        held = self._held
+        if held is not None and (force or now - held.time >= self.chord_window):
+            self._held = None
+            self._emit(held)
+
+    def _emit(self, event: KeyEvent) -> None:
+        if self.on_key is not None:
+            try:
+                self.on_key(event)
+            except Exception as e:
+                logger.error(f"❌ Key handler failed for {event.key}: {e}")
+        else:
+            self.events.put(event)
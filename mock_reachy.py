@@ -0,0 +1,366 @@
+"""
+Mock Reachy - Offline, in-process stand-in for reachy2_sdk.ReachySDK
+====================================================================
+
+Mimics the parts of the SDK this project uses so everything can run
+without the Docker simulator:
+
+    reachy.turn_on() / turn_off() / turn_off_smoothly() / goto_posture()
+    reachy.head.goto() / look_at() / rotate_by() / turn_on() / turn_off()
+    reachy.head.inverse_kinematics()
+    part.set_torque_limits()
+    reachy.l_arm.goto() / reachy.r_arm.goto()
+    reachy.head.l_antenna.goto() / reachy.head.r_antenna.goto()
+    joint.goal_position + reachy.send_goal_positions()
+    part.get_current_positions(), reachy.cancel_all_goto()
+
+Gotos are queued per part like on the real robot and interpolated with a
+minimum-jerk profile, so present positions are meaningful. Every command is
+recorded with its (clock) timestamp in `reachy.log`.
+
+Pair it with a VirtualClock to fast-forward a whole show:
+
+    clock = VirtualClock()
+    demo = ReachyDemo(reachy=FakeReachySDK(clock=clock), clock=clock)
+    demo.dismissive_handwave_sequence()   # finishes in milliseconds
+
+Usage:
+    python ai_replace_this_demo.py --mock
+"""
+
+import threading
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from clock import SystemClock
+from head_ik import look_at_orientation
+
+# Approximate joint targets for the SDK's named postures.
+POSTURES: Dict[str, Dict[str, List[float]]] = {
+    "default": {
+        "head": [0, 0, 0],
+        "r_arm": [0, -15, 0, 0, 0, 0, 0],
+        "l_arm": [0, 15, 0, 0, 0, 0, 0],
+    },
+    "elbow_90": {
+        "head": [0, 0, 0],
+        "r_arm": [0, -15, 0, -90, 0, 0, 0],
+        "l_arm": [0, 15, 0, -90, 0, 0, 0],
+    },
+}
+
+
+@dataclass
+class CommandRecord:
+    """One SDK call received by the fake robot."""
+
+    time: float
+    part: str
+    method: str
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    accepted: bool = True
+
+
+def _min_jerk(s: float) -> float:
+    return s * s * s * (10.0 + s * (-15.0 + 6.0 * s))
+
+
+class FakeJoint:
+    """A single joint with goal and present position (degrees)."""
+
+    def __init__(self, part: "FakePart", index: int):
+        self._part = part
+        self._index = index
+
+    @property
+    def present_position(self) -> float:
+        return self._part.get_current_positions()[self._index]
+
+    @property
+    def goal_position(self) -> float:
+        return self._part._goals.get(self._index, self.present_position)
+
+    @goal_position.setter
+    def goal_position(self, value: float) -> None:
+        # Like the SDK, only joints written since the last send get sent.
+        self._part._goals[self._index] = float(value)
+
+
+class _Axes(SimpleNamespace):
+    """Group of joints reachable as attributes (e.g. neck.pitch)."""
+
+
+class FakePart:
+    """A jointed body part with a per-part goto queue."""
+
+    def __init__(self, robot: "FakeReachySDK", name: str, joint_names: Sequence[str]):
+        self._robot = robot
+        self.name = name
+        self.joint_names = list(joint_names)
+        self._on = True
+        self.torque_limit = 100.0
+        # Queued moves: (start, end, from_pose, to_pose)
+        self._moves: List[Tuple[float, float, List[float], List[float]]] = []
+        self._rest = [0.0] * len(joint_names)
+        self._goals: Dict[int, float] = {}
+        self._joints = [FakeJoint(self, i) for i in range(len(joint_names))]
+        groups: Dict[str, _Axes] = {}
+        for joint_name, joint in zip(self.joint_names, self._joints):
+            group, _, axis = joint_name.partition(".")
+            if axis:
+                groups.setdefault(group, _Axes())
+                setattr(groups[group], axis, joint)
+        for group, axes in groups.items():
+            setattr(self, group, axes)
+
+    # -- state ----------------------------------------------------------------
+
+    @property
+    def joints(self) -> Dict[str, FakeJoint]:
+        return dict(zip(self.joint_names, self._joints))
+
+    def is_on(self) -> bool:
+        return self._on
+
+    def is_moving(self) -> bool:
+        return self._robot.clock.monotonic() < self._busy_until()
+
+    def _busy_until(self) -> float:
+        return self._moves[-1][1] if self._moves else 0.0
+
+    def get_current_positions(self) -> List[float]:
+        now = self._robot.clock.monotonic()
+        with self._robot._lock:
+            pose = list(self._rest)
+            while self._moves and self._moves[0][1] <= now:
+                self._rest = list(self._moves.pop(0)[3])
+                pose = list(self._rest)
+            if self._moves and self._moves[0][0] <= now:
+                start, end, src, dst = self._moves[0]
+                s = _min_jerk((now - start) / (end - start))
+                pose = [a + s * (b - a) for a, b in zip(src, dst)]
+        return pose
+
+    # -- commands -------------------------------------------------------------
+
+    def turn_on(self) -> None:
+        self._robot._record(self.name, "turn_on")
+        self._on = True
+
+    def turn_off(self) -> None:
+        self._robot._record(self.name, "turn_off")
+        self._on = False
+
+    def set_torque_limits(self, value: float) -> None:
+        self._robot._record(self.name, "set_torque_limits", (value,), accepted=self._on)
+        if self._on:
+            self.torque_limit = float(value)
+
+    def goto(self, target: Any, duration: float = 2.0, wait: bool = False, **kwargs: Any) -> int:
+        accepted = self._on
+        self._robot._record(self.name, "goto", (target,), dict(duration=duration, wait=wait, **kwargs),
+                            accepted=accepted)
+        if not accepted:
+            return -1
+        pose = [float(v) for v in (target if isinstance(target, (list, tuple)) else [target])]
+        self._queue(pose, duration, wait)
+        return len(self._robot.log)
+
+    def _queue(self, pose: List[float], duration: float, wait: bool) -> None:
+        now = self._robot.clock.monotonic()
+        with self._robot._lock:
+            start = max(now, self._busy_until())
+            src = list(self._moves[-1][3]) if self._moves else list(self._rest)
+            self._moves.append((start, start + max(duration, 1e-3), src, pose))
+            end = self._moves[-1][1]
+        if wait:
+            self._robot.clock.sleep(end - now)
+
+    def cancel_all_goto(self) -> None:
+        self._robot._record(self.name, "cancel_all_goto")
+        pose = self.get_current_positions()
+        with self._robot._lock:
+            self._moves.clear()
+            self._rest = pose
+
+    def _apply_goals(self) -> bool:
+        """Jump to the pending goal positions (streamed control)."""
+        if not self._goals:
+            return False
+        pose = self.get_current_positions()
+        with self._robot._lock:
+            for index, value in self._goals.items():
+                pose[index] = value
+            self._goals.clear()
+            self._moves.clear()
+            self._rest = pose
+        return True
+
+
+class FakeAntenna(FakePart):
+    """An antenna: a one-joint part that is also its own joint."""
+
+    def __init__(self, robot: "FakeReachySDK", name: str):
+        super().__init__(robot, name, [name])
+
+    @property
+    def goal_position(self) -> float:
+        return self._joints[0].goal_position
+
+    @goal_position.setter
+    def goal_position(self, value: float) -> None:
+        self._joints[0].goal_position = value
+
+    @property
+    def present_position(self) -> float:
+        return self.get_current_positions()[0]
+
+
+class FakeHead(FakePart):
+    """Head with neck joints (roll, pitch, yaw) and the two antennas."""
+
+    def __init__(self, robot: "FakeReachySDK"):
+        super().__init__(robot, "head", ["neck.roll", "neck.pitch", "neck.yaw"])
+        self.l_antenna = FakeAntenna(robot, "l_antenna")
+        self.r_antenna = FakeAntenna(robot, "r_antenna")
+
+    def look_at(self, x: float, y: float, z: float, duration: float = 2.0, wait: bool = False,
+                **kwargs: Any) -> int:
+        self._robot._record(self.name, "look_at", (x, y, z), dict(duration=duration, wait=wait, **kwargs),
+                            accepted=self._on)
+        if not self._on:
+            return -1
+        self._queue(self.inverse_kinematics(rpy=look_at_orientation(x, y, z)), duration, wait)
+        return len(self._robot.log)
+
+    def inverse_kinematics(self, rpy: Optional[List[float]] = None, **kwargs: Any) -> List[float]:
+        """Neck joints for a head orientation (the fake's neck joints are roll, pitch, yaw)."""
+        return [float(v) for v in (rpy if rpy is not None else self._rest)]
+
+    def rotate_by(self, roll: float = 0, pitch: float = 0, yaw: float = 0, duration: float = 2.0,
+                  wait: bool = False, **kwargs: Any) -> int:
+        self._robot._record(self.name, "rotate_by", (), dict(roll=roll, pitch=pitch, yaw=yaw,
+                                                            duration=duration, wait=wait, **kwargs),
+                            accepted=self._on)
+        if not self._on:
+            return -1
+        with self._robot._lock:
+            base = list(self._moves[-1][3]) if self._moves else list(self._rest)
+        self._queue([base[0] + roll, base[1] + pitch, base[2] + yaw], duration, wait)
+        return len(self._robot.log)
+
+    def turn_on(self) -> None:
+        super().turn_on()
+        self.l_antenna._on = self.r_antenna._on = True
+
+    def turn_off(self) -> None:
+        super().turn_off()
+        self.l_antenna._on = self.r_antenna._on = False
+
+
+class FakeArm(FakePart):
+    """7-DoF arm."""
+
+    def __init__(self, robot: "FakeReachySDK", name: str):
+        super().__init__(robot, name, ["shoulder.pitch", "shoulder.roll", "elbow.yaw", "elbow.pitch",
+                                       "wrist.roll", "wrist.pitch", "wrist.yaw"])
+
+
+class FakeReachySDK:
+    """In-process fake of reachy2_sdk.ReachySDK.
+
+    Args:
+        host: Ignored; kept for signature compatibility.
+        clock: Time source for motion and timestamps (SystemClock by default).
+    """
+
+    def __init__(self, host: str = "localhost", clock: Optional[Any] = None):
+        self.host = host
+        self.clock = clock or SystemClock()
+        self.log: List[CommandRecord] = []
+        self._lock = threading.RLock()
+        self._connected = True
+        self.info = SimpleNamespace(mode="FAKE", config="full_kit")
+        self.head = FakeHead(self)
+        self.l_arm = FakeArm(self, "l_arm")
+        self.r_arm = FakeArm(self, "r_arm")
+
+    @property
+    def parts(self) -> List[FakePart]:
+        return [self.head, self.l_arm, self.r_arm, self.head.l_antenna, self.head.r_antenna]
+
+    def _record(self, part: str, method: str, args: Tuple[Any, ...] = (),
+                kwargs: Optional[Dict[str, Any]] = None, accepted: bool = True) -> None:
+        with self._lock:
+            self.log.append(CommandRecord(self.clock.monotonic(), part, method, args, kwargs or {}, accepted))
+
+    # -- connection -----------------------------------------------------------
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def connect(self) -> None:
+        self._record("reachy", "connect")
+        self._connected = True
+
+    def disconnect(self) -> None:
+        self._record("reachy", "disconnect")
+        self._connected = False
+
+    # -- whole-robot commands -------------------------------------------------
+
+    def turn_on(self) -> None:
+        self._record("reachy", "turn_on")
+        for part in self.parts:
+            part._on = True
+
+    def turn_off(self) -> None:
+        self._record("reachy", "turn_off")
+        for part in self.parts:
+            part._on = False
+
+    def turn_off_smoothly(self) -> None:
+        self._record("reachy", "turn_off_smoothly")
+        self.clock.sleep(3.0)
+        for part in self.parts:
+            part._on = False
+
+    def goto_posture(self, common_posture: str = "default", duration: float = 2.0, wait: bool = False,
+                     **kwargs: Any) -> None:
+        self._record("reachy", "goto_posture", (common_posture,), dict(duration=duration, wait=wait, **kwargs))
+        targets = POSTURES[common_posture]
+        end = self.clock.monotonic()
+        for part in (self.head, self.l_arm, self.r_arm):
+            if part._on:
+                part._queue(targets[part.name], duration, wait=False)
+                end = max(end, part._busy_until())
+        for antenna in (self.head.l_antenna, self.head.r_antenna):
+            if antenna._on:
+                antenna._queue([0.0], duration, wait=False)
+        if wait:
+            self.clock.sleep(end - self.clock.monotonic())
+
+    def cancel_all_goto(self) -> None:
+        self._record("reachy", "cancel_all_goto")
+        for part in self.parts:
+            pose = part.get_current_positions()
+            with self._lock:
+                part._moves.clear()
+                part._rest = pose
+
+    def send_goal_positions(self, check_positions: bool = False) -> None:
+        self._record("reachy", "send_goal_positions")
+        for part in self.parts:
+            if part._on:
+                part._apply_goals()
+            else:
+                part._goals.clear()
+
+    # -- inspection -----------------------------------------------------------
+
+    def calls(self, method: Optional[str] = None) -> List[CommandRecord]:
+        """Recorded commands, optionally filtered by method name."""
+        with self._lock:
+            return [r for r in self.log if method is None or r.method == method]
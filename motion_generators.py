@@ -0,0 +1,192 @@
+"""
+Motion Generators - Procedural joint trajectories in one NumPy call
+===================================================================
+
+Periodic and organic motions (nods, waves, wiggles, idle sway) are described
+by a few parameters instead of hand-unrolled keyframes. Each generator maps
+a whole time grid to joint offsets at once, so a 3-second nod is one array
+operation, and the result is streamed at the engine's control rate.
+
+    sinusoid            amplitude * sin(2π·tempo·t + phase)
+    damped_oscillation  sinusoid decaying as exp(-decay·t)
+    ease                minimum-jerk move from 0 to `to`, held afterwards
+    noise               smooth value noise (random knots every `smoothness` s)
+
+Oscillators and noise fade in and out over `ramp` seconds (a quarter cycle
+by default), so they start and end on the base pose with zero velocity.
+
+Motion layers use the same spec in gestures.json (mixed into a part's
+keyframes, added on top of the keyed pose) and at run time through
+GestureEngine.animate():
+
+    {"at": 0.3, "motion": "sinusoid", "amplitude": [0, 7.5, 0],
+     "tempo": 1.7, "cycles": 4}
+
+`amplitude` / `to` are one value per joint (or a single number for every
+joint); `at` is the layer's start and its length is `duration`, or
+`cycles / tempo` for oscillators.
+
+Usage:
+    t, q = trajectory([0, 0, 0], [{"motion": "sinusoid", "amplitude": [0, 5, 0],
+                                   "tempo": 0.6, "cycles": 3}], rate=50.0)
+"""
+
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_RATE_HZ = 50.0
+
+
+def min_jerk(s: np.ndarray) -> np.ndarray:
+    """Minimum-jerk profile 10s³ - 15s⁴ + 6s⁵ (matches the SDK's default goto)."""
+    return s * s * s * (10.0 + s * (-15.0 + 6.0 * s))
+
+
+def timebase(duration: float, rate: float = DEFAULT_RATE_HZ) -> np.ndarray:
+    """Control-grid sample times 0, 1/rate, ... up to and including `duration`."""
+    n_ticks = int(math.ceil(duration * rate - 1e-6)) + 1
+    return np.arange(n_ticks, dtype=np.float64) / rate
+
+
+def envelope(t: np.ndarray, duration: float, ramp: float) -> np.ndarray:
+    """Gain rising 0 -> 1 over `ramp`, holding, and falling back to 0 at `duration`."""
+    if ramp <= 0:
+        return ((t >= 0) & (t <= duration)).astype(np.float64)
+    rise = np.clip(t / ramp, 0.0, 1.0)
+    fall = np.clip((duration - t) / ramp, 0.0, 1.0)
+    return min_jerk(np.minimum(rise, fall))
+
+
+# =============================================================================
+# Generators: time grid [n] -> offsets [n, dof]
+# =============================================================================
+
+def sinusoid(t: np.ndarray, amplitude: np.ndarray, tempo: float, phase: float = 0.0) -> np.ndarray:
+    """amplitude * sin(2π·tempo·t + phase); `phase` in degrees."""
+    return np.sin(2.0 * math.pi * tempo * t + math.radians(phase))[:, None] * amplitude
+
+
+def damped_oscillation(t: np.ndarray, amplitude: np.ndarray, tempo: float, decay: float,
+                       phase: float = 0.0) -> np.ndarray:
+    """Sinusoid whose amplitude decays as exp(-decay·t) (a spring settling)."""
+    return np.exp(-decay * np.maximum(t, 0.0))[:, None] * sinusoid(t, amplitude, tempo, phase)
+
+
+def ease(t: np.ndarray, to: np.ndarray, duration: float) -> np.ndarray:
+    """Minimum-jerk ramp from 0 to `to` over `duration`, then held."""
+    return min_jerk(np.clip(t / duration, 0.0, 1.0))[:, None] * to
+
+
+def noise(t: np.ndarray, amplitude: np.ndarray, smoothness: float = 0.5, seed: int = 0) -> np.ndarray:
+    """Smooth value noise in [-amplitude, amplitude], reproducible per seed.
+
+    Independent random knots every `smoothness` seconds per joint, joined by
+    minimum-jerk segments (zero velocity at each knot).
+    """
+    dof = np.size(amplitude)
+    position = np.maximum(t, 0.0) / smoothness
+    index = np.floor(position).astype(np.int64)
+    knots = np.random.default_rng(seed).uniform(-1.0, 1.0, size=(int(index.max(initial=0)) + 2, dof))
+    s = min_jerk(position - index)[:, None]
+    return (knots[index] + s * (knots[index + 1] - knots[index])) * amplitude
+
+
+# name -> (generator, oscillates: faded in/out and zero after it ends)
+GENERATORS: Dict[str, Tuple[Callable[..., np.ndarray], bool]] = {
+    "sinusoid": (sinusoid, True),
+    "damped_oscillation": (damped_oscillation, True),
+    "ease": (ease, False),
+    "noise": (noise, True),
+}
+
+# Layer keys that are not generator parameters.
+_LAYER_KEYS = ("at", "motion", "duration", "cycles", "ramp")
+
+
+# =============================================================================
+# Layers
+# =============================================================================
+
+def span(layer: Dict[str, Any]) -> float:
+    """Length of a motion layer in seconds.
+
+    Raises:
+        ValueError: If the layer is malformed or its length is not positive.
+    """
+    motion = layer.get("motion")
+    if motion not in GENERATORS:
+        raise ValueError(f"unknown motion '{motion}' (expected one of {', '.join(GENERATORS)})")
+    if "duration" in layer:
+        duration = float(layer["duration"])
+    elif "cycles" in layer and "tempo" in layer:
+        duration = float(layer["cycles"]) / float(layer["tempo"])
+    else:
+        raise ValueError(f"{motion}: needs 'duration' (or 'cycles' and 'tempo')")
+    if duration <= 0:
+        raise ValueError(f"{motion}: duration must be positive")
+    return duration
+
+
+def render(layer: Dict[str, Any], t: np.ndarray, dof: int) -> np.ndarray:
+    """Offsets [len(t), dof] of one motion layer on the grid `t`.
+
+    Raises:
+        ValueError: If the layer is malformed or its values don't match `dof`.
+    """
+    generator, oscillates = GENERATORS[layer.get("motion")]
+    duration = span(layer)
+    params = {key: value for key, value in layer.items() if key not in _LAYER_KEYS}
+    for key in ("amplitude", "to"):
+        if key in params:
+            values = np.broadcast_to(np.asarray(params[key], dtype=np.float64), (dof,)) \
+                if np.ndim(params[key]) == 0 else np.asarray(params[key], dtype=np.float64)
+            if values.shape != (dof,):
+                raise ValueError(f"{layer['motion']}: '{key}' needs {dof} values, got {values.size}")
+            params[key] = values
+    if generator is ease:
+        params["duration"] = duration
+
+    local = t - float(layer.get("at", 0.0))
+    active = (local >= 0.0) if not oscillates else (local >= 0.0) & (local <= duration)
+    out = np.zeros((t.size, dof), dtype=np.float64)
+    if not active.any():
+        return out
+    try:
+        offsets = generator(local[active], **params)
+    except TypeError as e:
+        raise ValueError(f"{layer['motion']}: {e}") from None
+    if oscillates:
+        tempo = float(layer.get("tempo", 0.0))
+        ramp = float(layer.get("ramp", 0.25 / tempo if tempo > 0 else duration / 4))
+        offsets = offsets * envelope(local[active], duration, min(ramp, duration / 2))[:, None]
+    out[active] = offsets
+    return out
+
+
+def layers_end(layers: Sequence[Dict[str, Any]]) -> float:
+    """Time at which the last layer finishes."""
+    return max((float(layer.get("at", 0.0)) + span(layer) for layer in layers), default=0.0)
+
+
+def trajectory(base: Sequence[float], layers: Sequence[Dict[str, Any]], duration: Optional[float] = None,
+               rate: float = DEFAULT_RATE_HZ) -> Tuple[np.ndarray, np.ndarray]:
+    """Sample `base` plus every layer on the control grid.
+
+    Args:
+        base: Pose the layers are added to (one value per joint).
+        layers: Motion layers (see module docstring).
+        duration: Length of the trajectory (defaults to the end of the last layer).
+        rate: Control rate in Hz.
+
+    Returns:
+        (t[n], q[n, dof]) sample times and joint positions.
+    """
+    base_arr = np.atleast_1d(np.asarray(base, dtype=np.float64))
+    t = timebase(layers_end(layers) if duration is None else duration, rate)
+    q = np.empty((t.size, base_arr.size), dtype=np.float64)
+    q[:] = base_arr
+    for layer in layers:
+        q += render(layer, t, base_arr.size)
+    return t, q
@@ -0,0 +1,491 @@
+"""
+Motion Optimizer - Remove redundant and mergeable commands from a program
+=========================================================================
+
+Records what each gesture actually sends (the engine's recorder feed, the
+same one session_log writes) and runs three passes over the command list:
+
+    drop      goals a part already has: a head.goto([0, 0, 0]) right after
+              goto_posture('default'), a goto_posture() the robot is
+              already in, repeated turn_on / torque writes, streamed parts
+              whose goal did not change
+    merge     back-to-back gotos on one part whose via-point lies on the
+              straight line to the next goal become one longer goto
+    overlap   a move that only waited for a *different* part to finish is
+              started alongside it; gaps after a part's own moves (pauses,
+              holds, streaming ticks) are kept
+
+Gestures are recorded on the fake robot with a virtual clock, so a full
+report takes well under a second. It shows per gesture (and for the
+cross-gesture chains of bench_gestures) how many calls and how much show
+time each pass would save. `optimize()` works on any Command list.
+
+`apply()` rewrites a compiled GestureLibrary so the robot no longer gets
+the calls the drop pass removes: redundant `finish` steps (the
+head.goto([0, 0, 0]) after goto_posture('elbow_90')) and streamed samples
+that don't change a goal. Merge and overlap only report: compiled finish
+steps are sent together and streams are already one call per tick.
+`ai_replace_this_demo.py --optimize` plays the rewritten gestures, and
+`--apply` here records with them, so the table shows what is left.
+
+Usage:
+    python motion_optimizer.py                      # every gesture and chain
+    python motion_optimizer.py home snap_to_attention --verbose
+    python motion_optimizer.py --passes drop merge --json optimizer.json
+    python motion_optimizer.py --apply --verbose    # what --optimize changes and what remains
+"""
+
+import argparse
+import json
+import logging
+import sys
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from gesture_compiler import CompiledGesture, GestureLibrary
+from gesture_engine import PARTS
+
+# Approximate joint targets of the SDK's named postures (as in mock_reachy).
+from mock_reachy import POSTURES
+
+logger = logging.getLogger(__name__)
+
+PASSES = ("drop", "merge", "overlap")
+
+# Commands closer than this (seconds) count as simultaneous / chained.
+EPS_S = 1e-3
+# Joint tolerance (degrees) for "same goal" and "on the line".
+EPS_DEG = 1e-3
+
+# Moves that take time without a duration argument.
+_DURATIONS = {"turn_off_smoothly": 3.0}
+_ROBOT_WIDE = ("turn_on", "turn_off", "turn_off_smoothly", "cancel_all_goto")
+_POSTURE_PARTS = ("head", "l_arm", "r_arm")
+# Moves the SDK queues per part (they start once the previous one is done).
+_QUEUED = ("goto", "goto_posture", "look_at", "rotate_by")
+
+
+@dataclass
+class Command:
+    """One SDK call of a motion program, `t` seconds after its start."""
+
+    t: float
+    part: str
+    method: str
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return float(self.kwargs.get("duration", _DURATIONS.get(self.method, 0.0)))
+
+    @property
+    def parts(self) -> Tuple[str, ...]:
+        """Parts whose motion this command changes."""
+        if self.part != "reachy":
+            return (self.part,)
+        if self.method == "goto_posture":
+            return _POSTURE_PARTS
+        if self.method == "send_goal_positions" and self.args:
+            return tuple(self.args[0])
+        return PARTS if self.method in _ROBOT_WIDE else ()
+
+    def __str__(self) -> str:
+        args = ", ".join(repr(a) for a in self.args)
+        return f"{self.t:7.3f}s {self.part}.{self.method}({args}) {self.duration:.2f}s"
+
+
+@dataclass
+class Report:
+    """What the passes changed in one program."""
+
+    calls_before: int = 0
+    calls_after: int = 0
+    span_before: float = 0.0
+    span_after: float = 0.0
+    dropped: int = 0
+    merged: int = 0
+    overlapped: int = 0
+    changes: List[str] = field(default_factory=list)
+
+    @property
+    def saved_calls(self) -> int:
+        return self.calls_before - self.calls_after
+
+    @property
+    def saved_s(self) -> float:
+        return self.span_before - self.span_after
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"calls_before": self.calls_before, "calls_after": self.calls_after,
+                "saved_calls": self.saved_calls, "span_before_s": round(self.span_before, 3),
+                "span_after_s": round(self.span_after, 3), "saved_s": round(self.saved_s, 3),
+                "dropped": self.dropped, "merged": self.merged, "overlapped": self.overlapped}
+
+
+def timeline(commands: Sequence[Command]) -> List[Tuple[float, float]]:
+    """(start, end) of each command on the robot, where moves queue behind the part's previous move."""
+    free: Dict[str, float] = {}
+    return [_run(command, free) for command in commands]
+
+
+def _run(command: Command, free: Dict[str, float]) -> Tuple[float, float]:
+    start = command.t
+    if command.method in _QUEUED:
+        start = max([start] + [free.get(part, 0.0) for part in command.parts])
+    end = start + command.duration
+    for part in command.parts:
+        if command.method == "cancel_all_goto":
+            free[part] = command.t
+        elif command.duration > 0:
+            free[part] = max(free.get(part, 0.0), end)
+    return start, end
+
+
+def span(commands: Sequence[Command]) -> float:
+    """Time from the start of a program until its last move ends on the robot."""
+    return max((end for _, end in timeline(commands)), default=0.0)
+
+
+def _goal(value: Any) -> np.ndarray:
+    return np.atleast_1d(np.asarray(value, dtype=np.float64))
+
+
+def _same(a: Optional[np.ndarray], b: np.ndarray) -> bool:
+    return a is not None and a.shape == b.shape and bool(np.all(np.abs(a - b) <= EPS_DEG))
+
+
+# =============================================================================
+# Passes
+# =============================================================================
+
+def drop_redundant(commands: List[Command], report: Report) -> List[Command]:
+    """Remove goals, postures and power/torque writes that change nothing."""
+    goals: Dict[str, np.ndarray] = {}
+    powered: Dict[str, bool] = {}
+    torque: Dict[str, float] = {}
+    kept = []
+    for command in commands:
+        method = command.method
+        if method == "goto" and command.args:
+            goal = _goal(command.args[0])
+            if _same(goals.get(command.part), goal):
+                report.changes.append(f"drop  {command}  (already there)")
+                continue
+            goals[command.part] = goal
+        elif method == "goto_posture":
+            targets = {part: _goal(pose) for part, pose in POSTURES.get(command.args[0] if command.args else
+                                                                       "default", {}).items()}
+            if targets and all(_same(goals.get(part), goal) for part, goal in targets.items()):
+                report.changes.append(f"drop  {command}  (already in posture)")
+                continue
+            goals.update(targets)
+        elif method == "send_goal_positions" and command.args:
+            changed = {part: values for part, values in command.args[0].items()
+                       if not _same(goals.get(part), _goal(values))}
+            if not changed:
+                report.changes.append(f"drop  {command.t:7.3f}s send_goal_positions  (no goal changed)")
+                continue
+            goals.update({part: _goal(values) for part, values in changed.items()})
+            if len(changed) < len(command.args[0]):
+                command = replace(command, args=(changed,))
+        elif method == "turn_on":
+            parts = command.parts
+            if all(powered.get(part) for part in parts):
+                report.changes.append(f"drop  {command}  (already on)")
+                continue
+            powered.update(dict.fromkeys(parts, True))
+        elif method == "set_torque_limits" and command.args:
+            if torque.get(command.part) == command.args[0]:
+                report.changes.append(f"drop  {command}  (same torque limit)")
+                continue
+            torque[command.part] = command.args[0]
+        elif method in ("turn_off", "turn_off_smoothly"):
+            for part in command.parts:
+                powered[part] = False
+                goals.pop(part, None)
+                torque.pop(part, None)
+        elif method in ("look_at", "rotate_by", "cancel_all_goto"):
+            for part in command.parts:
+                goals.pop(part, None)
+        kept.append(command)
+    report.dropped += len(commands) - len(kept)
+    return kept
+
+
+def merge_moves(commands: List[Command], report: Report) -> List[Command]:
+    """Join chained gotos on one part that pass straight through their via-point."""
+    out: List[Command] = []
+    goals: Dict[str, np.ndarray] = {}
+    previous: Dict[str, Tuple[int, Optional[np.ndarray]]] = {}  # part -> (index in out, goal before it)
+    for command in commands:
+        if command.method == "goto" and command.args:
+            goal = _goal(command.args[0])
+            index, start = previous.get(command.part, (-1, None))
+            if index >= 0 and start is not None and _mergeable(out[index], command, start, goal):
+                first = out[index]
+                report.changes.append(f"merge {first}  +  {command}")
+                out[index] = replace(first, args=(command.args[0],),
+                                     kwargs={**first.kwargs, "duration": first.duration + command.duration})
+                goals[command.part] = goal
+                report.merged += 1
+                continue
+            previous[command.part] = (len(out), goals.get(command.part))
+            goals[command.part] = goal
+        else:
+            for part in command.parts:
+                previous.pop(part, None)
+                goals.pop(part, None)
+        out.append(command)
+    return out
+
+
+def _mergeable(first: Command, second: Command, start: np.ndarray, goal: np.ndarray) -> bool:
+    """`second` is sent as `first` ends and first's goal lies on start -> goal, at the same speed."""
+    if abs(second.t - first.t - first.duration) > EPS_S or first.duration <= 0 or second.duration <= 0:
+        return False
+    via = _goal(first.args[0])
+    if start.shape != via.shape or via.shape != goal.shape:
+        return False
+    total = goal - start
+    length = float(np.linalg.norm(total))
+    if length <= EPS_DEG:
+        return False
+    s = float(np.dot(via - start, total)) / (length * length)
+    if not 0.0 < s < 1.0 or np.linalg.norm(start + s * total - via) > EPS_DEG:
+        return False
+    # Same average speed on both legs, so the merged move keeps the timing.
+    return abs(s / first.duration - (1.0 - s) / second.duration) * first.duration <= 0.05
+
+
+def overlap_parts(commands: List[Command], report: Report) -> List[Command]:
+    """Start moves that only waited on a different part together with that part's move.
+
+    Every command keeps its offset from the latest command that had finished
+    when it was sent (its anchor), on the new timeline. A move sent the
+    moment an anchor on other parts finished is pulled back to the anchor's
+    start instead. Commands never pass an earlier one on the same part.
+    """
+    old = timeline(commands)
+    new: List[Tuple[float, float]] = []
+    free: Dict[str, float] = {}
+    last_sent: Dict[str, float] = {}
+    out: List[Command] = []
+    for i, command in enumerate(commands):
+        anchor = None
+        for j in range(i):
+            if old[j][1] <= command.t + EPS_S and (anchor is None or old[j][1] >= old[anchor][1]):
+                anchor = j
+        pulled = False
+        if anchor is None:
+            t = command.t
+        else:
+            offset = command.t - old[anchor][1]
+            t = new[anchor][1] + offset
+            if command.duration > 0 and commands[anchor].duration > 0 and abs(offset) <= EPS_S \
+                    and not set(commands[anchor].parts) & set(command.parts):
+                t, pulled = new[anchor][0], True
+        t = max([t] + [last_sent.get(part, 0.0) for part in command.parts])
+        if pulled and t < command.t - EPS_S:
+            report.overlapped += 1
+            report.changes.append(f"overlap {command}  (now at {t:.3f}s, with "
+                                  f"{commands[anchor].part}.{commands[anchor].method})")
+        moved = replace(command, t=t)
+        new.append(_run(moved, free))
+        last_sent.update(dict.fromkeys(command.parts, t))
+        out.append(moved)
+    return sorted(out, key=lambda command: command.t)
+
+
+_PASS_FUNCS = {"drop": drop_redundant, "merge": merge_moves, "overlap": overlap_parts}
+
+
+def optimize(commands: Sequence[Command], passes: Sequence[str] = PASSES) -> Tuple[List[Command], Report]:
+    """Run the optimizer passes over a program.
+
+    Args:
+        commands: Program in send order (times relative to its start).
+        passes: Subset of PASSES, applied in that order.
+
+    Returns:
+        (optimized program, report)
+
+    Raises:
+        ValueError: If a pass name is unknown.
+    """
+    unknown = [name for name in passes if name not in _PASS_FUNCS]
+    if unknown:
+        raise ValueError(f"unknown pass(es) {', '.join(unknown)} (expected {', '.join(PASSES)})")
+    program = sorted(commands, key=lambda command: command.t)
+    report = Report(calls_before=len(program), span_before=span(program))
+    for name in PASSES:
+        if name in passes:
+            program = _PASS_FUNCS[name](program, report)
+    report.calls_after = len(program)
+    report.span_after = span(program)
+    return program, report
+
+
+# =============================================================================
+# Applying to compiled gestures
+# =============================================================================
+
+def _finish_commands(gesture: CompiledGesture) -> List[Command]:
+    commands = []
+    for step in gesture.finish:
+        kwargs = {"duration": step["duration"]}
+        if "posture" in step:
+            commands.append(Command(gesture.duration, "reachy", "goto_posture", (step["posture"],), kwargs))
+        else:
+            commands.append(Command(gesture.duration, step["part"], "goto", (step["pose"],), kwargs))
+    return commands
+
+
+def _drop_samples(gesture: CompiledGesture, report: Report) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Clear the send flag of streamed samples within EPS_DEG of the part's last goal."""
+    leads = {part: pose for items in gesture.leads.values() for part, pose, _ in items}
+    parts = {}
+    for part, (samples, send) in gesture.parts.items():
+        kept = send.copy()
+        last = _goal(leads[part]) if part in leads else None
+        for tick in np.flatnonzero(send).tolist():
+            goal = _goal(samples[tick])
+            if _same(last, goal):
+                kept[tick] = False
+                report.changes.append(f"drop  {tick / gesture.rate:7.3f}s {part} sample  (no goal changed)")
+            else:
+                last = goal
+        parts[part] = (samples, kept)
+    return parts
+
+
+def apply(library: GestureLibrary) -> Dict[str, Report]:
+    """Run the drop pass over every compiled gesture of `library` and keep the result.
+
+    The gestures are replaced in `library.gestures` (the compile cache on
+    disk is untouched), so the engine sends the optimized program.
+
+    Returns:
+        Report per gesture that changed.
+    """
+    reports = {}
+    for name, gesture in list(library.gestures.items()):
+        report = Report(calls_before=len(gesture.finish) + gesture.streamed_samples)
+        finish = _finish_commands(gesture)
+        report.span_before = max(gesture.duration, span(finish))
+        kept = {id(command) for command in drop_redundant(finish, report)}
+        steps = [step for step, command in zip(gesture.finish, finish) if id(command) in kept]
+        parts = _drop_samples(gesture, report)
+        n_ticks = len(next(iter(parts.values()))[1]) if parts else 0
+        active = np.zeros(n_ticks, dtype=bool)
+        active[[tick for tick in gesture.leads if tick < n_ticks]] = True
+        for _, send in parts.values():
+            active |= send
+        optimized = replace(gesture, ticks=np.flatnonzero(active), parts=parts, finish=steps)
+        report.calls_after = len(steps) + optimized.streamed_samples
+        report.span_after = max(gesture.duration, span([command for command in finish if id(command) in kept]))
+        report.dropped = report.saved_calls
+        library.gestures[name] = optimized
+        if report.changes:
+            reports[name] = report
+    if reports:
+        logger.info(f"✂️ Optimized {len(reports)} gesture(s): "
+                    f"{sum(r.saved_calls for r in reports.values())} call(s) and "
+                    f"{sum(r.saved_s for r in reports.values()):.2f}s of show time saved")
+    return reports
+
+
+# =============================================================================
+# Recording
+# =============================================================================
+
+def record(steps: Sequence[str], optimized: bool = False) -> List[Command]:
+    """Play ReachyDemo methods back to back on a fresh fake robot and return what they sent.
+
+    Args:
+        steps: ReachyDemo method names.
+        optimized: Play the gestures rewritten by apply() (as --optimize does).
+    """
+    from ai_replace_this_demo import ReachyDemo
+    from clock import VirtualClock
+    from mock_reachy import FakeReachySDK
+
+    clock = VirtualClock()
+    demo = ReachyDemo(reachy=FakeReachySDK(clock=clock), clock=clock, optimize=optimized)
+    commands: List[Command] = []
+    t0 = clock.monotonic()
+
+    def recorder(part: str, method: str, args: tuple, kwargs: dict, sent_at: float) -> None:
+        kwargs = {key: value for key, value in kwargs.items() if key != "wait"}
+        if method == "send_goal_positions" and args:
+            args = ({part: list(values) for part, values in args[0].items()},)
+        commands.append(Command(sent_at - t0, part, method, tuple(args), kwargs))
+
+    demo.engine.recorders.append(recorder)
+    demo.engine.start()
+    try:
+        for step in steps:
+            getattr(demo, step)()
+    finally:
+        demo.engine.stop()
+    return commands
+
+
+def print_table(reports: Dict[str, Report], verdict: str = "could be saved") -> None:
+    print(f"\n{'gesture':32s} {'calls':>6s} {'→':>1s} {'opt':>5s} {'drop':>5s} {'merge':>6s} {'overlap':>8s}"
+          f" {'span s':>7s} {'→':>1s} {'opt s':>6s} {'saved s':>8s}")
+    print("-" * 92)
+    for name, r in reports.items():
+        print(f"{name:32s} {r.calls_before:6d}   {r.calls_after:5d} {r.dropped:5d} {r.merged:6d} "
+              f"{r.overlapped:8d} {r.span_before:7.2f}   {r.span_after:6.2f} {r.saved_s:8.2f}")
+    total_calls = sum(r.saved_calls for r in reports.values())
+    total_s = sum(r.saved_s for r in reports.values())
+    print(f"\n   {total_calls} call(s) and {total_s:.2f}s of show time {verdict}\n")
+
+
+def print_changes(reports: Dict[str, Report]) -> None:
+    for name, report in reports.items():
+        if report.changes:
+            print(f"{name}:")
+            for change in report.changes:
+                print(f"   {change}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from bench_gestures import CHAINS, GESTURES
+
+    parser = argparse.ArgumentParser(description="Report redundant and mergeable commands per gesture")
+    parser.add_argument("gestures", nargs="*", help="Gesture method or chain names (default: all)")
+    parser.add_argument("--passes", nargs="+", default=list(PASSES), choices=PASSES, help="Passes to run")
+    parser.add_argument("--verbose", action="store_true", help="List every change")
+    parser.add_argument("--json", metavar="FILE", help="Also write the reports as JSON")
+    parser.add_argument("--apply", action="store_true",
+                        help="Show what --optimize rewrites in gestures.json, then report what is left")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.apply:
+        applied = apply(GestureLibrary.load())
+        print_table(applied, "saved by --optimize")
+        if args.verbose:
+            print_changes(applied)
+
+    reports = {}
+    for name in args.gestures or GESTURES + list(CHAINS):
+        _, reports[name] = optimize(record(CHAINS.get(name, [name]), optimized=args.apply), args.passes)
+    print_table(reports, "could still be saved" if args.apply else "could be saved")
+    if args.verbose:
+        print_changes(reports)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({name: report.as_dict() for name, report in reports.items()}, f, indent=2)
+        print(f"📄 Reports written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
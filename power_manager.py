@@ -0,0 +1,156 @@
+"""
+Power Manager - Warm motors instead of off/on cycles
+====================================================
+
+Turning the robot off for the slump and back on for the snap costs a motor
+spin-up (and a settle wait) right at the dramatic moment. This module keeps
+track of every motor part's power state and moves between three levels:
+
+    off    motors off (reset, end of show)
+    soft   motors on with a low torque limit: compliant-looking, but warm
+    on     motors on at full torque
+
+Only real changes are sent: asking for the state a part is already in costs
+nothing, soft -> on is a single torque-limit write (no spin-up), and only
+off -> soft/on waits SPIN_UP_S. `prearm()` brings cold parts to soft ahead
+of time (the show timeline calls it before each gesture cue), so by the time
+the snap asks for full torque there is nothing left to wait for.
+
+Power commands sent by anything else (reset's turn_off_smoothly, session
+replays) are observed through the engine's listeners, so the tracked state
+stays true. `stats()` reports transitions, skipped requests and how long
+each arming took against ARM_BUDGET_MS.
+
+Usage:
+    power = PowerManager(engine)
+    await power.ensure(MOTOR_PARTS, SOFT)   # slump, motors stay warm
+    await power.ensure(MOTOR_PARTS, ON)     # snap: one torque write per part
+"""
+
+import contextvars
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from connection import CallTimeout, ConnectionDown
+from gesture_engine import GestureEngine
+
+logger = logging.getLogger(__name__)
+
+OFF, SOFT, ON = "off", "soft", "on"
+
+# Parts with their own motors; the antennas are powered with the head.
+MOTOR_PARTS = ("head", "l_arm", "r_arm")
+
+# Torque limits (percent of max) for the soft and on levels.
+SOFT_TORQUE = 20
+FULL_TORQUE = 100
+
+# Set inside ensure(), so its own power commands are not mistaken for outside ones.
+_ensuring: contextvars.ContextVar[bool] = contextvars.ContextVar("ensuring", default=False)
+
+# Most the first is_on() query of a part may take; slower counts as unknown.
+STATE_DEADLINE_S = 0.3
+
+# Wait after turning cold motors on before moving them.
+SPIN_UP_S = 0.1
+# Most an ensure(..., ON) may take before a warning (milliseconds).
+ARM_BUDGET_MS = 20.0
+
+
+class PowerManager:
+    """Tracks per-part motor power and sends only the transitions needed."""
+
+    def __init__(self, engine: GestureEngine):
+        self.engine = engine
+        # None until first used: the robot's state at startup is unknown.
+        self.state: Dict[str, Optional[str]] = {part: None for part in MOTOR_PARTS}
+        self.transitions = 0
+        self.skipped = 0
+        self.spin_ups = 0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        engine.listeners.append(self._on_command)
+
+    def _on_command(self, part: str, method: str, sent_at: float) -> None:
+        if _ensuring.get() or method not in ("turn_on", "turn_off", "turn_off_smoothly"):
+            return
+        parts = MOTOR_PARTS if part == "reachy" else [part] if part in self.state else []
+        for name in parts:
+            self.state[name] = ON if method == "turn_on" else OFF
+
+    async def ensure(self, parts: Iterable[str], state: str) -> None:
+        """Bring `parts` to `state`, sending only what changes.
+
+        Args:
+            parts: Motor parts (antennas count as the head).
+            state: OFF, SOFT or ON.
+        """
+        started = self.engine.clock.monotonic()
+        spin_up = False
+        token = _ensuring.set(True)
+        try:
+            for part in dict.fromkeys("head" if name.endswith("_antenna") else name for name in parts):
+                target = self.engine.resolve(part)
+                current = await self._known(part)
+                if current == state:
+                    self.skipped += 1
+                    continue
+                if state == OFF:
+                    await self.engine.dispatch(part, target, "turn_off")
+                else:
+                    if current in (OFF, None):
+                        await self.engine.dispatch(part, target, "turn_on")
+                        spin_up = True
+                    await self.engine.dispatch(part, target, "set_torque_limits",
+                                               SOFT_TORQUE if state == SOFT else FULL_TORQUE)
+                self.state[part] = state
+                self.transitions += 1
+        finally:
+            _ensuring.reset(token)
+        if spin_up:
+            self.spin_ups += 1
+            await self.engine.sleep(SPIN_UP_S)
+
+        elapsed = (self.engine.clock.monotonic() - started) * 1000
+        self.last_ms = elapsed
+        self.max_ms = max(self.max_ms, elapsed)
+        if state == ON and elapsed > ARM_BUDGET_MS:
+            logger.warning(f"⚠️ Arming took {elapsed:.0f} ms (budget {ARM_BUDGET_MS:.0f} ms)")
+
+    async def _known(self, part: str) -> Optional[str]:
+        """Tracked state of a part, asking the robot on first use.
+
+        Returns:
+            The state, or None if the robot did not answer within
+            STATE_DEADLINE_S (asked again next time).
+        """
+        if self.state.get(part) is None:
+            target = self.engine.resolve(part)
+            connection = self.engine.connection
+            try:
+                if target is None:
+                    on = False
+                elif connection is None:
+                    on = bool(target.is_on())
+                else:
+                    with self.engine.clock.working():
+                        on = bool(await connection.acall(target.is_on, deadline=STATE_DEADLINE_S))
+            except (CallTimeout, ConnectionDown) as e:
+                logger.debug(f"   🔋 {part}: power state unknown ({e})")
+                return None
+            except Exception:
+                on = False
+            # The SDK turns parts on at full torque.
+            self.state[part] = ON if on else OFF
+        return self.state[part]
+
+    async def prearm(self, parts: Iterable[str] = MOTOR_PARTS) -> None:
+        """Warm up cold parts (to SOFT) ahead of a cue; warm and unknown parts are left alone."""
+        cold = [part for part in parts if await self._known(part) == OFF]
+        if cold:
+            logger.debug(f"   🔋 Pre-arming {', '.join(cold)}")
+            await self.ensure(cold, SOFT)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": dict(self.state), "transitions": self.transitions, "skipped": self.skipped,
+                "spin_ups": self.spin_ups, "last_ms": round(self.last_ms, 2), "max_ms": round(self.max_ms, 2)}
@@ -0,0 +1,442 @@
+"""
+Session Log - Compact binary recording and replay of whole shows
+================================================================
+
+Records every SDK command the GestureEngine sends (gotos, look_at, postures,
+streamed goal positions, power...) plus sampled joint states into an
+append-only file of fixed-size NumPy records:
+
+    [4 KiB JSON header][record][record]...
+
+    t         f8    seconds since the recording started (engine clock)
+    kind      u1    COMMAND or STATE
+    part      u1    index into PART_NAMES
+    method    u1    index into METHODS
+    arg       u1    extra small argument (posture index into POSTURES)
+    duration  f4    move duration (NaN if none)
+    values    f4[19] joint values in COLUMNS order (NaN if unused)
+
+Readers memory-map the records, so a long rehearsal is never loaded into
+memory: `at(t)` binary-searches the time column and only touches the pages
+it needs. A truncated final record (crash mid-write) is ignored.
+
+Commands are appended as they are sent and state samples as they are taken,
+with stamps kept non-decreasing across the two threads, so the file is in
+time order as written and opening it never copies it.
+
+Usage:
+    python ai_replace_this_demo.py --mock --record show.reachylog
+    python session_log.py info show.reachylog
+    python session_log.py at show.reachylog 12.5
+    python session_log.py replay show.reachylog --mock
+    python session_log.py diff rehearsal1.reachylog rehearsal2.reachylog
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from connection import ConnectionManager
+from gesture_engine import JOINTS, PARTS, GestureEngine
+
+logger = logging.getLogger(__name__)
+
+MAGIC = "reachy-session"
+VERSION = 1
+HEADER_SIZE = 4096
+
+COMMAND, STATE = 0, 1
+
+PART_NAMES = ("reachy",) + PARTS
+METHODS = ("goto", "look_at", "rotate_by", "goto_posture", "turn_on", "turn_off",
+           "turn_off_smoothly", "cancel_all_goto", "send_goal_positions", "state",
+           "set_torque_limits")
+POSTURES = ("default", "elbow_90")
+
+# Flattened joint columns: 3 head + 7 + 7 arm + 2 antennas.
+COLUMNS = [column for part in PARTS for column in ([f"{part}.{joint}" for joint in JOINTS[part]] or [part])]
+
+
+def _slices() -> Dict[str, slice]:
+    slices, start = {}, 0
+    for part in PARTS:
+        width = len(JOINTS[part]) or 1
+        slices[part] = slice(start, start + width)
+        start += width
+    return slices
+
+
+_SLICES = _slices()
+
+RECORD = np.dtype([
+    ("t", "<f8"),
+    ("kind", "u1"),
+    ("part", "u1"),
+    ("method", "u1"),
+    ("arg", "u1"),
+    ("duration", "<f4"),
+    ("values", "<f4", (len(COLUMNS),)),
+])
+
+
+def _header() -> bytes:
+    meta = {
+        "magic": MAGIC,
+        "version": VERSION,
+        "record": RECORD.descr,
+        "parts": PART_NAMES,
+        "methods": METHODS,
+        "postures": POSTURES,
+        "columns": COLUMNS,
+    }
+    raw = json.dumps(meta).encode("utf-8")
+    if len(raw) >= HEADER_SIZE:
+        raise ValueError("session header does not fit")
+    return raw.ljust(HEADER_SIZE, b"\n")
+
+
+# =============================================================================
+# Recording
+# =============================================================================
+
+class SessionRecorder:
+    """Appends engine commands (and optional joint samples) to a session log."""
+
+    def __init__(self, engine: GestureEngine, path: str, sampler: Optional[Any] = None,
+                 batch: int = 256):
+        """Open `path` for recording (call start()).
+
+        Args:
+            engine: Engine whose commands are recorded.
+            path: Output file (overwritten).
+            sampler: TelemetrySampler whose joint samples are recorded too.
+            batch: Records buffered before each write.
+        """
+        self.engine = engine
+        self.path = path
+        self.sampler = sampler
+        self.records = 0
+        self.skipped = 0
+        self._buffer = np.zeros(batch, dtype=RECORD)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._t0 = 0.0
+        self._last = 0.0
+
+    def start(self) -> "SessionRecorder":
+        self._file = open(self.path, "wb")
+        self._file.write(_header())
+        self._t0 = self.engine.clock.monotonic()
+        self.engine.recorders.append(self._on_command)
+        if self.sampler is not None:
+            self.sampler.listeners.append(self._on_state)
+        logger.info(f"⏺️ Recording session to {self.path}")
+        return self
+
+    def stop(self) -> None:
+        if self._file is None:
+            return
+        if self._on_command in self.engine.recorders:
+            self.engine.recorders.remove(self._on_command)
+        if self.sampler is not None and self._on_state in self.sampler.listeners:
+            self.sampler.listeners.remove(self._on_state)
+        with self._lock:
+            self._flush()
+            self._file.close()
+            self._file = None
+        logger.info(f"⏹️ Recorded {self.records} records to {self.path}")
+
+    def __enter__(self) -> "SessionRecorder":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _next(self, t: float) -> Any:
+        """Next free slot in the batch, stamped `t` seconds in (caller holds the lock).
+
+        The sampler and the engine stamp on different threads; a stamp taken
+        just before the other thread's append is moved up to it.
+        """
+        if self._pending == len(self._buffer):
+            self._flush()
+        record = self._buffer[self._pending]
+        self._last = max(self._last, t)
+        record["t"] = self._last
+        record["values"] = np.nan
+        record["duration"] = np.nan
+        record["arg"] = 0
+        return record
+
+    def _commit(self) -> None:
+        self._pending += 1
+        self.records += 1
+
+    def _flush(self) -> None:
+        if self._pending and self._file is not None:
+            self._file.write(self._buffer[:self._pending].tobytes())
+            self._file.flush()
+        self._pending = 0
+
+    def _on_command(self, part: str, method: str, args: tuple, kwargs: dict, sent_at: float) -> None:
+        if method not in METHODS or part not in PART_NAMES:
+            self.skipped += 1
+            return
+        with self._lock:
+            if self._file is None:
+                return
+            record = self._next(sent_at - self._t0)
+            record["kind"] = COMMAND
+            record["part"] = PART_NAMES.index(part)
+            record["method"] = METHODS.index(method)
+            if "duration" in kwargs:
+                record["duration"] = kwargs["duration"]
+            values = record["values"]
+            if method == "goto" and args:
+                goal = np.atleast_1d(np.asarray(args[0], dtype=np.float32))
+                values[_SLICES[part]][:goal.size] = goal
+            elif method == "look_at":
+                values[:3] = args[:3]
+            elif method == "rotate_by":
+                values[:3] = [kwargs.get("roll", 0), kwargs.get("pitch", 0), kwargs.get("yaw", 0)]
+            elif method == "goto_posture":
+                name = args[0] if args else kwargs.get("common_posture", "default")
+                if name not in POSTURES:
+                    self.skipped += 1
+                    return
+                record["arg"] = POSTURES.index(name)
+            elif method == "send_goal_positions" and args:
+                for name, goal in args[0].items():
+                    values[_SLICES[name]] = goal
+            elif method == "set_torque_limits" and args:
+                values[0] = args[0]
+            self._commit()
+
+    def _on_state(self, present: np.ndarray) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            record = self._next(self.engine.clock.monotonic() - self._t0)
+            record["kind"] = STATE
+            record["part"] = 0
+            record["method"] = METHODS.index("state")
+            record["values"][:present.size] = present
+            self._commit()
+
+
+# =============================================================================
+# Reading
+# =============================================================================
+
+class SessionLog:
+    """Read-only, memory-mapped view of a recorded session."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            meta = json.loads(f.read(HEADER_SIZE).decode("utf-8").rstrip("\n"))
+        if meta.get("magic") != MAGIC or meta.get("version") != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} session log")
+        self.path = path
+        self.meta = meta
+        count = (os.path.getsize(path) - HEADER_SIZE) // RECORD.itemsize
+        self.records = (np.memmap(path, dtype=RECORD, mode="r", offset=HEADER_SIZE, shape=(count,))
+                        if count else np.zeros(0, dtype=RECORD))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def duration(self) -> float:
+        return float(self.records["t"][-1]) if len(self.records) else 0.0
+
+    def index(self, t: float) -> int:
+        """Index of the first record at or after time `t` (binary search)."""
+        return int(np.searchsorted(self.records["t"], t, side="left"))
+
+    def at(self, t: float, window: float = 0.0) -> np.ndarray:
+        """Records between `t` and `t + window` (a view, nothing is copied)."""
+        return self.records[self.index(t):self.index(t + window + 1e-9)]
+
+    def state(self, t: float) -> Optional[np.ndarray]:
+        """Joint state sampled closest before `t` (None if no samples)."""
+        i = self.index(t + 1e-9)
+        while i > 0:
+            i -= 1
+            if self.records[i]["kind"] == STATE:
+                return np.array(self.records[i]["values"])
+        return None
+
+    def commands(self) -> np.ndarray:
+        return self.records[self.records["kind"] == COMMAND]
+
+    def describe(self, record: Any) -> str:
+        part = PART_NAMES[record["part"]]
+        method = METHODS[record["method"]]
+        values = record["values"]
+        text = f"{float(record['t']):9.3f}s {part}.{method}"
+        if method == "goto_posture":
+            text += f"({POSTURES[record['arg']]!r})"
+        elif not np.all(np.isnan(values)):
+            used = values[~np.isnan(values)]
+            text += "(" + ", ".join(f"{v:.1f}" for v in used) + ")"
+        if not math.isnan(record["duration"]):
+            text += f" {float(record['duration']):.2f}s"
+        return text
+
+
+# =============================================================================
+# Replay
+# =============================================================================
+
+async def replay(engine: GestureEngine, log: SessionLog, start: float = 0.0,
+                 end: Optional[float] = None) -> int:
+    """Re-send the recorded commands with their original timing.
+
+    Args:
+        engine: Engine bound to the robot (or simulator) to drive.
+        log: Recorded session.
+        start: Session time to start from.
+        end: Session time to stop at (default: the end).
+
+    Returns:
+        Number of commands sent.
+    """
+    loop = asyncio.get_running_loop()
+    first = log.index(start)
+    last = len(log) if end is None else log.index(end)
+    t0 = loop.time()
+    sent = 0
+    for record in log.records[first:last]:
+        if record["kind"] != COMMAND:
+            continue
+        await engine.sleep(t0 + float(record["t"]) - start - loop.time())
+        if METHODS[record["method"]] == "turn_off_smoothly":
+            # Blocking on the SDK, like the original call; later deadlines absorb it.
+            await engine.call(engine.reachy.turn_off_smoothly)
+        else:
+            await _send(engine, record)
+        sent += 1
+    return sent
+
+
+async def _send(engine: GestureEngine, record: Any) -> None:
+    part = PART_NAMES[record["part"]]
+    method = METHODS[record["method"]]
+    target = engine.reachy if part == "reachy" else engine.resolve(part)
+    values = record["values"]
+    kwargs = {} if math.isnan(record["duration"]) else {"duration": float(record["duration"])}
+    if method == "goto":
+        goal = values[_SLICES[part]].tolist()
+        await engine.dispatch(part, target, "goto", goal[0] if part.endswith("_antenna") else goal, **kwargs)
+    elif method == "look_at":
+        await engine.dispatch(part, target, "look_at", *values[:3].tolist(), **kwargs)
+    elif method == "rotate_by":
+        roll, pitch, yaw = values[:3].tolist()
+        await engine.dispatch(part, target, "rotate_by", roll=roll, pitch=pitch, yaw=yaw, **kwargs)
+    elif method == "goto_posture":
+        await engine.dispatch(part, target, "goto_posture", POSTURES[record["arg"]], **kwargs)
+    elif method == "send_goal_positions":
+        await engine.stream({name: values[cols].tolist() for name, cols in _SLICES.items()
+                             if not np.isnan(values[cols]).any()})
+    elif method == "set_torque_limits":
+        await engine.dispatch(part, target, method, float(values[0]))
+    else:
+        await engine.dispatch(part, target, method)
+
+
+# =============================================================================
+# Comparison
+# =============================================================================
+
+def diff(a: SessionLog, b: SessionLog) -> Dict[str, Any]:
+    """Compare two recordings command by command.
+
+    Commands are matched in order per (part, method); the result lists count
+    differences and how far matching commands drifted in time.
+    """
+    def grouped(log: SessionLog) -> Dict[str, np.ndarray]:
+        commands = log.commands()
+        keys = commands["part"].astype(np.int32) * 256 + commands["method"]
+        return {f"{PART_NAMES[k // 256]}.{METHODS[k % 256]}": commands["t"][keys == k]
+                for k in np.unique(keys)}
+
+    ga, gb = grouped(a), grouped(b)
+    result: Dict[str, Any] = {"duration": [a.duration, b.duration], "commands": {}}
+    for key in sorted(set(ga) | set(gb)):
+        ta, tb = ga.get(key, np.zeros(0)), gb.get(key, np.zeros(0))
+        n = min(len(ta), len(tb))
+        shift = np.abs(tb[:n] - ta[:n])
+        result["commands"][key] = {
+            "count": [len(ta), len(tb)],
+            "max_shift_s": round(float(shift.max()), 4) if n else None,
+        }
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect, replay and compare recorded shows")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="Summary of a recording")
+    info.add_argument("path")
+    at = sub.add_parser("at", help="Records around a session time")
+    at.add_argument("path")
+    at.add_argument("time", type=float)
+    at.add_argument("--window", type=float, default=0.5)
+    play = sub.add_parser("replay", help="Replay a recording on a robot")
+    play.add_argument("path")
+    play.add_argument("--host", default="localhost")
+    play.add_argument("--mock", action="store_true", help="Replay against the offline fake robot")
+    play.add_argument("--start", type=float, default=0.0)
+    play.add_argument("--end", type=float)
+    compare = sub.add_parser("diff", help="Compare two recordings")
+    compare.add_argument("a")
+    compare.add_argument("b")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if args.command == "info":
+        log = SessionLog(args.path)
+        commands = log.commands()
+        print(f"{args.path}: {len(log)} records ({len(commands)} commands) over {log.duration:.2f}s")
+        for i, method in enumerate(METHODS):
+            count = int(np.count_nonzero(commands["method"] == i))
+            if count:
+                print(f"   {method:22s} {count}")
+    elif args.command == "at":
+        log = SessionLog(args.path)
+        for record in log.at(args.time, args.window):
+            print(log.describe(record))
+    elif args.command == "diff":
+        print(json.dumps(diff(SessionLog(args.a), SessionLog(args.b)), indent=2))
+    elif args.command == "replay":
+        log = SessionLog(args.path)
+        if args.mock:
+            from mock_reachy import FakeReachySDK
+            connection = ConnectionManager(args.host, reachy=FakeReachySDK(host=args.host))
+        else:
+            # build_sdk (the default factory) also takes host:port
+            connection = ConnectionManager(args.host)
+            if not connection.connect():
+                return 1
+        engine = GestureEngine(connection.reachy, connection=connection)
+        try:
+            sent = engine.play(replay(engine, log, args.start, args.end))
+            logger.info(f"✅ Replayed {sent} commands")
+        finally:
+            engine.stop()
+            connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
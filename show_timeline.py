@@ -0,0 +1,349 @@
+"""
+Show Timeline - Cue scheduling against the show clock
+=====================================================
+
+Runs a show script (show.json: acts -> cues at absolute offsets from the
+start of the show) on the GestureEngine loop. Every cue is scheduled
+against its absolute deadline on the engine's monotonic clock, never as
+"sleep N seconds after the last thing", so slow SDK calls and long
+gestures cannot make the errors add up.
+
+Motors a gesture cue needs are warmed up PREARM_S ahead of it, and gesture
+cues are also fired slightly early to absorb the measured delay
+between firing a cue and its first SDK command (an exponential average,
+capped at MAX_LEAD), so the motion itself lands on the planned time.
+
+    pause() / resume()   freeze and continue the show clock (motion already
+                         under way finishes; no new cue fires while paused)
+    seek("cue_id")       jump to a cue; it fires immediately
+
+After a run, `reports` lists how far each cue fired and landed from its
+planned time.
+
+Show script format:
+
+    {"version": 1, "acts": [
+        {"id": "opener", "name": "ACT 1: ...", "cues": [
+            {"id": "slump", "at": 0.0, "gesture": "slump_defeated"},
+            {"id": "worried", "at": 1.8, "say": "Say: '...'"}
+        ]}
+    ]}
+
+Usage:
+    python show_timeline.py --mock --fast              # rehearse the whole show
+    python show_timeline.py --mock --act improv --from shrug
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from event_log import EventLog, event, gesture_span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "show.json")
+
+# Most a gesture cue is fired ahead of its planned time.
+MAX_LEAD = 0.25
+# Weight of the newest measurement in the firing-lead average.
+LEAD_GAIN = 0.3
+
+# Cold motors are warmed up this long before a gesture cue (power_manager).
+PREARM_S = 0.5
+
+# The cue whose gesture is running. Set in the cue's own task, so prearm,
+# idle and gaze dispatches from other tasks don't count as its first motion.
+_performing: contextvars.ContextVar[Optional["Cue"]] = contextvars.ContextVar("performing", default=None)
+
+# Waits shorter than this are due now (float time cannot resolve them).
+_EPS = 1e-6
+
+
+@dataclass(frozen=True)
+class Cue:
+    """One scheduled moment of the show."""
+
+    id: str
+    act: str
+    at: float
+    gesture: Optional[str] = None
+    say: Optional[str] = None
+
+
+@dataclass
+class CueReport:
+    """Where a cue actually happened relative to its plan (milliseconds)."""
+
+    cue: Cue
+    fired_ms: float
+    landed_ms: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"cue": self.cue.id, "act": self.cue.act, "planned_s": self.cue.at,
+                "fired_ms": round(self.fired_ms, 2),
+                "landed_ms": None if self.landed_ms is None else round(self.landed_ms, 2)}
+
+
+class ShowScript:
+    """Acts and cues loaded from show.json."""
+
+    def __init__(self, acts: Dict[str, str], cues: List[Cue], path: str = DEFAULT_PATH):
+        self.acts = acts
+        self.cues = cues
+        self.path = path
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PATH) -> "ShowScript":
+        """Read and validate a show script.
+
+        Raises:
+            ValueError: If cue ids repeat or offsets go backwards.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        acts: Dict[str, str] = {}
+        cues: List[Cue] = []
+        for act in spec.get("acts", []):
+            acts[act["id"]] = act.get("name", act["id"])
+            for item in act.get("cues", []):
+                cue = Cue(id=item["id"], act=act["id"], at=float(item["at"]),
+                          gesture=item.get("gesture"), say=item.get("say"))
+                if cues and cue.at < cues[-1].at:
+                    raise ValueError(f"{path}: cue '{cue.id}' at {cue.at:.2f}s is before "
+                                     f"'{cues[-1].id}' at {cues[-1].at:.2f}s")
+                if any(c.id == cue.id for c in cues):
+                    raise ValueError(f"{path}: duplicate cue id '{cue.id}'")
+                cues.append(cue)
+        return cls(acts, cues, path)
+
+    def act(self, act_id: str) -> List[Cue]:
+        if act_id not in self.acts:
+            raise KeyError(f"unknown act '{act_id}'")
+        return [cue for cue in self.cues if cue.act == act_id]
+
+
+class ShowTimeline:
+    """Plays a ShowScript's cues on a ReachyDemo's engine."""
+
+    def __init__(self, demo: Any, script: ShowScript):
+        """Bind a script to a demo (its gestures are checked when the show runs)."""
+        self.demo = demo
+        self.engine = demo.engine
+        self.script = script
+        self.lead = 0.0
+        self.reports: List[CueReport] = []
+        self._cues: List[Cue] = []
+        self._index = 0
+        self._prearmed = -1
+        self._origin = 0.0
+        self._paused_at: Optional[float] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._fired_at: Optional[float] = None
+        self._first_motion: Optional[float] = None
+        self.engine.listeners.append(self._on_dispatch)
+
+    # -------------------------------------------------------------------------
+    # Control (thread-safe)
+    # -------------------------------------------------------------------------
+
+    def pause(self) -> None:
+        self.engine.call_soon(self._pause)
+
+    def resume(self) -> None:
+        self.engine.call_soon(self._resume)
+
+    def seek(self, cue_id: str) -> None:
+        self.engine.call_soon(self._seek, cue_id)
+
+    @property
+    def paused(self) -> bool:
+        return self._paused_at is not None
+
+    def show_time(self) -> float:
+        """Current position on the show clock (seconds)."""
+        if self._paused_at is not None:
+            return self._paused_at
+        return self.engine.clock.monotonic() - self._origin
+
+    def _pause(self) -> None:
+        if self._paused_at is None:
+            self._paused_at = self.show_time()
+            logger.info(f"   ⏸️ Show paused at {self._paused_at:.2f}s")
+            self._notify()
+
+    def _resume(self) -> None:
+        if self._paused_at is not None:
+            self._origin = self.engine.clock.monotonic() - self._paused_at
+            logger.info(f"   ▶️ Show resumed at {self._paused_at:.2f}s")
+            self._paused_at = None
+            self._notify()
+
+    def _seek(self, cue_id: str) -> None:
+        for i, cue in enumerate(self._cues):
+            if cue.id == cue_id:
+                self._index = i
+                if self._paused_at is not None:
+                    self._paused_at = cue.at
+                else:
+                    self._origin = self.engine.clock.monotonic() - cue.at
+                logger.info(f"   ⏩ Seek to cue '{cue_id}' ({cue.at:.2f}s)")
+                self._notify()
+                return
+        logger.warning(f"⚠️ No cue '{cue_id}' in this run")
+
+    def _notify(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    # -------------------------------------------------------------------------
+    # Playback (engine loop)
+    # -------------------------------------------------------------------------
+
+    async def run(self, act: Optional[str] = None, start: Optional[str] = None) -> List[CueReport]:
+        """Play the show (or one act) until its last cue's gesture finishes.
+
+        Args:
+            act: Only play this act; its first cue is time zero.
+            start: Cue id to start from.
+
+        Raises:
+            ValueError: If a cue names a gesture the demo does not have.
+        """
+        self._cues = self.script.act(act) if act else list(self.script.cues)
+        if not self._cues:
+            return []
+        for cue in self._cues:
+            if cue.gesture and not hasattr(getattr(self.demo, cue.gesture, None), "coro"):
+                raise ValueError(f"{self.script.path}: cue '{cue.id}' has unknown gesture '{cue.gesture}'")
+        self.reports = []
+        self._wake = asyncio.Event()
+        self._index = 0
+        self._prearmed = -1
+        self._paused_at = None
+        self._origin = self.engine.clock.monotonic() - self._cues[0].at
+        if start:
+            self._seek(start)
+        current_act = None
+        gesture: Optional[asyncio.Task] = None
+        try:
+            while self._index < len(self._cues):
+                cue = self._cues[self._index]
+                lead = self.lead if cue.gesture else 0.0
+                wait = None if self.paused else cue.at - lead - self.show_time()
+                if cue.gesture and self._prearmed != self._index and wait is not None:
+                    if wait - PREARM_S <= _EPS:
+                        self._prearmed = self._index
+                        await self.demo.power.prearm()
+                        continue
+                    wait -= PREARM_S
+                if wait is None or wait > _EPS:
+                    await self._sleep(wait)
+                    continue  # re-check: paused, resumed or seeked meanwhile
+                self._index += 1
+
+                if cue.act != current_act:
+                    current_act = cue.act
+                    logger.info("=" * 50)
+                    logger.info(f"🎬 {self.script.acts[cue.act]}")
+                    logger.info("=" * 50)
+                if cue.gesture and gesture is not None and not gesture.done():
+                    await gesture  # gestures never overlap; this cue just lands late
+                report = CueReport(cue, (self.show_time() - cue.at) * 1000)
+                self.reports.append(report)
+                event("cue", "fired", cue_id=cue.id, act=cue.act, planned_s=cue.at,
+                      fired_ms=round(report.fired_ms, 2))
+                if cue.say:
+                    logger.info(f"   📢 [CUE] {cue.say}")
+                if cue.gesture:
+                    gesture = asyncio.ensure_future(self._perform(cue, report))
+            if gesture is not None:
+                await gesture
+        finally:
+            if gesture is not None and not gesture.done():
+                gesture.cancel()
+            self._wake = None
+        worst = max((abs(r.landed_ms if r.landed_ms is not None else r.fired_ms) for r in self.reports),
+                    default=0.0)
+        logger.info(f"   🎯 {len(self.reports)} cues, worst landing {worst:.0f} ms from plan")
+        return self.reports
+
+    async def _sleep(self, seconds: Optional[float]) -> None:
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _perform(self, cue: Cue, report: CueReport) -> None:
+        _performing.set(cue)
+        self._fired_at = self.engine.clock.monotonic()
+        self._first_motion = None
+        with gesture_span(cue.gesture, cue=cue.id):
+            # Looked up per cue: a reloaded gesture module plays its new code.
+            await self.demo.gesture(cue.gesture)()
+        if self._first_motion is None:
+            return
+        delay = self._first_motion - self._fired_at
+        report.landed_ms = report.fired_ms + delay * 1000
+        event("cue", "landed", cue_id=cue.id, landed_ms=round(report.landed_ms, 2))
+        # Fire the next gesture cue earlier by the typical cue-to-motion delay.
+        self.lead = min(MAX_LEAD, (1 - LEAD_GAIN) * self.lead + LEAD_GAIN * delay)
+
+    def _on_dispatch(self, part: str, method: str, sent_at: float) -> None:
+        if _performing.get() is not None and self._first_motion is None:
+            self._first_motion = sent_at
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the show script against the robot")
+    parser.add_argument("script", nargs="?", default=DEFAULT_PATH, help="Show script (default: show.json)")
+    parser.add_argument("--host", default="localhost", help="Robot IP or 'localhost' for the simulator")
+    parser.add_argument("--mock", action="store_true", help="Use the offline fake robot")
+    parser.add_argument("--fast", action="store_true", help="Virtual clock: skip all waiting (with --mock)")
+    parser.add_argument("--act", help="Only play this act")
+    parser.add_argument("--from", dest="start", help="Start at this cue")
+    parser.add_argument("--events", metavar="FILE", help="Write gesture and cue events as JSON lines")
+    args = parser.parse_args(argv)
+
+    events = EventLog(path=args.events).start()
+    from ai_replace_this_demo import ReachyDemo
+
+    if args.mock:
+        from clock import VirtualClock
+        from mock_reachy import FakeReachySDK
+
+        clock = VirtualClock() if args.fast else None
+        demo = ReachyDemo(reachy=FakeReachySDK(host=args.host, clock=clock), clock=clock)
+    else:
+        demo = ReachyDemo(host=args.host)
+    if not demo.reachy or not demo.connected:
+        events.stop()
+        print("\n❌ Could not connect to robot. Exiting.")
+        return 1
+
+    events.attach(demo.engine)
+    timeline = ShowTimeline(demo, ShowScript.load(args.script))
+    try:
+        demo.engine.play(timeline.run(act=args.act, start=args.start))
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted by user.")
+    finally:
+        demo.engine.stop()
+        events.stop()
+    print(f"\n{'cue':12s} {'act':10s} {'planned s':>9s} {'fired ms':>9s} {'landed ms':>10s}")
+    for report in timeline.reports:
+        r = report.as_dict()
+        landed = "" if r["landed_ms"] is None else f"{r['landed_ms']:10.1f}"
+        print(f"{r['cue']:12s} {r['act']:10s} {r['planned_s']:9.2f} {r['fired_ms']:9.1f} {landed}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
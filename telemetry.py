@@ -0,0 +1,336 @@
+"""
+Telemetry - Background joint/command sampler with Prometheus-style export
+=========================================================================
+
+Samples the robot at a fixed rate on its own thread and keeps the data in
+preallocated NumPy ring buffers, so nothing is allocated per sample and the
+gesture engine's loop thread never waits on it:
+
+    joints    present position and tracking error (goal - present) of every
+              joint, `rate_hz` times per second
+    acks      how long each SDK command took to return (fed by the engine)
+    loop lag  delay before the engine loop runs a callback posted from the
+              sampler - a direct measure of control-loop jitter
+    jitter    how late each sampler tick fired
+
+Rolling statistics over the last `window` seconds are exported as
+Prometheus text: served at /metrics by the control server (--serve) and/or
+written to a file (--telemetry FILE, e.g. for node_exporter's textfile
+collector).
+
+Usage:
+    sampler = TelemetrySampler(demo.engine, path="reachy.prom").start()
+    print(sampler.stats())
+    sampler.stop()
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from gesture_engine import JOINTS, PARTS, GestureEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE_HZ = 50.0
+DEFAULT_HISTORY_S = 60.0
+DEFAULT_WINDOW_S = 10.0
+EXPORT_INTERVAL_S = 1.0
+
+
+class RingBuffer:
+    """Fixed-size ring of timestamped float rows.
+
+    Lock-free for one writer: a row is written in place before `written` is
+    bumped, so readers never see a half-written newest row. A reader that
+    falls a full lap behind may see rows being overwritten; snapshots are
+    for statistics, not bookkeeping.
+    """
+
+    def __init__(self, capacity: int, width: int = 1):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros((capacity, width), dtype=np.float32)
+        self.written = 0
+
+    def append(self, t: float, values: Any) -> None:
+        i = self.written % self.capacity
+        self.times[i] = t
+        self.values[i] = values
+        self.written += 1
+
+    def snapshot(self, since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Copies of the stored (times, values), oldest first, optionally from `since`."""
+        written = self.written
+        n = min(written, self.capacity)
+        if n < self.capacity:
+            times, values = self.times[:n].copy(), self.values[:n].copy()
+        else:
+            order = np.roll(np.arange(self.capacity), -(written % self.capacity))
+            times, values = self.times[order], self.values[order]
+        if since is not None:
+            keep = times >= since
+            times, values = times[keep], values[keep]
+        return times, values
+
+
+class TelemetrySampler:
+    """Polls joint states on a background thread and aggregates metrics."""
+
+    def __init__(self, engine: GestureEngine, rate_hz: float = DEFAULT_RATE_HZ,
+                 history: float = DEFAULT_HISTORY_S, window: float = DEFAULT_WINDOW_S,
+                 path: Optional[str] = None, idle: Optional[Any] = None, gaze: Optional[Any] = None):
+        """Create a sampler (call start()).
+
+        Args:
+            engine: Engine whose robot is sampled and whose commands are timed.
+            rate_hz: Joint sampling rate.
+            history: Seconds of joint samples kept in the ring buffer.
+            window: Seconds covered by the rolling statistics.
+            path: File to rewrite with Prometheus text every second (optional).
+            idle: IdleMotion whose overhead is reported (optional).
+            gaze: GazeTracker whose lag is reported (optional).
+        """
+        self.engine = engine
+        self.rate_hz = rate_hz
+        self.window = window
+        self.path = path
+        self.idle = idle
+        self.gaze = gaze
+        self.joints: List[Tuple[str, Any]] = []
+        self.columns: List[str] = []
+        self._bind()
+        capacity = max(1, int(history * rate_hz))
+        width = max(1, len(self.joints))
+        self.positions = RingBuffer(capacity, 2 * width)
+        self.acks = RingBuffer(4096)
+        self.loop_lag = RingBuffer(capacity)
+        self.jitter = RingBuffer(capacity)
+        self.samples = 0
+        self.errors = 0
+        # Called as listener(present_positions) from the telemetry thread.
+        self.listeners: List[Callable[[np.ndarray], None]] = []
+        self._row = np.zeros(2 * width, dtype=np.float32)
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        engine.ack_listeners.append(self._on_ack)
+        if engine.connection is not None:
+            # After the engine has switched to the new SDK object (queued first).
+            engine.connection.listeners.append(lambda reachy: engine.call_soon(self.rebind))
+
+    def _bind(self) -> None:
+        self.joints, self.columns = self._resolve()
+
+    def _resolve(self) -> Tuple[List[Tuple[str, Any]], List[str]]:
+        joints, columns = [], []
+        for name in PARTS:
+            paths = self.engine.joints(name)
+            labels = [f"{name}.{joint}" for joint in JOINTS[name]] or [name]
+            for label, joint in zip(labels, paths):
+                joints.append((name, joint))
+                columns.append(label)
+        return joints, columns
+
+    def rebind(self) -> None:
+        """Sample the joints of a reconnected robot (same layout required)."""
+        joints, columns = self._resolve()
+        if columns != self.columns:
+            logger.warning("⚠️ Telemetry: joint layout changed after reconnect; keeping the old joints")
+            return
+        self.joints = joints
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def start(self) -> "TelemetrySampler":
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+        logger.info(f"📈 Telemetry sampling {len(self.joints)} joints at {self.rate_hz:.0f} Hz")
+        return self
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.path:
+            self.write(self.path)
+
+    # -------------------------------------------------------------------------
+    # Sampling (telemetry thread)
+    # -------------------------------------------------------------------------
+
+    def _run(self) -> None:
+        period = 1.0 / self.rate_hz
+        next_tick = time.perf_counter()
+        next_export = next_tick + EXPORT_INTERVAL_S
+        while self._running:
+            next_tick += period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            now = time.perf_counter()
+            if now - next_tick > period:
+                # Fell a whole tick behind (e.g. the process was suspended): resync.
+                next_tick = now
+            self.jitter.append(now, max(0.0, now - next_tick))
+            self.engine.ping(self._on_lag)
+            self._sample(now)
+            if self.path and now >= next_export:
+                next_export = now + EXPORT_INTERVAL_S
+                self.write(self.path)
+
+    def _sample(self, now: float) -> None:
+        row = self._row
+        n = len(self.joints)
+        try:
+            for i, (_, joint) in enumerate(self.joints):
+                present = joint.present_position
+                row[i] = present
+                row[n + i] = joint.goal_position - present
+        except Exception as e:
+            self.errors += 1
+            logger.debug(f"   Telemetry sample failed: {e}")
+            return
+        self.positions.append(now, row)
+        self.samples += 1
+        for listener in self.listeners:
+            listener(row[:n])
+
+    def _on_lag(self, lag: float) -> None:
+        self.loop_lag.append(time.perf_counter(), lag)
+
+    def _on_ack(self, part: str, method: str, seconds: float) -> None:
+        self.acks.append(time.perf_counter(), seconds)
+
+    # -------------------------------------------------------------------------
+    # Statistics and export
+    # -------------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Rolling statistics over the last `window` seconds."""
+        since = time.perf_counter() - self.window
+        times, rows = self.positions.snapshot(since)
+        n = len(self.joints)
+        error = np.abs(rows[:, n:2 * n]) if len(rows) else np.zeros((0, n), dtype=np.float32)
+        tracking = {}
+        for name in PARTS:
+            cols = [i for i, (part, _) in enumerate(self.joints) if part == name]
+            if cols:
+                tracking[name] = float(error[:, cols].max()) if len(error) else 0.0
+
+        return {
+            "samples": self.samples,
+            "errors": self.errors,
+            "rate_hz": float((len(times) - 1) / (times[-1] - times[0])) if len(times) > 1 else 0.0,
+            "tracking_error_deg": tracking,
+            "command_latency_s": _quantiles(self.acks.snapshot(since)[1]),
+            "loop_lag_s": _quantiles(self.loop_lag.snapshot(since)[1]),
+            "sampler_jitter_s": _quantiles(self.jitter.snapshot(since)[1]),
+            "look_at_cache": self.engine.gaze.stats(),
+            "connection": self.engine.connection.stats() if self.engine.connection is not None else None,
+            "idle": self.idle.stats() if self.idle is not None else None,
+            "gaze": self.gaze.stats() if self.gaze is not None else None,
+        }
+
+    def prometheus(self) -> str:
+        """Current statistics in the Prometheus text exposition format."""
+        stats = self.stats()
+        lines = [
+            "# HELP reachy_telemetry_samples_total Joint samples taken.",
+            "# TYPE reachy_telemetry_samples_total counter",
+            f"reachy_telemetry_samples_total {stats['samples']}",
+            "# HELP reachy_telemetry_errors_total Joint samples that failed.",
+            "# TYPE reachy_telemetry_errors_total counter",
+            f"reachy_telemetry_errors_total {stats['errors']}",
+            "# HELP reachy_look_at_cache_lookups_total Head look_at targets served from the IK cache.",
+            "# TYPE reachy_look_at_cache_lookups_total counter",
+            f'reachy_look_at_cache_lookups_total{{result="hit"}} {stats["look_at_cache"]["hits"]}',
+            f'reachy_look_at_cache_lookups_total{{result="miss"}} {stats["look_at_cache"]["misses"]}',
+            "# HELP reachy_tracking_error_degrees Max |goal - present| per part over the window.",
+            "# TYPE reachy_tracking_error_degrees gauge",
+        ]
+        for part, value in stats["tracking_error_deg"].items():
+            lines.append(f'reachy_tracking_error_degrees{{part="{part}"}} {value:.4f}')
+        link = stats["connection"]
+        if link is not None:
+            lines += [
+                "# HELP reachy_connection_up 1 while the heartbeat sees the robot.",
+                "# TYPE reachy_connection_up gauge",
+                f"reachy_connection_up {int(link['connected'])}",
+                "# HELP reachy_sdk_calls_total SDK calls by outcome.",
+                "# TYPE reachy_sdk_calls_total counter",
+            ]
+            for outcome in ("calls", "timeouts", "errors", "skipped"):
+                lines.append(f'reachy_sdk_calls_total{{outcome="{outcome}"}} {link[outcome]}')
+            lines += [
+                "# HELP reachy_reconnects_total Successful reconnects after a lost link.",
+                "# TYPE reachy_reconnects_total counter",
+                f"reachy_reconnects_total {link['reconnects']}",
+            ]
+        idle = stats["idle"]
+        if idle is not None:
+            lines += [
+                "# HELP reachy_idle_calls_total SDK calls sent by the idle micro-motion.",
+                "# TYPE reachy_idle_calls_total counter",
+                f"reachy_idle_calls_total {idle['calls']}",
+                "# HELP reachy_idle_cpu_share Loop-thread CPU share of the idle ticks.",
+                "# TYPE reachy_idle_cpu_share gauge",
+                f"reachy_idle_cpu_share {idle['cpu_share']}",
+                "# HELP reachy_idle_tick_max_seconds Longest idle tick (the most a cue can wait behind it).",
+                "# TYPE reachy_idle_tick_max_seconds gauge",
+                f"reachy_idle_tick_max_seconds {idle['max_tick_us'] / 1e6:.6f}",
+            ]
+        gaze = stats["gaze"]
+        if gaze is not None:
+            lines += [
+                "# HELP reachy_gaze_targets_total Gaze targets received from the tracking source.",
+                "# TYPE reachy_gaze_targets_total counter",
+                f"reachy_gaze_targets_total {gaze['updates']}",
+                "# HELP reachy_gaze_commands_total Head poses streamed by the gaze tracker.",
+                "# TYPE reachy_gaze_commands_total counter",
+                f"reachy_gaze_commands_total {gaze['sent']}",
+            ]
+            if gaze["lag_ms"] is not None:
+                lines += ["# HELP reachy_gaze_lag_seconds Target capture to commanded head pose.",
+                          "# TYPE reachy_gaze_lag_seconds summary"]
+                for quantile, name in (("0.5", "p50"), ("0.95", "p95")):
+                    lines.append(f'reachy_gaze_lag_seconds{{quantile="{quantile}"}} {gaze["lag_ms"][name] / 1000:.6f}')
+        for metric, key, help_text in (
+            ("reachy_command_latency_seconds", "command_latency_s", "SDK command round trip."),
+            ("reachy_loop_lag_seconds", "loop_lag_s", "Delay before the engine loop runs a posted callback."),
+            ("reachy_sampler_jitter_seconds", "sampler_jitter_s", "Lateness of telemetry ticks."),
+        ):
+            summary = stats[key]
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} summary")
+            for quantile, name in (("0.5", "p50"), ("0.99", "p99")):
+                lines.append(f'{metric}{{quantile="{quantile}"}} {summary[name]:.6f}')
+            lines.append(f"{metric}_count {summary['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Atomically replace `path` with the current Prometheus text."""
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.prometheus())
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write telemetry to {path}: {e}")
+
+
+def _quantiles(values: np.ndarray) -> Dict[str, float]:
+    values = values.ravel()
+    if not len(values):
+        return {"count": 0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+    p50, p99 = np.percentile(values, [50, 99])
+    return {"count": int(len(values)), "p50": float(p50), "p99": float(p99), "max": float(values.max())}
@@ -0,0 +1,31 @@
+"""Shared fixtures: a demo on the fake robot, driven by a virtual clock."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_replace_this_demo import ReachyDemo  # noqa: E402
+from clock import VirtualClock  # noqa: E402
+from mock_reachy import FakeReachySDK  # noqa: E402
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock()
+
+
+@pytest.fixture
+def robot(clock):
+    return FakeReachySDK(clock=clock)
+
+
+@pytest.fixture
+def demo(robot, clock):
+    demo = ReachyDemo(reachy=robot, clock=clock)
+    demo.engine.start()
+    yield demo
+    demo.engine.stop()
+    demo.connection.close()
@@ -0,0 +1,112 @@
+"""Preemption order of the command queue against the engine loop."""
+
+import asyncio
+import heapq
+import threading
+import time
+
+import pytest
+
+from command_queue import CommandQueue, Priority
+
+
+def stuck_action(engine, started):
+    """Queue action for a gesture that moves the head once, then never ends."""
+
+    async def stuck():
+        await engine.head.goto([0, 10, 0], 1.0, hold=0)
+        started.set()
+        await asyncio.Event().wait()
+
+    def run(wait=True):
+        return engine.play(stuck(), wait=wait, name="stuck")
+
+    return run
+
+
+def settle(queue, timeout=5.0):
+    """Wait (real time) until the queue is empty and nothing is playing."""
+    deadline = time.monotonic() + timeout
+    while queue.pending or queue._active is not None or queue.engine.busy:
+        assert time.monotonic() < deadline, "queue did not settle"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def queue(demo):
+    queue = CommandQueue(demo.engine)
+    queue.start()
+    yield queue
+    queue.stop()
+
+
+def test_emergency_flush_lands_before_the_next_command(demo, robot, queue):
+    started = threading.Event()
+    queue.submit("stuck", stuck_action(demo.engine, started))
+    assert started.wait(5.0)
+    stuck = demo.engine._current
+    flushed_from = len(robot.log)
+
+    home = queue.submit("H", demo.home, Priority.EMERGENCY)
+    settle(queue)
+
+    assert stuck.cancelled()
+    calls = [(record.part, record.method) for record in robot.log[flushed_from:]]
+    assert calls[0] == ("reachy", "cancel_all_goto")
+    assert ("reachy", "goto_posture") in calls[1:]
+    assert home.latency is not None and home.latency >= 0.0
+
+
+def test_gesture_preempts_without_flushing(demo, robot, queue):
+    started = threading.Event()
+    queue.submit("stuck", stuck_action(demo.engine, started))
+    assert started.wait(5.0)
+    stuck = demo.engine._current
+    preempted_from = len(robot.log)
+
+    nod = queue.submit("5", demo.gesture_nodding)
+    settle(queue)
+
+    assert stuck.cancelled()
+    calls = [(record.part, record.method) for record in robot.log[preempted_from:]]
+    assert ("reachy", "cancel_all_goto") not in calls
+    assert ("reachy", "send_goal_positions") in calls
+    assert nod.latency is not None
+
+
+def test_emergency_drops_pending_and_is_served_first(demo):
+    queue = CommandQueue(demo.engine)  # worker not started: commands stay queued
+    queue.submit("3", demo.gesture_boring_meeting)
+    queue.submit("4", demo.gesture_pointing)
+    assert queue.pending == 2
+
+    queue.submit("H", demo.home, Priority.EMERGENCY)
+    queue.submit("5", demo.gesture_nodding)
+
+    assert [heapq.heappop(queue._heap).key for _ in range(queue.pending)] == ["H", "5"]
+
+
+def test_background_motion_is_not_the_commands_first_move(demo, robot, queue):
+    engine = demo.engine
+    go = threading.Event()
+
+    async def late():
+        while not go.is_set():
+            await asyncio.sleep(0.005)
+        await engine.head.goto([0, 10, 0], 0.5, hold=0)
+
+    command = queue.submit("late", lambda wait=True: engine.play(late(), wait=wait, name="late"))
+    while queue._active is not command:
+        time.sleep(0.005)
+
+    # Idle motion or the gaze tracker moving something meanwhile.
+    sent = len(robot.log)
+    engine.call_soon(lambda: asyncio.ensure_future(engine.tracks["l_antenna"].goto([20.0], 0.2, hold=0)))
+    while len(robot.log) == sent:
+        time.sleep(0.005)
+    assert command.latency is None
+
+    go.set()
+    settle(queue)
+    assert command.latency is not None
+    assert queue.latencies == [command.latency]
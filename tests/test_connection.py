@@ -0,0 +1,102 @@
+"""Call deadlines, the down-link fast path and heartbeat reconnects."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import connection
+from connection import CallTimeout, ConnectionDown, ConnectionManager
+from mock_reachy import FakeReachySDK
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def link():
+    link = ConnectionManager("fake", reachy=FakeReachySDK())
+    yield link
+    link.close()
+
+
+@pytest.fixture
+def hang():
+    release = threading.Event()
+
+    def hung_call():
+        release.wait(5.0)
+
+    yield hung_call
+    release.set()
+
+
+def test_hung_call_times_out(link, hang):
+    started = time.monotonic()
+    with pytest.raises(CallTimeout):
+        link.call(hang, deadline=0.1)
+    assert time.monotonic() - started < 1.0
+    assert link.counters["timeouts"] == 1
+
+
+def test_hung_awaited_call_times_out_on_the_watchdog(link, hang):
+    async def main():
+        with pytest.raises(CallTimeout):
+            await link.acall(hang, deadline=0.1)
+        return await link.acall(lambda: 42)
+
+    started = time.monotonic()
+    assert asyncio.run(main()) == 42
+    assert time.monotonic() - started < 1.0
+    assert link.counters["timeouts"] == 1
+
+
+def test_calls_fail_fast_while_the_link_is_down(link):
+    link.reachy.disconnect()
+    link._mark(link._poll())
+    assert not link.connected
+    with pytest.raises(ConnectionDown):
+        link.call(link.reachy.turn_on)
+    assert link.counters["skipped"] == 1
+    assert not link.reachy.calls("turn_on")
+
+
+def test_heartbeat_rebuilds_a_lost_link(monkeypatch):
+    monkeypatch.setattr(connection, "BACKOFF_MIN_S", 0.01)
+    robots = []
+
+    def factory(host):
+        robots.append(FakeReachySDK(host=host))
+        return robots[-1]
+
+    link = ConnectionManager("fake", factory=factory, heartbeat=0.02)
+    rebuilt = []
+    link.listeners.append(rebuilt.append)
+    try:
+        assert link.connect()
+        link.start()
+        robots[0].disconnect()
+        wait_until(lambda: rebuilt)
+        # The old link is closed in the background (the test's disconnect + one).
+        wait_until(lambda: len(robots[0].calls("disconnect")) == 2)
+    finally:
+        link.close()
+
+    assert rebuilt == [robots[1]]
+    assert link.reachy is robots[1] and link.connected
+    assert link.counters["reconnects"] == 1
+
+
+def test_hung_goto_does_not_stall_the_gesture(demo, robot, monkeypatch, hang):
+    monkeypatch.setattr(connection, "DEFAULT_DEADLINE", 0.1)
+    monkeypatch.setattr(robot.head, "goto", lambda *args, **kwargs: hang())
+    started = time.monotonic()
+    demo.engine.play(demo.engine.pose({"head": [0, 10, 0], "l_arm": [0, 15, 0, -90, 0, 0, 0]}, 0.5))
+    assert time.monotonic() - started < 1.0
+    assert demo.connection.counters["timeouts"] == 1
+    assert [record.part for record in robot.calls("goto")] == ["l_arm"]
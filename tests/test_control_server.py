@@ -0,0 +1,150 @@
+"""Control server handshake checks and WebSocket framing, over raw sockets."""
+
+import base64
+import json
+import os
+import socket
+import struct
+
+import pytest
+
+from control_server import CLOSE_PROTOCOL_ERROR, CLOSE_TOO_BIG, MAX_FRAME, OP_CLOSE, OP_TEXT, ControlServer
+
+
+@pytest.fixture
+def server():
+    keys = []
+
+    def on_key(key, pressed_at):
+        keys.append(key)
+        return key == "5"
+
+    server = ControlServer(on_key, lambda: {"busy": False}, port=0).start()
+    server.keys = keys
+    yield server
+    server.stop()
+
+
+def request(server, path="/state", host=None, headers=()):
+    """Send one HTTP request; returns (status, socket) with the response head read."""
+    sock = socket.create_connection(("127.0.0.1", server.port), timeout=5.0)
+    lines = [f"GET {path} HTTP/1.1", f"Host: {host or f'localhost:{server.port}'}", *headers, "", ""]
+    sock.sendall("\r\n".join(lines).encode())
+    head = b""
+    while b"\r\n\r\n" not in head:
+        chunk = sock.recv(1)
+        if not chunk:
+            break
+        head += chunk
+    return int(head.split(b" ", 2)[1]), sock
+
+
+def handshake(server, host=None, origin=None):
+    key = base64.b64encode(os.urandom(16)).decode()
+    headers = ["Upgrade: websocket", "Connection: Upgrade", f"Sec-WebSocket-Key: {key}",
+               "Sec-WebSocket-Version: 13"]
+    if origin is not None:
+        headers.append(f"Origin: {origin}")
+    return request(server, "/ws", host, headers)
+
+
+def frame(payload, opcode=OP_TEXT, masked=True):
+    mask = os.urandom(4) if masked else b""
+    length = len(payload)
+    if length < 126:
+        head = struct.pack("!BB", 0x80 | opcode, (0x80 if masked else 0) | length)
+    else:
+        head = struct.pack("!BBH", 0x80 | opcode, (0x80 if masked else 0) | 126, length)
+    body = bytes(b ^ mask[i % 4] for i, b in enumerate(payload)) if masked else payload
+    return head + mask + body
+
+
+def read_frame(sock):
+    head = sock.recv(2)
+    opcode, length = head[0] & 0x0F, head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", sock.recv(2))[0]
+    payload = b""
+    while len(payload) < length:
+        payload += sock.recv(length - len(payload))
+    return opcode, payload
+
+
+def connect(server):
+    status, sock = handshake(server, origin=f"http://127.0.0.1:{server.port}")
+    assert status == 101
+    assert read_frame(sock)[0] == OP_TEXT  # initial state
+    return sock
+
+
+def test_key_round_trip(server):
+    sock = connect(server)
+    sock.sendall(frame(json.dumps({"type": "key", "key": "5"}).encode()))
+    ack = json.loads(read_frame(sock)[1])
+    assert (ack["type"], ack["key"], ack["accepted"]) == ("ack", "5", True)
+    assert server.keys == ["5"]
+    sock.close()
+
+
+@pytest.mark.parametrize("host, origin", [
+    ("evil.example:{port}", "http://evil.example:{port}"),   # DNS rebinding: both attacker-controlled
+    ("localhost:{port}", "http://evil.example"),               # cross-site page
+    ("localhost:1", "http://localhost:1"),                     # another port
+])
+def test_foreign_handshakes_are_refused(server, host, origin):
+    status, sock = handshake(server, host.format(port=server.port), origin.format(port=server.port))
+    assert status == 403
+    assert not server.clients
+    sock.close()
+
+
+def test_rebinding_host_cannot_read_state(server):
+    status, sock = request(server, host=f"evil.example:{server.port}")
+    assert status == 403
+    sock.close()
+    status, sock = request(server)
+    assert status == 200
+    sock.close()
+
+
+def test_allowed_hosts_extend_the_loopback_names():
+    server = ControlServer(lambda key, at: True, dict, host="0.0.0.0", port=0,
+                           allowed_hosts=["192.168.1.20"]).start()
+    try:
+        for host, expected in (("192.168.1.20", 200), ("localhost", 200), ("0.0.0.0", 403)):
+            status, sock = request(server, host=f"{host}:{server.port}")
+            sock.close()
+            assert status == expected, host
+    finally:
+        server.stop()
+
+
+@pytest.mark.parametrize("text", ["[]", "5", '"key"', "not json"])
+def test_malformed_messages_get_an_error_frame(server, text):
+    sock = connect(server)
+    sock.sendall(frame(text.encode()))
+    reply = json.loads(read_frame(sock)[1])
+    assert reply["type"] == "error"
+    # The connection stays usable.
+    sock.sendall(frame(json.dumps({"type": "ping", "t": 1}).encode()))
+    assert json.loads(read_frame(sock)[1]) == {"type": "pong", "t": 1}
+    sock.close()
+
+
+def test_unmasked_frame_closes_with_protocol_error(server):
+    sock = connect(server)
+    sock.sendall(frame(json.dumps({"type": "key", "key": "5"}).encode(), masked=False))
+    opcode, payload = read_frame(sock)
+    assert opcode == OP_CLOSE
+    assert struct.unpack("!H", payload[:2])[0] == CLOSE_PROTOCOL_ERROR
+    assert server.keys == []
+    sock.close()
+
+
+def test_oversized_frame_closes_with_too_big(server):
+    sock = connect(server)
+    sock.sendall(frame(b"x" * (MAX_FRAME + 1)))
+    opcode, payload = read_frame(sock)
+    assert opcode == OP_CLOSE
+    assert struct.unpack("!H", payload[:2])[0] == CLOSE_TOO_BIG
+    sock.close()
@@ -0,0 +1,67 @@
+"""Keys pressed during a fast start are held, then queued in order once booted."""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import fast_start
+from fast_start import FastStart, StartupProfile
+
+
+@pytest.fixture
+def interrupts(monkeypatch):
+    calls = []
+    monkeypatch.setattr(fast_start, "_interrupt_main", lambda: calls.append(True))
+    return calls
+
+
+def start(boot):
+    dispatched = []
+    startup = FastStart(boot, lambda key, pressed_at: dispatched.append((key, pressed_at)),
+                        StartupProfile()).begin()
+    return startup, dispatched
+
+
+def test_early_keys_are_held_then_queued_in_order(interrupts):
+    release = threading.Event()
+    startup, dispatched = start(lambda: release.wait(5.0))
+    startup.submit("5", pressed_at=1.0)
+    startup.submit("H", pressed_at=2.0)
+    assert dispatched == [] and not startup.ready
+
+    release.set()
+    assert startup.wait(5.0)
+    startup.submit("6", pressed_at=3.0)
+
+    assert dispatched == [("5", 1.0), ("H", 2.0), ("6", 3.0)]
+    assert "ready" in startup.profile.marks
+    assert not interrupts
+
+
+@pytest.mark.parametrize("boot", [lambda: False, lambda: 1 / 0])
+def test_failed_boot_drops_the_keys_and_wakes_the_prompt(boot, interrupts):
+    startup, dispatched = start(boot)
+    startup.submit("5")
+    assert not startup.wait(5.0)
+    startup.submit("6")
+
+    assert startup.failed
+    assert dispatched == []
+    assert interrupts == [True]
+
+
+def test_profile_marks_homing_and_the_first_cue():
+    profile = StartupProfile()
+    listeners = []
+    profile.watch(SimpleNamespace(listeners=listeners))
+    on_motion, = listeners
+
+    on_motion(SimpleNamespace(key="home"))
+    assert set(profile.marks) == {"home moving"}
+    on_motion(SimpleNamespace(key="5"))
+    first = profile.marks["first cue"]
+    on_motion(SimpleNamespace(key="6"))
+
+    assert profile.marks["first cue"] == first
+    assert "first cue at" in profile.report()
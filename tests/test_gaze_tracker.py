@@ -0,0 +1,133 @@
+"""Gaze sources, the alpha-beta filter and yielding the head to gestures."""
+
+import asyncio
+import concurrent.futures
+import socket
+import time
+
+import numpy as np
+import pytest
+
+from gaze_tracker import (MAX_PREDICT_S, AlphaBetaFilter, GazeTracker, TargetSource, UdpSource,
+                          parse_source)
+from gesture_engine import GestureEngine, _locked
+from mock_reachy import FakeReachySDK
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+class FixedSource(TargetSource):
+    """Publishes `point` at 50 Hz."""
+
+    name = "fixed"
+    point = (2.0, 0.5, 0.3)
+
+    def _run(self):
+        while not self._stop.wait(0.02):
+            self.publish(*self.point)
+
+
+def on_loop(engine, func):
+    """Run func() on the engine loop thread and return its result."""
+    future = concurrent.futures.Future()
+    engine.call_soon(lambda: future.set_result(func()))
+    return future.result(timeout=5.0)
+
+
+@pytest.mark.parametrize("spec, host", [("udp:5005", "127.0.0.1"), ("udp:0.0.0.0:5005", "0.0.0.0"),
+                                        ("udp:10.0.0.5:5005", "10.0.0.5")])
+def test_udp_listens_on_loopback_unless_told_otherwise(spec, host):
+    source = parse_source(spec)
+    assert isinstance(source, UdpSource)
+    assert (source.host, source.port) == (host, 5005)
+
+
+def test_udp_source_publishes_datagrams():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    source = UdpSource(port).start()
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+            deadline = time.monotonic() + 5.0
+            while source.latest() is None and time.monotonic() < deadline:
+                sender.sendto(b'{"x": 1.5, "y": -0.2, "z": 0.4}', ("127.0.0.1", port))
+                time.sleep(0.02)
+        target = source.latest()
+        assert (target.x, target.y, target.z) == pytest.approx((1.5, -0.2, 0.4))
+    finally:
+        source.stop()
+
+
+def test_filter_tracks_a_constant_velocity_target():
+    f = AlphaBetaFilter()
+    velocity = np.array([0.5, -0.2, 0.0])
+    for i in range(200):
+        t = i / 30.0
+        f.update(np.array([2.0, 0.0, 0.3]) + velocity * t, t)
+    assert f.velocity == pytest.approx(velocity, abs=1e-3)
+    ahead = f.predict(f.t + 0.1)
+    assert ahead == pytest.approx(f.position + velocity * 0.1, abs=1e-3)
+    # Prediction stops MAX_PREDICT_S past the newest target.
+    assert f.predict(f.t + 10.0) == pytest.approx(f.position + f.velocity * MAX_PREDICT_S)
+
+
+def test_filter_ignores_out_of_order_targets():
+    f = AlphaBetaFilter()
+    f.update(np.array([1.0, 0.0, 0.0]), 1.0)
+    f.update(np.array([9.0, 9.0, 9.0]), 0.5)
+    assert f.position == pytest.approx([1.0, 0.0, 0.0])
+
+
+def test_idle_for_reports_held_tracks_and_settling(demo):
+    engine = demo.engine
+    assert on_loop(engine, lambda: engine.idle_for("head"))
+
+    async def hold_head():
+        async with _locked(engine.tracks["head"]):
+            await asyncio.Event().wait()
+
+    # A task of its own (not engine.play), so only the held track says no.
+    holder = on_loop(engine, lambda: asyncio.ensure_future(hold_head()))
+    wait_until(engine.tracks["head"]._lock.locked)
+    assert not engine.busy
+    assert not on_loop(engine, lambda: engine.idle_for("head"))
+    assert on_loop(engine, lambda: engine.idle_for("l_antenna"))
+    engine.call_soon(holder.cancel)
+    wait_until(lambda: not engine.tracks["head"]._lock.locked())
+
+    now = engine.clock.monotonic()
+    engine._settle_until = now + 1.0
+    assert not on_loop(engine, lambda: engine.idle_for("head", now=now))
+    assert on_loop(engine, lambda: engine.idle_for("head", now=now + 1.0))
+    assert not on_loop(engine, lambda: engine.idle_for("head", now=now + 1.0, margin=0.5))
+
+
+def test_tracker_yields_the_head_to_a_gesture():
+    robot = FakeReachySDK()
+    engine = GestureEngine(robot)
+    engine.start()
+    source = FixedSource()
+    tracker = GazeTracker(engine, source).start()
+    try:
+        wait_until(lambda: tracker.sent > 0)
+
+        async def hold_head():
+            async with _locked(engine.tracks["head"]):
+                sent = tracker.sent
+                await asyncio.sleep(0.3)
+                return tracker.sent - sent
+
+        assert engine.play(hold_head()) == 0
+        assert tracker.yields >= 1
+        sent = tracker.sent
+        source.point = (2.0, -0.5, 0.3)
+        wait_until(lambda: tracker.sent > sent)  # follows again once the head is free
+    finally:
+        tracker.stop()
+        engine.stop()
@@ -0,0 +1,53 @@
+"""Chained gestures end every part where the last gesture leaves it."""
+
+import pytest
+
+from ai_replace_this_demo import ReachyDemo
+from clock import VirtualClock
+from mock_reachy import POSTURES, FakeReachySDK
+
+PARTS = ("head", "l_arm", "r_arm")
+
+
+def final_pose(demo, clock):
+    """Present pose of every part once all queued motion has played out."""
+    clock.sleep(10.0)
+    pose = {part: demo.engine.present(part) for part in PARTS}
+    pose["l_antenna"] = demo.reachy.head.l_antenna.present_position
+    pose["r_antenna"] = demo.reachy.head.r_antenna.present_position
+    return pose
+
+
+def test_transition_keeps_finish_moves_of_unused_parts(demo, clock):
+    # Nodding only leads in with the head: the arms must still finish pointing's return.
+    demo.home()
+    demo.gesture_pointing()
+    demo.gesture_nodding()
+
+    pose = final_pose(demo, clock)
+    for part in PARTS:
+        assert pose[part] == pytest.approx(POSTURES["elbow_90"][part], abs=1e-6), part
+    assert pose["l_antenna"] == pytest.approx(0.0)
+    assert pose["r_antenna"] == pytest.approx(0.0)
+
+
+def test_act2_chain_ends_like_its_last_gesture(demo, clock, robot):
+    for name in ("gesture_boring_meeting", "gesture_pointing", "gesture_nodding",
+                 "gesture_shrug", "gesture_holding", "emotion_excited"):
+        getattr(demo, name)()
+    chained = final_pose(demo, clock)
+
+    solo_clock = VirtualClock()
+    solo = ReachyDemo(reachy=FakeReachySDK(clock=solo_clock), clock=solo_clock)
+    solo.engine.start()
+    try:
+        solo.home()
+        solo.emotion_excited()
+        expected = final_pose(solo, solo_clock)
+    finally:
+        solo.engine.stop()
+        solo.connection.close()
+
+    for part, pose in expected.items():
+        assert chained[part] == pytest.approx(pose, abs=1e-6), part
+    assert not [record for record in robot.log if not record.accepted]
@@ -0,0 +1,68 @@
+"""Track locking and preemption on the gesture engine."""
+
+import asyncio
+import time
+
+import pytest
+
+from gesture_engine import _locked
+
+
+def wait_until(predicate, timeout=5.0):
+    """Poll (real time) until predicate() is true."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_cancel_while_waiting_on_a_later_track_releases_the_earlier_ones(demo):
+    engine = demo.engine
+
+    async def hold_l_arm():
+        async with _locked(engine.tracks["l_arm"]):
+            await asyncio.Event().wait()
+
+    blocker = engine.play(hold_l_arm(), wait=False)
+    wait_until(engine.tracks["l_arm"]._lock.locked)
+
+    # head is taken first, then the pose waits on l_arm.
+    gesture = engine.play(engine.pose({"head": [0, 10, 0], "l_arm": [0] * 7}, 1.0), wait=False)
+    wait_until(engine.tracks["head"]._lock.locked)
+    assert engine.preempt()
+    wait_until(lambda: not engine.tracks["head"]._lock.locked())
+    engine.play(engine.head.goto([0, 0, 0], 0.5), wait=False).result(timeout=5.0)
+
+    blocker.cancel()
+    wait_until(lambda: not engine.tracks["l_arm"]._lock.locked())
+
+
+def test_preempt_stops_the_gesture_at_a_keyframe_boundary(demo, robot):
+    engine = demo.engine
+    demo.home()
+    sent = len(robot.log)
+
+    gesture = demo.gesture_nodding(wait=False)
+    wait_until(lambda: len(robot.log) > sent)
+    assert engine.preempt()
+    wait_until(gesture.done)
+
+    assert gesture.cancelled()
+    assert not engine.busy
+    # The task unwinds on the loop after the future reports cancelled.
+    wait_until(lambda: not any(track._lock.locked() for track in engine.tracks.values()))
+
+
+def test_emergency_preempt_flushes_even_when_idle(demo, robot):
+    sent = len(robot.log)
+    assert not demo.engine.preempt(emergency=True)
+    wait_until(lambda: len(robot.log) > sent)
+    assert (robot.log[sent].part, robot.log[sent].method) == ("reachy", "cancel_all_goto")
+
+
+@pytest.mark.parametrize("parts", [("head", "l_arm", "r_arm"), ("l_antenna", "r_antenna")])
+def test_locks_are_free_after_a_pose(demo, parts):
+    engine = demo.engine
+    goals = {name: 0.0 if name.endswith("_antenna") else [0.0] * len(engine.joints(name)) for name in parts}
+    engine.play(engine.pose(goals, 0.5))
+    assert not any(engine.tracks[name]._lock.locked() for name in parts)
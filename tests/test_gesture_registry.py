@@ -0,0 +1,132 @@
+"""Lazy gesture imports and hot reload through the key registry."""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from gesture_registry import GestureRegistry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GESTURES = """
+from gesture_engine import motion
+
+
+class Gestures:
+    def __init__(self, demo):
+        self.demo = demo
+
+    @property
+    def engine(self):
+        return self.demo.engine
+
+    async def _perform(self):
+        self.demo.played.append({version!r})
+
+    @motion
+    async def wave(self):
+        await self._perform()
+"""
+
+
+class Demo:
+    """Just enough of a ReachyDemo for the registry: an engine and play()."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.played = []
+
+    def play(self, name, *args, wait=True, func=None, **kwargs):
+        return self.engine.play(func(self, *args, **kwargs), wait=wait, name=name)
+
+
+@pytest.fixture
+def module(tmp_path, monkeypatch):
+    """A throwaway gesture module on sys.path; write(version) rewrites it."""
+    name = f"gestures_{tmp_path.name}"
+    path = tmp_path / f"{name}.py"
+    stamp = [1_000_000_000]
+
+    def write(version, source=GESTURES):
+        path.write_text(textwrap.dedent(source.format(version=version)))
+        stamp[0] += 10  # a distinct mtime for every edit
+        os.utime(path, (stamp[0], stamp[0]))
+
+    write("v1")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    yield name, write
+    sys.modules.pop(name, None)
+
+
+def test_importing_the_demo_does_not_import_the_gestures():
+    code = "import sys, ai_replace_this_demo; print('gestures_demo' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_registry_gesture_plays_on_the_demo(demo, robot):
+    registry = GestureRegistry(module="gestures_demo")
+    entry = registry.add("5", "DemoGestures.gesture_nodding", "Nodding", "ACT 2")
+    func = registry.resolve(entry)
+    assert func.__name__ == "gesture_nodding"
+    sent = len(robot.log)
+    demo.play("gesture_nodding", func=func)
+    assert robot.calls("send_goal_positions") and len(robot.log) > sent
+
+
+def test_edit_before_the_first_key_is_reloaded(demo, module):
+    name, write = module
+    registry = GestureRegistry(module=name)
+    registry.add("1", "Gestures.wave", "Wave", "ACT 1")
+    fake = Demo(demo.engine)
+
+    registry.lookup("Gestures")  # imported at startup, before any key
+    write("v2")
+    assert registry.refresh() == [name]
+    registry.action("1", fake)()
+
+    assert fake.played == ["v2"]
+
+
+def test_reload_rebinds_keys_helpers_and_the_demo_lookup(demo, module):
+    name, write = module
+    registry = GestureRegistry(module=name)
+    registry.add("1", "Gestures.wave", "Wave", "ACT 1")
+    fake = Demo(demo.engine)
+    action = registry.action("1", fake)
+    action()
+    before = registry.lookup("Gestures")
+
+    write("v2")
+    registry.refresh()
+    action()  # queued before the reload, played after it
+    registry.lookup("Gestures")(fake).wave()  # a direct call, as demo.<gesture>() makes
+
+    assert fake.played == ["v1", "v2", "v2"]
+    assert registry.lookup("Gestures") is not before
+    assert registry.reloads == 1
+
+
+def test_broken_edit_keeps_the_previous_version(demo, module):
+    name, write = module
+    registry = GestureRegistry(module=name)
+    registry.add("1", "Gestures.wave", "Wave", "ACT 1")
+    fake = Demo(demo.engine)
+    registry.action("1", fake)()
+
+    write("v2", source=GESTURES.replace("async def wave", "async def wave("))
+    assert registry.refresh() == []
+    registry.action("1", fake)()
+    assert fake.played == ["v1", "v1"]
+
+
+def test_chords_are_normalized():
+    registry = GestureRegistry(module="gestures_demo")
+    registry.add("z+x", "DemoGestures.freeze", "Freeze", "UTILITIES")
+    assert registry.chords() == ["X+Z"]
+    with pytest.raises(ValueError):
+        registry.add("X+Z", "DemoGestures.home", "Home", "UTILITIES")
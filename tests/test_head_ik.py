@@ -0,0 +1,69 @@
+"""Cached look_at solutions come from the SDK's head IK."""
+
+import time
+
+import pytest
+
+from head_ik import STAGE_TARGETS, LookAtCache, look_at_orientation
+
+
+def test_orientation_follows_the_gesture_convention():
+    roll, pitch, yaw = look_at_orientation(1.0, 0.5, -0.3)
+    assert roll == 0.0
+    assert pitch < 0  # below: looks down, like the authored [0, -25, 0] droop
+    assert yaw > 0    # y is left
+
+
+def test_miss_asks_the_head_ik_once_then_hits(demo, robot):
+    engine = demo.engine
+    calls = []
+    ik = robot.head.inverse_kinematics
+
+    def counted(**kwargs):
+        calls.append(kwargs["rpy"])
+        return ik(**kwargs)
+
+    robot.head.inverse_kinematics = counted
+    target = (0.6, -0.1, -0.05)
+    engine.play(engine.look_at(*target, duration=0.5))
+    engine.play(engine.look_at(*target, duration=0.5))
+
+    assert len(calls) == 1
+    stats = engine.gaze.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert not robot.calls("look_at")
+
+
+def test_cached_goto_ends_where_the_sdk_look_at_does(demo, robot, clock):
+    engine = demo.engine
+    x, y, z = STAGE_TARGETS["screen"]
+    engine.play(engine.look_at(x, y, z, duration=0.5))
+    clock.sleep(1.0)
+    cached = engine.present("head")
+
+    robot.head.look_at(x, y, z, duration=0.5)
+    clock.sleep(1.0)
+    assert engine.present("head") == pytest.approx(cached, abs=0.5)
+
+
+def test_falls_back_to_look_at_without_an_ik(demo, robot):
+    robot.head.inverse_kinematics = None
+    engine = demo.engine
+    engine.play(engine.look_at(0.7, 0.2, 0.0, duration=0.5))
+    assert [record.args for record in robot.calls("look_at")] == [(0.7, 0.2, 0.0)]
+    assert len(engine.gaze) == len(STAGE_TARGETS)
+
+
+def test_saved_time_is_measured_against_the_ik_call():
+    cache = LookAtCache()
+
+    def slow_ik(rpy):
+        time.sleep(0.002)
+        return rpy
+
+    cache.prewarm([(0.5, 0.0, 0.0)], slow_ik)
+    for _ in range(10):
+        assert cache.lookup(0.5, 0.0, 0.0) is not None
+    stats = cache.stats()
+    assert stats["mean_solve_us"] >= 2000
+    assert stats["saved_ms"] >= 10 * 1.5
@@ -0,0 +1,81 @@
+"""Idle motion yields to gestures, power-off and claimed parts, and stays under its call cap."""
+
+import time
+
+import pytest
+
+from idle_motion import QUIET_S, IdleMotion, _idling
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def sends(demo):
+    """(clock time, parts, idle?) of every command, as the engine sends it."""
+    log = []
+
+    def recorder(part, method, args, kwargs, sent_at):
+        parts = tuple(args[0]) if method == "send_goal_positions" and args else (part,)
+        log.append((sent_at, parts, _idling.get()))
+
+    demo.engine.recorders.append(recorder)
+    return log
+
+
+@pytest.fixture
+def idle(demo):
+    idle = IdleMotion(demo.engine, seed=1)
+    yield idle
+    idle.stop()
+
+
+def idle_sends(sends, since=float("-inf"), until=float("inf")):
+    return [parts for t, parts, idling in sends if idling and since <= t < until]
+
+
+def test_idle_yields_to_a_gesture_and_its_quiet_time(demo, sends, idle):
+    idle.start()
+    wait_until(lambda: idle.calls > 0)
+
+    sent = len(sends)
+    demo.gesture_nodding()
+    gesture = [t for t, _, idling in sends[sent:] if not idling]
+    assert gesture
+    # A tick already under way when the gesture starts may still land with it.
+    assert not idle_sends(sends, gesture[0] + 1e-6, gesture[-1] + QUIET_S)
+    assert idle.yields >= 1
+    calls = idle.calls
+    wait_until(lambda: idle.calls > calls)  # idles again once quiet
+
+
+def test_idle_stops_while_the_motors_are_off(demo, sends, idle):
+    demo.reset()
+    off = demo.engine.clock.monotonic()
+    idle.start()
+    wait_until(lambda: demo.engine.clock.monotonic() > off + 5 * QUIET_S)
+    assert idle.calls == 0
+    assert not idle_sends(sends)
+
+
+def test_claimed_head_is_left_alone(demo, sends, idle):
+    demo.engine.call_soon(demo.engine.claims.__setitem__, "head", "gaze")
+    idle.start()
+    wait_until(lambda: idle.calls >= 3)
+    parts = {part for sent in idle_sends(sends) for part in sent}
+    assert parts and "head" not in parts
+
+
+def test_calls_stay_under_the_cap(demo):
+    idle = IdleMotion(demo.engine, rate_hz=50.0, max_calls_per_s=5.0, seed=1).start()
+    try:
+        wait_until(lambda: demo.engine.clock.monotonic() > 30.0)
+        stats = idle.stats()
+    finally:
+        idle.stop()
+    assert idle.capped > 0
+    assert 0 < stats["calls_per_s"] <= 5.5
@@ -0,0 +1,59 @@
+"""The optimizer's drop pass, applied to the compiled gestures the robot plays."""
+
+import pytest
+
+from ai_replace_this_demo import ReachyDemo
+from clock import VirtualClock
+from gesture_compiler import GestureLibrary
+from mock_reachy import FakeReachySDK
+from motion_optimizer import apply
+
+PARTS = ("head", "l_arm", "r_arm")
+
+
+def play(steps, optimize):
+    clock = VirtualClock()
+    robot = FakeReachySDK(clock=clock)
+    demo = ReachyDemo(reachy=robot, clock=clock, optimize=optimize)
+    demo.engine.start()
+    try:
+        for step in steps:
+            getattr(demo, step)()
+        clock.sleep(5.0)
+        pose = {part: [joint.present_position for joint in demo.engine.joints(part)] for part in PARTS}
+    finally:
+        demo.engine.stop()
+        demo.connection.close()
+    return robot, pose
+
+
+def head_gotos(robot):
+    return [record for record in robot.calls("goto") if record.part == "head"]
+
+
+def test_apply_drops_the_head_goto_after_elbow_90():
+    library = GestureLibrary.load()
+    before = list(library["pointing"].finish)
+    reports = apply(library)
+
+    assert {"pointing", "shrug", "holding"} <= set(reports)
+    assert library["pointing"].finish == [step for step in before if "posture" in step]
+    assert reports["pointing"].saved_calls == 1
+    assert reports["pointing"].saved_s == pytest.approx(0.8)
+
+
+def test_optimized_gestures_send_less_and_end_in_the_same_pose():
+    steps = ["home", "gesture_pointing", "gesture_nodding", "gesture_shrug"]
+    plain, plain_pose = play(steps, optimize=False)
+    optimized, optimized_pose = play(steps, optimize=True)
+
+    assert len(head_gotos(optimized)) == len(head_gotos(plain)) - 2
+    assert len(optimized.log) < len(plain.log)
+    for part in PARTS:
+        assert optimized_pose[part] == pytest.approx(plain_pose[part], abs=1e-3), part
+
+
+def test_home_sends_only_the_posture(demo, robot):
+    demo.home()
+    assert robot.calls("goto_posture")
+    assert not head_gotos(robot)
@@ -0,0 +1,73 @@
+"""Power transitions: only real changes are sent, outside power commands are tracked."""
+
+import threading
+
+from power_manager import FULL_TORQUE, MOTOR_PARTS, OFF, ON, SOFT, SOFT_TORQUE
+
+
+def calls(robot, since=0):
+    return [(record.part, record.method, record.args) for record in robot.log[since:]
+            if record.method in ("turn_on", "turn_off", "turn_off_smoothly", "set_torque_limits")]
+
+
+def test_soft_then_on_is_one_torque_write_per_part(demo, robot):
+    engine, power = demo.engine, demo.power
+    engine.play(power.ensure(MOTOR_PARTS, OFF))
+    sent = len(robot.log)
+    engine.play(power.ensure(MOTOR_PARTS, SOFT))
+    assert calls(robot, sent) == [item for part in MOTOR_PARTS for item in
+                                  ((part, "turn_on", ()), (part, "set_torque_limits", (SOFT_TORQUE,)))]
+
+    sent = len(robot.log)
+    engine.play(power.ensure(MOTOR_PARTS, ON))
+    assert calls(robot, sent) == [(part, "set_torque_limits", (FULL_TORQUE,)) for part in MOTOR_PARTS]
+    assert power.spin_ups == 1
+    assert power.state == dict.fromkeys(MOTOR_PARTS, ON)
+
+
+def test_asking_for_the_current_state_sends_nothing(demo, robot):
+    engine, power = demo.engine, demo.power
+    engine.play(power.ensure(MOTOR_PARTS, ON))  # the fake robot starts powered
+    assert calls(robot) == []
+    assert power.skipped == 3
+    engine.play(power.ensure(["head", "l_antenna", "r_antenna"], ON))
+    assert calls(robot) == []
+    assert power.skipped == 4  # the antennas count as the head
+
+
+def test_outside_power_commands_are_tracked(demo, robot):
+    engine, power = demo.engine, demo.power
+    engine.play(power.ensure(MOTOR_PARTS, ON))
+    demo.reset()  # turn_off_smoothly, sent without the power manager
+    assert power.state == dict.fromkeys(MOTOR_PARTS, OFF)
+
+    sent = len(robot.log)
+    engine.play(power.ensure(["head"], ON))
+    assert ("head", "turn_on", ()) in calls(robot, sent)
+
+
+def test_prearm_warms_only_cold_parts(demo, robot):
+    engine, power = demo.engine, demo.power
+    engine.play(power.ensure(["l_arm", "r_arm"], OFF))
+    sent = len(robot.log)
+    engine.play(power.prearm())
+    assert {part for part, method, _ in calls(robot, sent)} == {"l_arm", "r_arm"}
+    assert power.state == {"head": ON, "l_arm": SOFT, "r_arm": SOFT}
+
+
+def test_unanswered_state_query_is_asked_again(demo, robot, monkeypatch):
+    engine, power = demo.engine, demo.power
+    robot.head.turn_off()
+    release = threading.Event()
+    is_on = robot.head.is_on
+    monkeypatch.setattr(robot.head, "is_on", lambda: release.wait(5.0))
+    try:
+        engine.play(power.prearm(["head"]))
+        assert power.state["head"] is None
+        assert calls(robot)[1:] == []  # unknown parts are not prearmed
+    finally:
+        release.set()
+
+    monkeypatch.setattr(robot.head, "is_on", is_on)
+    engine.play(power.prearm(["head"]))
+    assert power.state["head"] == SOFT
@@ -0,0 +1,73 @@
+"""Record a show, read it back and replay it on a fresh fake robot."""
+
+import numpy as np
+import pytest
+
+from clock import VirtualClock
+from connection import ConnectionManager
+from gesture_engine import GestureEngine
+from mock_reachy import FakeReachySDK
+from session_log import COLUMNS, COMMAND, METHODS, STATE, SessionLog, SessionRecorder, replay
+
+PARTS = ("head", "l_arm", "r_arm")
+
+
+def recorded_calls(robot):
+    return [(record.part, record.method) for record in robot.log if record.method in METHODS]
+
+
+def test_round_trip(demo, robot, clock, tmp_path):
+    path = str(tmp_path / "show.reachylog")
+    with SessionRecorder(demo.engine, path):
+        demo.home()
+        demo.gesture_nodding()
+        demo.emotion_listening()
+    clock.sleep(5.0)
+
+    log = SessionLog(path)
+    commands = log.commands()
+    assert len(commands) == len(recorded_calls(robot))
+    assert np.all(np.diff(log.records["t"]) >= 0)
+
+    replay_clock = VirtualClock()
+    target = FakeReachySDK(clock=replay_clock)
+    connection = ConnectionManager("replay", reachy=target)
+    engine = GestureEngine(target, clock=replay_clock, connection=connection)
+    try:
+        sent = engine.play(replay(engine, log))
+    finally:
+        engine.stop()
+        connection.close()
+    replay_clock.sleep(5.0)
+
+    assert sent == len(commands)
+    assert recorded_calls(target) == recorded_calls(robot)
+    for part in PARTS:
+        original = [joint.present_position for joint in demo.engine.joints(part)]
+        replayed = [joint.present_position for joint in engine.joints(part)]
+        assert replayed == pytest.approx(original, abs=1e-3), part
+
+
+def test_sample_taken_during_a_slow_call_lands_after_the_command(demo, robot, clock, tmp_path):
+    path = str(tmp_path / "sampled.reachylog")
+    recorder = SessionRecorder(demo.engine, path).start()
+    goto = robot.head.goto
+
+    def slow_goto(*args, **kwargs):
+        # The call takes 10 ms and the sampler fires while it is in flight.
+        clock.advance(0.01)
+        recorder._on_state(np.zeros(len(COLUMNS), dtype=np.float32))
+        return goto(*args, **kwargs)
+
+    robot.head.goto = slow_goto
+    try:
+        demo.gesture_nodding()
+    finally:
+        recorder.stop()
+
+    log = SessionLog(path)
+    assert isinstance(log.records, np.memmap)
+    assert np.count_nonzero(log.records["kind"] == STATE)
+    assert np.all(np.diff(log.records["t"]) >= 0)
+    first = log.index(0.0)
+    assert log.records[first]["kind"] == COMMAND
@@ -0,0 +1,44 @@
+"""Cue landing times on the show timeline."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from show_timeline import Cue, ShowScript, ShowTimeline
+
+
+def script(*cues):
+    return ShowScript({"act": "ACT 1"}, [Cue(f"cue{i}", "act", at, gesture) for i, (at, gesture) in
+                                         enumerate(cues)])
+
+
+def test_cue_lands_on_its_own_first_motion_not_background_motion(demo, robot):
+    engine = demo.engine
+    go = threading.Event()
+
+    async def late():
+        while not go.is_set():
+            await asyncio.sleep(0.005)
+        await engine.sleep(0.5)
+        await engine.head.goto([0, 10, 0], 0.5, hold=0)
+
+    # The script names a real gesture (checked by run()); the demo plays `late` for it.
+    demo.gesture = lambda name: late
+    show = ShowTimeline(demo, script((0.0, "gesture_nodding")))
+    done = engine.play(show.run(), wait=False)
+    while show._fired_at is None:
+        time.sleep(0.005)
+
+    # Idle motion or the gaze tracker moving an antenna while the cue waits.
+    sent = len(robot.log)
+    engine.call_soon(lambda: asyncio.ensure_future(engine.tracks["l_antenna"].goto([20.0], 0.2, hold=0)))
+    while len(robot.log) == sent:
+        time.sleep(0.005)
+    go.set()
+
+    report, = done.result(timeout=5.0)
+    motion = next(record for record in robot.log[sent:] if record.part == "head")
+    assert motion.time - show._fired_at >= 0.5
+    assert report.landed_ms - report.fired_ms == pytest.approx((motion.time - show._fired_at) * 1000, abs=1.0)
@@ -0,0 +1,74 @@
+"""
+Transitions - Direct, velocity-limited moves between gestures
+=============================================================
+
+A data-driven gesture normally ends by sending the robot back to neutral
+(`finish` in gestures.json: elbow_90 + head centred), and the next gesture
+starts from there. When cues are chained that return trip is dead motion:
+the next gesture's first gotos queue up behind it.
+
+When the engine sees that the robot has not settled yet (the previous
+gesture was preempted, or its return to neutral is still under way) it
+cancels the queued motion and plans the lead-in of the next gesture from
+the present joint positions instead:
+
+    - each part gets the shortest minimum-jerk move that keeps every joint
+      under its velocity limit (peak speed of a min-jerk move is 1.875x its
+      average speed), but never less than MIN_TRANSITION;
+    - the gesture's timeline is shifted by the largest difference between
+      that planned time and the authored lead-in, so every part lands just as
+      its streamed keyframes start.
+
+Usage:
+    shift, durations = plan_transition(current, gesture.leads[0])
+"""
+
+import math
+from typing import Dict, List, Sequence, Tuple
+
+# Peak joint speed per part (degrees per second), matching the fastest
+# keyframes authored in gestures.json (goodbye wave, excited antennas).
+VELOCITY_LIMITS = {
+    "head": 150.0,
+    "l_arm": 250.0,
+    "r_arm": 250.0,
+    "l_antenna": 800.0,
+    "r_antenna": 800.0,
+}
+
+# Shortest lead-in we send, even for a part that is already in place.
+MIN_TRANSITION = 0.15
+
+# Peak / average speed of a minimum-jerk move.
+_MIN_JERK_PEAK = 1.875
+
+
+def min_time(part: str, current: Sequence[float], target: Sequence[float]) -> float:
+    """Fastest min-jerk move from `current` to `target` within the part's limits."""
+    distance = max((abs(b - a) for a, b in zip(current, target)), default=0.0)
+    return max(MIN_TRANSITION, _MIN_JERK_PEAK * distance / VELOCITY_LIMITS[part])
+
+
+def plan_transition(current: Dict[str, Sequence[float]],
+                    leads: List[Tuple[str, List[float], float]]) -> Tuple[float, Dict[str, float]]:
+    """Plan the lead-in moves of a gesture from the robot's present pose.
+
+    Args:
+        current: Present joint positions per part; parts missing here keep
+            their authored lead-in.
+        leads: The gesture's first-tick lead-ins as (part, pose, duration).
+
+    Returns:
+        (shift, durations): how far to move the gesture's timeline (negative
+        means earlier) and the lead-in duration to send for each part.
+    """
+    shift = -math.inf
+    for part, pose, duration in leads:
+        if part in current:
+            shift = max(shift, min_time(part, current[part], pose) - duration)
+    if shift == -math.inf:
+        return 0.0, {part: duration for part, _, duration in leads}
+    # Parts without a present pose must not be rushed.
+    if any(part not in current for part, _, _ in leads):
+        shift = max(shift, 0.0)
+    return shift, {part: duration + shift for part, _, duration in leads}